@@ -0,0 +1,133 @@
+# ============================================================
+# Bucket Priority Queue — Built from Scratch
+# NO heapq, NO deque, NO sorted()
+# Used for: Same job as TaskPriorityQueue (high → medium → low), but
+#           with only three priority levels a heap is overkill:
+#           one FIFO bucket per level gives O(1) push / pop.
+# ============================================================
+
+from DS.TaskPriorityQueue import PRIORITY_MAP, priority_key
+
+
+class _Fifo:
+    """
+    FIFO on a plain list + head index.
+
+    pop() only moves the head forward; the consumed prefix is cut off
+    once it is at least half of the list, so every item is moved at
+    most once more (amortized O(1)).
+    """
+
+    def __init__(self):
+        self._items = []
+        self._head = 0
+
+    def append(self, item):
+        self._items.append(item)
+
+    def popleft(self):
+        item = self._items[self._head]
+        self._items[self._head] = None  # drop the reference
+        self._head += 1
+        if self._head * 2 >= len(self._items):
+            del self._items[: self._head]
+            self._head = 0
+        return item
+
+    def first(self):
+        return self._items[self._head]
+
+    def items(self):
+        return self._items[self._head :]
+
+    def __len__(self):
+        return len(self._items) - self._head
+
+
+class BucketTaskQueue:
+    """
+    Priority queue with one FIFO bucket per PRIORITY_MAP level.
+
+        push  → append to its level's bucket       O(1)
+        pop   → first task of the highest non-empty level   O(levels)
+
+    Tasks of the same priority come out in insertion order, exactly
+    like TaskPriorityQueue (which breaks ties on an insertion counter),
+    so the two are interchangeable.
+    """
+
+    def __init__(self):
+        self._levels = max(PRIORITY_MAP.values()) + 1
+        self._buckets = [_Fifo() for _ in range(self._levels)]
+        self._size = 0
+
+    def _level(self, task):
+        return priority_key(task)
+
+    def _top_bucket(self):
+        for level in range(self._levels - 1, -1, -1):
+            if len(self._buckets[level]):
+                return self._buckets[level]
+        return None
+
+    def push(self, task):
+        self._buckets[self._level(task)].append(task)
+        self._size += 1
+
+    def push_all(self, tasks):
+        for task in tasks:
+            self.push(task)
+
+    def pop(self):
+        bucket = self._top_bucket()
+        if bucket is None:
+            return None
+        self._size -= 1
+        return bucket.popleft()
+
+    def peek(self):
+        bucket = self._top_bucket()
+        return bucket.first() if bucket is not None else None
+
+    def iter_ordered(self):
+        """Lazily yield tasks in priority order, without modifying the queue."""
+        for level in range(self._levels - 1, -1, -1):
+            bucket = self._buckets[level]
+            for index in range(bucket._head, len(bucket._items)):
+                yield bucket._items[index]
+
+    def nlargest(self, k):
+        """The k most urgent tasks, most urgent first — O(k)."""
+        ordered = []
+        for task in self.iter_ordered():
+            if len(ordered) >= k:
+                break
+            ordered.append(task)
+        return ordered
+
+    def nsmallest(self, k):
+        """The k least urgent tasks, least urgent first — O(k)."""
+        ordered = []
+        for level in range(self._levels):
+            bucket = self._buckets[level]
+            for index in range(len(bucket._items) - 1, bucket._head - 1, -1):
+                if len(ordered) >= k:
+                    return ordered
+                ordered.append(bucket._items[index])
+        return ordered
+
+    def snapshot(self):
+        """All tasks in priority order, without modifying the queue."""
+        ordered = []
+        for level in range(self._levels - 1, -1, -1):
+            ordered.extend(self._buckets[level].items())
+        return ordered
+
+    def get_all(self):
+        return self.snapshot()
+
+    def is_empty(self):
+        return self._size == 0
+
+    def size(self):
+        return self._size
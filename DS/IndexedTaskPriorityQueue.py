@@ -0,0 +1,146 @@
+# ============================================================
+# Indexed Max-Heap Priority Queue — Built from Scratch
+# NO heapq, NO sorted()
+# Used for: long-lived per-user task lists (employee "My Work")
+#           that are patched in place when a task changes instead
+#           of being rebuilt from SQL
+# ============================================================
+
+from DS.TaskPriorityQueue import TaskPriorityQueue, _node_first
+
+
+class IndexedTaskPriorityQueue(TaskPriorityQueue):
+    """
+    TaskPriorityQueue + a task_id → heap position map.
+
+    Every swap keeps the map in step, so a queued task can be found in
+    O(1) and re-prioritised / removed in O(log n):
+
+        contains(task_id)                 O(1)
+        update_priority(task_id, prio)    O(log n)
+        update(task_id, fields)           O(log n)
+        remove(task_id)                   O(log n)
+
+    Task ids are unique: pushing a task_id that is already queued
+    replaces the queued task.
+    """
+
+    def __init__(self, key=None, id_field="task_id"):
+        super().__init__(key)
+        self._id_field = id_field
+        self._pos = {}
+
+    def _task_id(self, task):
+        return task[self._id_field]
+
+    def _place(self, index, node):
+        self._heap[index] = node
+        self._pos[self._task_id(node.task)] = index
+
+    # Same hole-based sifts as the base class, but every write goes
+    # through _place so the position map stays in step.
+    def _sift_up(self, index):
+        heap = self._heap
+        node = heap[index]
+        while index > 0:
+            parent = (index - 1) // 2
+            if not _node_first(node, heap[parent]):
+                break
+            self._place(index, heap[parent])
+            index = parent
+        self._place(index, node)
+
+    def _sift_down(self, index):
+        heap = self._heap
+        size = len(heap)
+        node = heap[index]
+        while True:
+            left = 2 * index + 1
+            if left >= size:
+                break
+            right = left + 1
+            child = left
+            if right < size and _node_first(heap[right], heap[left]):
+                child = right
+
+            if not _node_first(heap[child], node):
+                break
+            self._place(index, heap[child])
+            index = child
+        self._place(index, node)
+
+    def _heapify(self):
+        # Plain sifts, then one pass to rebuild the map
+        for index in range(len(self._heap) // 2 - 1, -1, -1):
+            TaskPriorityQueue._sift_down(self, index)
+        self._reindex()
+
+    def _reindex(self):
+        self._pos = {self._task_id(node.task): i for i, node in enumerate(self._heap)}
+
+    def _fix(self, index):
+        # Restore the heap after the node at `index` changed its key
+        if index > 0 and self._is_higher(index, (index - 1) // 2):
+            self._sift_up(index)
+        else:
+            self._sift_down(index)
+
+    def push(self, task):
+        if self._task_id(task) in self._pos:
+            self.update(self._task_id(task), task)
+            return
+        self._heap.append(self._make_node(task))
+        self._sift_up(len(self._heap) - 1)
+
+    def push_all(self, tasks):
+        fresh = {}  # task_id → task, last one wins
+        for task in tasks:
+            if self._task_id(task) in self._pos:
+                self.update(self._task_id(task), task)
+            else:
+                fresh[self._task_id(task)] = task
+
+        super().push_all(fresh.values())
+
+    def pop(self):
+        task = super().pop()
+        if task is not None:
+            del self._pos[self._task_id(task)]
+        return task
+
+    def contains(self, task_id):
+        return task_id in self._pos
+
+    def get(self, task_id):
+        index = self._pos.get(task_id)
+        return self._heap[index].task if index is not None else None
+
+    def update(self, task_id, fields):
+        """Merge `fields` into the queued task and re-position it. False if not queued."""
+        index = self._pos.get(task_id)
+        if index is None:
+            return False
+
+        node = self._heap[index]
+        node.task.update(fields)
+        node.key = self._key(node.task)
+        self._fix(index)
+        return True
+
+    def update_priority(self, task_id, priority):
+        return self.update(task_id, {"priority": priority})
+
+    def remove(self, task_id):
+        """Remove a task by id and return it (None if not queued)."""
+        index = self._pos.get(task_id)
+        if index is None:
+            return None
+
+        node = self._heap[index]
+        last = self._heap.pop()
+        del self._pos[task_id]
+
+        if index < len(self._heap):
+            self._heap[index] = last
+            self._fix(index)
+        return node.task
@@ -0,0 +1,71 @@
+# ============================================================
+# TTL Cache — small in-process key/value cache with expiry
+# Used for: caching hot per-user / per-project lookups between
+#           requests so they don't hit PostgreSQL every time
+# ============================================================
+
+import threading
+import time
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Dict-backed cache where every entry expires `ttl` seconds after it
+    was stored.
+
+    Entries live in insertion order, so when the cache is full the
+    oldest entry is evicted first. All operations are thread-safe.
+    The cache is per process: every gunicorn worker has its own copy,
+    so `ttl` is the upper bound on how stale a value can get.
+    """
+
+    def __init__(self, ttl, max_size=1024):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._data = {}  # key → (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            if entry[0] <= time.monotonic():
+                del self._data[key]
+                return default
+            return entry[1]
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data.pop(key, None)
+            if len(self._data) >= self.max_size:
+                self._evict()
+            self._data[key] = (expires_at, value)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+        return default if entry is _MISSING else entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def _evict(self):
+        now = time.monotonic()
+        expired = [k for k, (expires_at, _) in self._data.items() if expires_at <= now]
+        for key in expired:
+            del self._data[key]
+
+        # still full → drop the oldest entry
+        if len(self._data) >= self.max_size:
+            del self._data[next(iter(self._data))]
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self):
+        return len(self._data)
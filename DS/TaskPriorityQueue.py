@@ -4,12 +4,139 @@
 # Used for: Sorting employee tasks by priority (high → medium → low)
 # ============================================================
 
+from datetime import date, datetime
+
 PRIORITY_MAP = {
     "high": 2,
     "medium": 1,
     "low": 0,
 }
 
+# Work that needs the employee first → lowest rank
+STATUS_RANK = {
+    "rejected": 0,
+    "in_progress": 1,
+    "todo": 2,
+    "pending": 2,
+    "submitted": 3,
+    "approved": 4,
+    "completed": 4,
+}
+DONE_STATUSES = ("approved", "completed")
+
+NO_DUE_DATE = -(10**9)  # below every -date.toordinal() → "no due date" sorts last
+
+
+# ------------------------------------------------------------
+# Ordering keys — computed ONCE per task when it is pushed.
+# Bigger key = comes out first (max-heap); ties → insertion order.
+# ------------------------------------------------------------
+def priority_key(task):
+    """Default: mapped priority only (high → medium → low)."""
+    # ✅ Normalize priority — strip spaces, lowercase
+    raw_priority = task.get("priority") or "low"
+    priority_name = str(raw_priority).strip().lower()
+    return PRIORITY_MAP.get(priority_name, 0)
+
+
+def _due_ordinal(value):
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.date().toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+    return date.fromisoformat(str(value)[:10]).toordinal()
+
+
+def composite_key(today=None):
+    """
+    Key function for (priority desc, overdue first, due_date asc, status rank).
+
+    Returns a flat tuple of ints per task, so every heap comparison is a
+    single tuple compare — nothing is re-derived while sifting.
+    `today` (default: date.today()) decides what counts as overdue.
+    """
+    today_ordinal = (today or date.today()).toordinal()
+
+    def key(task):
+        status = str(task.get("status") or "").strip().lower()
+        due = _due_ordinal(task.get("due_date"))
+        overdue = (
+            1
+            if due is not None and due < today_ordinal and status not in DONE_STATUSES
+            else 0
+        )
+        return (
+            priority_key(task),
+            overdue,
+            -due if due is not None else NO_DUE_DATE,
+            -STATUS_RANK.get(status, 2),
+        )
+
+    return key
+
+
+class _Node:
+    """
+    One queued task. __slots__ keeps it at ~56 bytes (a [key, counter,
+    task] list is 88) and attribute reads are as cheap as list indexing.
+    """
+
+    __slots__ = ("key", "order", "task")
+
+    def __init__(self, key, order, task):
+        self.key = key
+        self.order = order
+        self.task = task
+
+
+def _node_first(a, b):
+    # Bigger key first; equal keys → lower insertion order first
+    if a.key != b.key:
+        return a.key > b.key
+    return a.order < b.order
+
+
+def _comes_first(a, b, reverse):
+    # TaskPriorityQueue._is_higher on (key, counter, ...) tuples;
+    # reverse=True flips it (least urgent first).
+    if a[0] != b[0]:
+        return a[0] < b[0] if reverse else a[0] > b[0]
+    return a[1] > b[1] if reverse else a[1] < b[1]
+
+
+def _sift_down_keys(keys, index, size, reverse=False):
+    # Sift keys[index] down within keys[:size]
+    while True:
+        left = 2 * index + 1
+        right = left + 1
+        first = index
+
+        if left < size and _comes_first(keys[left], keys[first], reverse):
+            first = left
+
+        if right < size and _comes_first(keys[right], keys[first], reverse):
+            first = right
+
+        if first == index:
+            return
+        keys[index], keys[first] = keys[first], keys[index]
+        index = first
+
+
+def _pop_keys(keys, reverse=False):
+    """
+    Lazily pop positions off a heap of (key, counter, pos) tuples.
+    Each step is O(log n); stopping after k steps costs O(k log n).
+    """
+    size = len(keys)
+    while size:
+        yield keys[0][2]
+        size -= 1
+        keys[0] = keys[size]
+        _sift_down_keys(keys, 0, size, reverse)
+
 
 class TaskPriorityQueue:
     """
@@ -23,90 +150,152 @@ class TaskPriorityQueue:
     Max-Heap rule:
         Every parent >= its children
         So root is always the HIGHEST priority task
+
+    `key` maps a task to its ordering key (int or tuple, bigger first);
+    default priority_key. See composite_key() for due date / status.
+
+    Each slot holds a _Node (key, order, task). Sifting moves a "hole"
+    instead of swapping: every node it passes is shifted by one write and
+    the moving node is written once, at its final position.
     """
 
-    def __init__(self):
+    def __init__(self, key=None):
         self._heap = []
         self._counter = 0
-
-    def _swap(self, i, j):
-        self._heap[i], self._heap[j] = self._heap[j], self._heap[i]
+        self._key_func = key or priority_key
 
     def _is_higher(self, i, j):
-        if self._heap[i][0] != self._heap[j][0]:
-            return self._heap[i][0] > self._heap[j][0]
-        return self._heap[i][1] < self._heap[j][1]
+        return _node_first(self._heap[i], self._heap[j])
 
     def _sift_up(self, index):
+        heap = self._heap
+        node = heap[index]
         while index > 0:
             parent = (index - 1) // 2
-            if self._is_higher(index, parent):
-                self._swap(index, parent)
-                index = parent
-            else:
+            if not _node_first(node, heap[parent]):
                 break
+            heap[index] = heap[parent]
+            index = parent
+        heap[index] = node
 
     def _sift_down(self, index):
-        size = len(self._heap)
+        heap = self._heap
+        size = len(heap)
+        node = heap[index]
         while True:
             left = 2 * index + 1
-            right = 2 * index + 2
-            largest = index
-
-            if left < size and self._is_higher(left, largest):
-                largest = left
-
-            if right < size and self._is_higher(right, largest):
-                largest = right
+            if left >= size:
+                break
+            right = left + 1
+            child = left
+            if right < size and _node_first(heap[right], heap[left]):
+                child = right
 
-            if largest != index:
-                self._swap(index, largest)
-                index = largest
-            else:
+            if not _node_first(heap[child], node):
                 break
+            heap[index] = heap[child]
+            index = child
+        heap[index] = node
 
-    def push(self, task):
-        # ✅ Normalize priority — strip spaces, lowercase
-        raw_priority = task.get("priority") or "low"
-        priority_key = str(raw_priority).strip().lower()
-        priority_val = PRIORITY_MAP.get(priority_key, 0)
+    def _heapify(self):
+        # Bottom-up (Floyd): sift down every parent, last parent first.
+        # Leaves are already heaps, so this is O(n) instead of O(n log n).
+        for index in range(len(self._heap) // 2 - 1, -1, -1):
+            self._sift_down(index)
+
+    def _key(self, task):
+        return self._key_func(task)
 
-        node = [priority_val, self._counter, task]
-        self._heap.append(node)
+    def _make_node(self, task):
+        node = _Node(self._key(task), self._counter, task)
         self._counter += 1
+        return node
+
+    def push(self, task):
+        self._heap.append(self._make_node(task))
         self._sift_up(len(self._heap) - 1)
 
     def push_all(self, tasks):
+        """
+        Bulk insert. Nodes are appended as-is and the heap is rebuilt
+        bottom-up once (O(n + k)); only a handful of tasks going into a
+        big heap are pushed one by one (O(k log n)).
+        """
+        tasks = list(tasks)
+        if len(tasks) < len(self._heap) // 4:
+            for task in tasks:
+                self.push(task)
+            return
+
         for task in tasks:
-            self.push(task)
+            self._heap.append(self._make_node(task))
+        self._heapify()
 
     def pop(self):
         if not self._heap:
             return None
-        self._swap(0, len(self._heap) - 1)
-        node = self._heap.pop()
+        top = self._heap[0]
+        last = self._heap.pop()
         if self._heap:
+            self._heap[0] = last
             self._sift_down(0)
-        return node[2]
+        return top.task
 
-    def get_all(self):
-        import copy
+    def _side_keys(self):
+        return [(node.key, node.order, pos) for pos, node in enumerate(self._heap)]
 
-        saved_heap = copy.deepcopy(self._heap)
-        saved_counter = self._counter
+    def iter_ordered(self):
+        """
+        Lazily yield tasks in priority order, without modifying the queue.
 
-        sorted_tasks = []
-        while not self.is_empty():
-            sorted_tasks.append(self.pop())
+        Pops a side heap of small (key, counter, position) tuples — a
+        copy of a valid heap is itself a valid heap, so building it is
+        O(n) and each yielded task costs O(log n). Task dicts are never
+        copied. Don't push/pop while iterating.
+        """
+        heap = self._heap
+        for pos in _pop_keys(self._side_keys()):
+            yield heap[pos].task
 
-        self._heap = saved_heap
-        self._counter = saved_counter
+    def nlargest(self, k):
+        """The k most urgent tasks, most urgent first — O(n + k log n)."""
+        ordered = []
+        if k <= 0:
+            return ordered
+        for task in self.iter_ordered():
+            ordered.append(task)
+            if len(ordered) == k:
+                break
+        return ordered
 
-        return sorted_tasks
+    def nsmallest(self, k):
+        """The k least urgent tasks, least urgent first — O(n + k log n)."""
+        ordered = []
+        if k <= 0:
+            return ordered
+
+        # Re-heapify the side list the other way round (bottom-up, O(n))
+        keys = self._side_keys()
+        for index in range(len(keys) // 2 - 1, -1, -1):
+            _sift_down_keys(keys, index, len(keys), reverse=True)
+
+        heap = self._heap
+        for pos in _pop_keys(keys, reverse=True):
+            ordered.append(heap[pos].task)
+            if len(ordered) == k:
+                break
+        return ordered
+
+    def snapshot(self):
+        """All tasks in priority order, without modifying the queue."""
+        return list(self.iter_ordered())
+
+    def get_all(self):
+        return self.snapshot()
 
     def peek(self):
         if self._heap:
-            return self._heap[0][2]
+            return self._heap[0].task
         return None
 
     def is_empty(self):
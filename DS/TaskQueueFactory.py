@@ -0,0 +1,35 @@
+# ============================================================
+# Task queue factory
+# Used for: letting routes pick the priority queue implementation
+#           (heap, bucket or indexed) from config instead of hard-coding it
+# ============================================================
+
+from DS.BucketTaskQueue import BucketTaskQueue
+from DS.IndexedTaskPriorityQueue import IndexedTaskPriorityQueue
+from DS.TaskPriorityQueue import TaskPriorityQueue
+
+TASK_QUEUES = {
+    "heap": TaskPriorityQueue,  # any number of priority levels, O(log n)
+    "bucket": BucketTaskQueue,  # fixed PRIORITY_MAP levels, O(1)
+    "indexed": IndexedTaskPriorityQueue,  # heap + update/remove by task_id
+}
+
+DEFAULT_TASK_QUEUE = "heap"
+
+
+def create_task_queue(kind=None, key=None):
+    """
+    Return an empty task queue of the given kind ("heap" / "bucket" / "indexed").
+    `key` is an ordering key function (see TaskPriorityQueue.composite_key);
+    the bucket queue only knows the three priority levels, so it takes none.
+    """
+    kind = (kind or DEFAULT_TASK_QUEUE).strip().lower()
+    if kind not in TASK_QUEUES:
+        raise ValueError(
+            f"Unknown task queue '{kind}', expected one of: {', '.join(TASK_QUEUES)}"
+        )
+    if key is None:
+        return TASK_QUEUES[kind]()
+    if kind == "bucket":
+        raise ValueError("The bucket task queue orders by priority only (no key)")
+    return TASK_QUEUES[kind](key=key)
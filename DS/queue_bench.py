@@ -0,0 +1,393 @@
+# ============================================================
+# Benchmark suite for the task queues
+#
+# Compares the from-scratch queues (heap / indexed / bucket) with two
+# reference strategies built on the standard library (heapq, sorted),
+# on task rows shaped like the RealDictCursor rows of
+# employee.my_work, for several queue sizes and priority mixes.
+#
+# Measured per (queue, size, mix):
+#   memory    → bytes held by the queue per task (task rows excluded)
+#   push_all  → bulk load of a fresh queue
+#   get_all   → ordered list of a full queue (queue left intact)
+#   pop       → drain a full queue one task at a time
+#   peek      → PEEK_CALLS peek() calls on a full queue
+#
+# Runs are timeit-style: setup outside the timer, best and median of
+# --repeat runs kept. --json writes the results; --baseline compares
+# them with an earlier --json file and exits 1 if any median got more
+# than --threshold slower (or bigger). Timings under MIN_MS are
+# reported but never flagged.
+#
+#   python -m DS.queue_bench
+#   python -m DS.queue_bench --sizes 100 1000 10000 100000 1000000 --repeat 3
+#   python -m DS.queue_bench --order composite --queues heap heapq sorted
+#   python -m DS.queue_bench --json bench.json
+#   python -m DS.queue_bench --baseline bench.json --threshold 0.15
+# ============================================================
+
+import argparse
+import heapq
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from psycopg2.extras import RealDictRow
+
+from DS.TaskPriorityQueue import composite_key, priority_key
+from DS.TaskQueueFactory import TASK_QUEUES, create_task_queue
+
+DEFAULT_SIZES = [100, 1_000, 10_000, 100_000]
+PEEK_CALLS = 10_000
+MIN_MS = 1.0  # timings below this are too noisy to call a regression
+OPS = ("memory", "push_all", "get_all", "pop", "peek")
+
+# (high, medium, low) weights
+PRIORITY_MIXES = {
+    "uniform": (1, 1, 1),
+    "skewed": (5, 25, 70),  # most work is low priority
+    "hot": (80, 15, 5),  # nearly everything high → long runs of ties
+}
+STATUS_WEIGHTS = {"todo": 50, "in_progress": 30, "submitted": 10, "rejected": 10}
+
+
+# -----------------------------
+# REFERENCE STRATEGIES (stdlib)
+# Same API and same order as the queues in DS: bigger key first,
+# ties in insertion order.
+# -----------------------------
+class HeapqQueue:
+    """heapq min-heap of (-key, counter, task)."""
+
+    def __init__(self, key=None):
+        self._key = key or priority_key
+        self._heap = []
+        self._counter = 0
+
+    def _negated(self, task):
+        key = self._key(task)
+        return tuple(-part for part in key) if isinstance(key, tuple) else -key
+
+    def push(self, task):
+        heapq.heappush(self._heap, (self._negated(task), self._counter, task))
+        self._counter += 1
+
+    def push_all(self, tasks):
+        for task in tasks:
+            self._heap.append((self._negated(task), self._counter, task))
+            self._counter += 1
+        heapq.heapify(self._heap)
+
+    def pop(self):
+        return heapq.heappop(self._heap)[2] if self._heap else None
+
+    def peek(self):
+        return self._heap[0][2] if self._heap else None
+
+    def get_all(self):
+        return [entry[2] for entry in sorted(self._heap)]
+
+    def size(self):
+        return len(self._heap)
+
+
+class SortedQueue:
+    """Plain list, sorted once on demand; pops from the end."""
+
+    def __init__(self, key=None):
+        self._key = key or priority_key
+        self._items = []  # (key, -counter, task)
+        self._counter = 0
+        self._dirty = False
+
+    def push(self, task):
+        self._items.append((self._key(task), -self._counter, task))
+        self._counter += 1
+        self._dirty = True
+
+    def push_all(self, tasks):
+        for task in tasks:
+            self.push(task)
+
+    def _ordered(self):
+        # Ascending, so the next task is last; the counter is unique,
+        # so the task dicts are never compared
+        if self._dirty:
+            self._items.sort(key=lambda entry: entry[:2])
+            self._dirty = False
+        return self._items
+
+    def pop(self):
+        items = self._ordered()
+        return items.pop()[2] if items else None
+
+    def peek(self):
+        items = self._ordered()
+        return items[-1][2] if items else None
+
+    def get_all(self):
+        return [entry[2] for entry in reversed(self._ordered())]
+
+    def size(self):
+        return len(self._items)
+
+
+REFERENCE_QUEUES = {"heapq": HeapqQueue, "sorted": SortedQueue}
+ALL_QUEUES = list(TASK_QUEUES) + list(REFERENCE_QUEUES)
+
+
+def make_queue(name, key):
+    if name in REFERENCE_QUEUES:
+        return REFERENCE_QUEUES[name](key=key)
+    return create_task_queue(name, key)
+
+
+# -----------------------------
+# DATASET
+# -----------------------------
+def make_tasks(n, mix, seed=42):
+    """n rows like employee.my_work's (task_id, title, status, priority, due_date)."""
+    rng = random.Random(f"{seed}:{mix}:{n}")
+    today = date.today()
+    priorities = rng.choices(("high", "medium", "low"), PRIORITY_MIXES[mix], k=n)
+    statuses = rng.choices(list(STATUS_WEIGHTS), list(STATUS_WEIGHTS.values()), k=n)
+    tasks = []
+    for i in range(n):
+        due = None if rng.random() < 0.1 else today + timedelta(days=rng.randint(-14, 60))
+        tasks.append(
+            RealDictRow(
+                task_id=i + 1,
+                title=f"Task {i + 1}",
+                status=statuses[i],
+                priority=priorities[i],
+                due_date=due,
+            )
+        )
+    return tasks
+
+
+# -----------------------------
+# MEASUREMENTS
+# -----------------------------
+def _timed(setup, run, repeat):
+    timings = []
+    for _ in range(repeat):
+        state = setup()
+        start = time.perf_counter()
+        run(state)
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings), statistics.median(timings)
+
+
+def _filled(name, key, tasks):
+    queue = make_queue(name, key)
+    queue.push_all(tasks)
+    return queue
+
+
+def _drain(queue):
+    while queue.pop() is not None:
+        pass
+
+
+def _peek_many(queue):
+    for _ in range(PEEK_CALLS):
+        queue.peek()
+
+
+def queue_bytes_per_task(name, key, tasks):
+    """Memory held by the queue itself (nodes + containers) per task."""
+    tracemalloc.start()
+    try:
+        queue = _filled(name, key, tasks)
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del queue
+    return current / len(tasks) if tasks else 0.0
+
+
+def bench_case(name, key, tasks, repeat):
+    """{op: (best, median)} for one queue on one dataset."""
+    filled = lambda: _filled(name, key, tasks)  # noqa: E731
+    memory = queue_bytes_per_task(name, key, tasks)
+    return {
+        "memory": (memory, memory),
+        "push_all": _timed(lambda: make_queue(name, key), lambda q: q.push_all(tasks), repeat),
+        "get_all": _timed(filled, lambda q: q.get_all(), repeat),
+        "pop": _timed(filled, _drain, repeat),
+        "peek": _timed(filled, _peek_many, repeat),
+    }
+
+
+def check_order(queues, key, tasks):
+    """Every queue must hand the tasks out in the same order."""
+    expected = None
+    for name in queues:
+        order = [task["task_id"] for task in _filled(name, key, tasks).get_all()]
+        if expected is None:
+            expected = order
+        elif order != expected:
+            raise AssertionError(f"{name} orders the tasks differently from {queues[0]}")
+
+
+def run_suite(queues, sizes, mixes, order, repeat, seed):
+    key = composite_key() if order == "composite" else None
+    if key is not None:
+        queues = [name for name in queues if name != "bucket"]  # priority only
+
+    results = []
+    for mix in mixes:
+        for n in sizes:
+            tasks = make_tasks(n, mix, seed)
+            if n <= 10_000:
+                check_order(queues, key, tasks)
+            # Big queues: fewer runs, the timings are long enough to be stable
+            runs = repeat if n < 100_000 else max(1, repeat // 3)
+            for name in queues:
+                for op, (best, median) in bench_case(name, key, tasks, runs).items():
+                    results.append(
+                        {
+                            "order": order,
+                            "queue": name,
+                            "mix": mix,
+                            "tasks": n,
+                            "op": op,
+                            "unit": "B/task" if op == "memory" else "ms",
+                            "best": round(best, 4),
+                            "median": round(median, 4),
+                        }
+                    )
+                print(f"  {mix:>8} {n:>8} {name:>8} done", file=sys.stderr)
+    return results
+
+
+# -----------------------------
+# REPORT / REGRESSIONS
+# -----------------------------
+def _case(result):
+    return (
+        result.get("order", "priority"),
+        result["queue"],
+        result["mix"],
+        result["tasks"],
+        result["op"],
+    )
+
+
+def find_regressions(results, baseline, threshold):
+    """
+    Compare against a baseline run. Returns (regressions, unmatched):
+    cases whose median grew by more than `threshold` (0.10 = 10%), and
+    cases of this run the baseline has no entry for.
+    """
+    before = {_case(r): r for r in baseline}
+    regressions = []
+    unmatched = []
+    for result in results:
+        old = before.get(_case(result))
+        if old is None:
+            unmatched.append(result)
+            continue
+        if not old["median"]:
+            continue
+        if result["unit"] == "ms" and result["median"] < MIN_MS:
+            continue
+        ratio = result["median"] / old["median"]
+        if ratio > 1 + threshold:
+            regressions.append({**result, "baseline": old["median"], "ratio": round(ratio, 3)})
+    return regressions, unmatched
+
+
+def print_report(results, out=sys.stdout):
+    cases = {}
+    for r in results:
+        cases.setdefault((r["mix"], r["tasks"], r["queue"]), {})[r["op"]] = r["median"]
+
+    print(
+        f"{'mix':>8} {'tasks':>8} {'queue':>8}  {'B/task':>7}"
+        + "".join(f"  {op:>10}" for op in OPS[1:])
+        + "   (median ms)",
+        file=out,
+    )
+    for (mix, n, queue), ops in cases.items():
+        print(
+            f"{mix:>8} {n:>8} {queue:>8}  {ops['memory']:>7.1f}"
+            + "".join(f"  {ops[op]:>10.3f}" for op in OPS[1:]),
+            file=out,
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the task queues against heapq / sorted baselines."
+    )
+    parser.add_argument("--queues", nargs="+", choices=ALL_QUEUES, default=ALL_QUEUES)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument(
+        "--mixes", nargs="+", choices=list(PRIORITY_MIXES), default=list(PRIORITY_MIXES)
+    )
+    parser.add_argument("--order", choices=("priority", "composite"), default="priority")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per op (best/median kept)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", metavar="PATH", help="write the results as JSON")
+    parser.add_argument("--baseline", metavar="PATH", help="earlier --json file to compare with")
+    parser.add_argument(
+        "--threshold", type=float, default=0.10, help="allowed slowdown vs baseline (0.10 = 10%%)"
+    )
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.queues, args.sizes, args.mixes, args.order, args.repeat, args.seed)
+    print_report(results)
+
+    if args.json:
+        report = {
+            "meta": {
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "platform": platform.platform(),
+                "order": args.order,
+                "repeat": args.repeat,
+                "seed": args.seed,
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            },
+            "results": results,
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions, unmatched = find_regressions(results, baseline, args.threshold)
+        for r in unmatched:
+            print(
+                f"NOT IN BASELINE {r.get('order', 'priority')} {r['queue']} {r['mix']} "
+                f"{r['tasks']} {r['op']}",
+                file=sys.stderr,
+            )
+        if results and len(unmatched) == len(results):
+            print("No case of this run is in the baseline, nothing compared", file=sys.stderr)
+            sys.exit(2)
+        for r in regressions:
+            print(
+                f"REGRESSION {r['queue']} {r['mix']} {r['tasks']} {r['op']}: "
+                f"{r['baseline']} → {r['median']} {r['unit']} ({r['ratio']}x)",
+                file=sys.stderr,
+            )
+        if regressions:
+            sys.exit(1)
+        compared = len(results) - len(unmatched)
+        print(
+            f"No regressions above {args.threshold:.0%} ({compared} cases compared)",
+            file=sys.stderr,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -6,14 +6,49 @@ from flask import (
     url_for,
     redirect,
     jsonify,
+    current_app,
+)
+from database.db import get_db, get_pool_stats
+from database.data_version import bump_user_projects
+from auth.hashing import (
+    PasswordHashBusyError,
+    get_hash_stats,
+    hash_password,
+    verify_password,
+)
+from database.progress import (
+    calculate_smart_progress,
+    get_completion_progress,
+    get_task_counts,
+    refresh_project_progress,
+    resync_project_progress,
+)
+from services.login_audit import get_audit_stats
+from auth.utils import forget_login_misses, get_current_user, invalidate_user
+from employee.work_queue import clear_work_queues
+from DS.TTLCache import TTLCache
+from .services import (
+    get_dashboard_kpis,
+    get_project_status_panel,
+    get_recent_projects,
+    get_risk_projects,
+    parse_trend_args,
+    recalculate_progress,
+    RECALC_CHUNK_SIZE,
 )
-from database.db import get_db
 from psycopg2.extras import RealDictCursor
 from datetime import datetime, date
+import hashlib
+import time
 
 
 admin_bp = Blueprint("admin", __name__, template_folder="../templates/admin")
 
+# Short server-side cache for /api/dashboard (seconds)
+DASHBOARD_CACHE_TTL = 10
+
+_dashboard_cache = TTLCache(ttl=DASHBOARD_CACHE_TTL, max_size=32)
+
 
 # ============================
 # LOGIN CHECK HELPER
@@ -35,102 +70,29 @@ def dashboard():
     if not admin_login_required():
         return redirect(url_for("auth.login"))
 
-    conn = get_db()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
     # -------------------------
-    # Admin Name
+    # Admin Name (cached, see auth.utils)
     # -------------------------
-    cur.execute(
-        """
-        SELECT name
-        FROM users
-        WHERE user_id = %s
-    """,
-        (session["user_id"],),
-    )
-
-    admin = cur.fetchone()
+    admin = get_current_user(session["user_id"])
     admin_name = admin["name"] if admin else "Admin"
 
     # -------------------------
-    # Total Users
-    # -------------------------
-    cur.execute(
-        """
-        SELECT COUNT(*) AS total
-        FROM users
-    """
-    )
-
-    total_users = cur.fetchone()["total"]
-
-    # -------------------------
-    # Active Projects
-    # -------------------------
-    cur.execute(
-        """
-    SELECT COUNT(*) AS total
-    FROM projects
-    WHERE status = 'ongoing'
-      AND is_deleted = FALSE
-    """
-    )
-
-    active_projects = cur.fetchone()["total"]
-
-    # -------------------------
-    # Overall Project Progress (Auto-calculated from task completion ratio)
-    # Formula: AVG( approved_tasks / total_tasks * 100 ) across all active projects
-    # -------------------------
-    cur.execute(
-        """
-    SELECT
-        ROUND(AVG(
-            CASE
-                WHEN task_counts.total_tasks = 0 THEN 0
-                ELSE task_counts.approved_tasks * 100.0 / task_counts.total_tasks
-            END
-        )) AS avg_progress
-    FROM (
-        SELECT
-            p.project_id,
-            COUNT(t.task_id) AS total_tasks,
-            COUNT(t.task_id) FILTER (WHERE t.status = 'approved') AS approved_tasks
-        FROM projects p
-        JOIN users u ON p.leader_id = u.user_id
-        LEFT JOIN tasks t ON t.project_id = p.project_id
-        WHERE p.is_deleted = FALSE
-          AND u.role = 'project_leader'
-        GROUP BY p.project_id
-    ) AS task_counts
-    """
-    )
-
-    project_data = cur.fetchone()
-
-    Overall_project_progress = (
-        project_data["avg_progress"] if project_data["avg_progress"] else 0
-    )
-
-    # -------------------------
-    # Overdue Projects
+    # Total Users / Active Projects / Overall Progress / Overdue Projects
+    # (one query, see services.get_dashboard_kpis)
     # -------------------------
-    cur.execute(
-        """
-    SELECT COUNT(*) AS total
-    FROM projects
-    WHERE status != 'completed'
-      AND end_date < NOW()
-      AND is_deleted = FALSE
-    """
-    )
+    conn = get_db()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
 
-    overdue_projects = cur.fetchone()["total"]
+    kpis = get_dashboard_kpis(cur)
 
     cur.close()
     conn.close()
 
+    total_users = kpis["total_users"]
+    active_projects = kpis["active_projects"]
+    Overall_project_progress = kpis["avg_progress"] if kpis["avg_progress"] else 0
+    overdue_projects = kpis["overdue_projects"]
+
     return render_template(
         "section/dashboard.html",
         admin_name=admin_name,
@@ -146,155 +108,111 @@ def dashboard():
 def project_status_api():
 
     conn = get_db()
-    cur = conn.cursor()
-
-    # ---------------- Status Count ----------------
+    cur = conn.cursor(cursor_factory=RealDictCursor)
 
-    cur.execute(
-        """
-    SELECT status, COUNT(*)
-    FROM projects
-    WHERE is_deleted = FALSE
-    GROUP BY status
-    """
-    )
+    # ?projects=&months=&points= bound the trend series (see services)
+    data = get_project_status_panel(cur, parse_trend_args(request.args))
 
-    status_rows = cur.fetchall()
+    cur.close()
+    conn.close()
 
-    status_data = []
+    return jsonify(data)
 
-    for row in status_rows:
-        status_data.append({"status": row[0], "total": row[1]})
 
-    # ---------------- Trend (Per Project) ----------------
+# /************* 3 section used in dashboard
+@admin_bp.route("/api/risk-projects")
+def risk_projects_api():
 
-    cur.execute(
-        """
-    SELECT
-        project_name,
-        TO_CHAR(created_at, 'YYYY-MM') AS month,
-        progress
-    FROM projects
-    WHERE is_deleted = FALSE
-    ORDER BY created_at
-    """
-    )
+    conn = get_db()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
 
-    trend_rows = cur.fetchall()
+    risks = get_risk_projects(cur)
 
-    trend_data = {}
+    cur.close()
+    conn.close()
 
-    for row in trend_rows:
+    return jsonify(risks)
 
-        name = row[0]
-        month = row[1]
-        progress = int(row[2])
 
-        if name not in trend_data:
-            trend_data[name] = []
+@admin_bp.route("/api/recent-projects")
+def recent_projects_api():
 
-        trend_data[name].append({"month": month, "progress": progress})
+    conn = get_db()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
 
-    # ---------------- Deadline ----------------
+    projects = get_recent_projects(cur)
 
-    cur.execute(
-        """
-        SELECT project_name, progress
-        FROM projects
-        WHERE is_deleted = FALSE
-        AND end_date IS NOT NULL
-        ORDER BY end_date ASC
-        LIMIT 6
-        """
-    )
+    cur.close()
+    conn.close()
 
-    deadline_rows = cur.fetchall()
+    return jsonify(projects)
 
-    deadline_data = []
 
-    for row in deadline_rows:
-        deadline_data.append({"project_name": row[0], "progress": row[1]})
+# All dashboard panels in one response (replaces the 3 calls above in admin.js)
+# Cached for a few seconds and served with an ETag, so repeated refreshes
+# from many open admin tabs cost a 304 and no DB work.
+@admin_bp.route("/api/dashboard")
+def dashboard_api():
 
-    # ---------------- Creation Rate ----------------
+    if not admin_login_required():
+        return jsonify({"error": "Unauthorized"}), 401
 
-    cur.execute(
-        """
-    SELECT TO_CHAR(created_at, 'YYYY-MM') AS month,
-           COUNT(*) AS total
-    FROM projects
-    WHERE is_deleted = FALSE
-    GROUP BY month
-    ORDER BY month
-    """
-    )
+    trend_args = parse_trend_args(request.args)
+    cache_key = tuple(sorted(trend_args.items()))
 
-    creation_rows = cur.fetchall()
+    cached = _dashboard_cache.get(cache_key)
 
-    creation_data = []
+    if cached is None:
+        conn = get_db()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
 
-    for row in creation_rows:
-        creation_data.append({"month": row[0], "total": row[1]})
+        panels = get_project_status_panel(cur, trend_args)
+        panels["risk"] = get_risk_projects(cur)
+        panels["recent"] = get_recent_projects(cur)
 
-    cur.close()
-    conn.close()
+        cur.close()
+        conn.close()
 
-    return jsonify(
-        {
-            "status": status_data,
-            "trend": trend_data,
-            "deadline": deadline_data,
-            "creation": creation_data,
-        }
-    )
+        body = current_app.json.dumps(panels)
+        cached = (body, hashlib.sha1(body.encode()).hexdigest())
+        _dashboard_cache.set(cache_key, cached)
 
+    body, etag = cached
 
-# /************* 3 section used in dashboard
-@admin_bp.route("/api/risk-projects")
-def risk_projects_api():
+    response = current_app.response_class(body, mimetype="application/json")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response.make_conditional(request)
 
-    conn = get_db()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
 
-    cur.execute(
-        """
-    SELECT project_name, progress, end_date
-    FROM projects
-    WHERE progress < 40
-      AND end_date < NOW() + INTERVAL '7 days'
-      AND is_deleted = FALSE
-    """
-    )
+# DB connection pool usage (in use / waits / timeouts)
+@admin_bp.route("/api/db-pool-stats")
+def db_pool_stats_api():
 
-    risks = cur.fetchall()
+    if not admin_login_required():
+        return jsonify({"error": "Unauthorized"}), 401
 
-    cur.close()
-    conn.close()
+    return jsonify(get_pool_stats())
 
-    return jsonify(risks)
 
+# Password hashing cost and latency percentiles (p50 / p95 / p99)
+@admin_bp.route("/api/password-hash-stats")
+def password_hash_stats_api():
 
-@admin_bp.route("/api/recent-projects")
-def recent_projects_api():
+    if not admin_login_required():
+        return jsonify({"error": "Unauthorized"}), 401
 
-    conn = get_db()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
+    return jsonify(get_hash_stats())
 
-    cur.execute(
-        """
-    SELECT project_name, status, progress, end_date
-    FROM projects
-    WHERE is_deleted = FALSE
-    ORDER BY created_at DESC
-    LIMIT 5
-    """
-    )
 
-    projects = cur.fetchall()
+# Login audit writer: queued / written / dropped events, pending backlog
+@admin_bp.route("/api/login-audit-stats")
+def login_audit_stats_api():
 
-    cur.close()
-    conn.close()
+    if not admin_login_required():
+        return jsonify({"error": "Unauthorized"}), 401
 
-    return jsonify(projects)
+    return jsonify(get_audit_stats())
 
 
 @admin_bp.route("/projects", methods=["GET", "POST"])
@@ -791,19 +709,7 @@ def edit_project(project_id):
         name = request.form.get("project_name")
         # AUTO-CALCULATE progress from task completion ratio
         # Formula: ROUND(approved_tasks * 100.0 / total_tasks)
-        cur.execute(
-            """
-            SELECT CASE
-                WHEN COUNT(*) = 0 THEN 0
-                ELSE ROUND(COUNT(*) FILTER (WHERE status = 'approved') * 100.0 / COUNT(*))
-            END AS calculated_progress
-            FROM tasks
-            WHERE project_id = %s
-            """,
-            (project_id,),
-        )
-        task_result = cur.fetchone()
-        progress = int(task_result["calculated_progress"]) if task_result else 0
+        progress = get_completion_progress(cur, project_id)
         start_date = request.form.get("start_date")
         end_date = request.form.get("end_date")
         description = request.form.get("description")
@@ -888,6 +794,13 @@ def edit_project(project_id):
                     (project_id,),
                 )
 
+            # membership decides which tasks count towards progress
+            resync_project_progress(cur, project_id)
+        else:
+            # the ratio above only picks the status; the stored value
+            # follows the progress engine like everywhere else
+            refresh_project_progress(cur, project_id)
+
         conn.commit()
 
         return jsonify(
@@ -935,6 +848,8 @@ def delete_project(project_id):
     )
 
     conn.commit()
+    # its tasks must drop out of cached My Work lists
+    clear_work_queues()
 
     cur.close()
     conn.close()
@@ -986,7 +901,7 @@ def employees():
             cur.execute(
                 """
                 SELECT user_id FROM users
-                WHERE email = %s
+                WHERE lower(email) = lower(%s)
                 """,
                 (email,),
             )
@@ -1345,8 +1260,10 @@ def edit_employee(id):
         """,
         (designation, role, id),
     )
+    bump_user_projects(cur, id)  # reports print the designation
 
     conn.commit()
+    invalidate_user(id)
     cur.close()
     conn.close()
 
@@ -1640,9 +1557,15 @@ def profile():
                     }
                 )
 
+            # "@" means email at login, so a username can't contain it
+            if "@" in username:
+                return jsonify(
+                    {"status": "error", "message": "Username cannot contain @ ❌"}
+                )
+
             # Check username not taken by another user
             cur.execute(
-                "SELECT user_id FROM users WHERE username = %s AND user_id != %s",
+                "SELECT user_id FROM users WHERE lower(username) = lower(%s) AND user_id != %s",
                 (username, user_id),
             )
             if cur.fetchone():
@@ -1652,7 +1575,7 @@ def profile():
 
             # Check email not taken by another user
             cur.execute(
-                "SELECT user_id FROM users WHERE email = %s AND user_id != %s",
+                "SELECT user_id FROM users WHERE lower(email) = lower(%s) AND user_id != %s",
                 (email, user_id),
             )
             if cur.fetchone():
@@ -1670,8 +1593,11 @@ def profile():
                 """,
                 (name, email, username, user_id),
             )
+            bump_user_projects(cur, user_id)  # reports print the name
 
             conn.commit()
+            invalidate_user(user_id)
+            forget_login_misses(email, username)
 
             return jsonify(
                 {"status": "success", "message": "Profile updated successfully ✅"}
@@ -1767,8 +1693,8 @@ def change_password():
         if not row:
             return jsonify({"status": "error", "message": "Auth record not found"})
 
-        # Verify current password
-        if row["password_hash"] != current_password:
+        # Verify current password (bcrypt hash, or a legacy plaintext row)
+        if not verify_password(row["password_hash"], current_password)[0]:
             return jsonify(
                 {"status": "error", "message": "Current password is incorrect ❌"}
             )
@@ -1790,7 +1716,7 @@ def change_password():
                 updated_at = CURRENT_TIMESTAMP
             WHERE user_id = %s
             """,
-            (new_password, user_id),
+            (hash_password(new_password), user_id),
         )
 
         conn.commit()
@@ -1799,6 +1725,12 @@ def change_password():
             {"status": "success", "message": "Password updated successfully ✅"}
         )
 
+    except PasswordHashBusyError as e:
+        if conn:
+            conn.rollback()
+        print("Change Password Busy:", e)
+        return jsonify({"status": "error", "message": "Server busy, please try again"}), 503
+
     except Exception as e:
         if conn:
             conn.rollback()
@@ -1877,6 +1809,7 @@ def review_project(project_id):
                 """,
                 (project_id,),
             )
+            resync_project_progress(cur, project_id)
 
             notif_title = "Project Accepted"
             notif_message = f"Congratulations! Your project '{project['project_name']}' has been reviewed and accepted by the admin."
@@ -1892,6 +1825,8 @@ def review_project(project_id):
                 """,
                 (project_id,),
             )
+            # the leader approval bonus (C3) no longer applies
+            refresh_project_progress(cur, project_id)
             notif_title = "Project Sent Back for Revision"
             notif_message = f"Your project '{project['project_name']}' was rejected by the admin and needs further work."
             if reason:
@@ -1992,40 +1927,6 @@ def pending_review_projects():
     return jsonify(projects)
 
 
-def calculate_smart_progress(status, total_tasks, approved_tasks):
-    """
-    Smart progress formula based on project lifecycle + task completion.
-
-    Rules:
-      - initiated  (no leader, no tasks)  => always 0%
-      - ongoing, 0 tasks                  => 1%  (leader assigned, work not started)
-      - ongoing, tasks exist              => 10% + FLOOR(approved/total * 89%)
-                                             capped at 90% max until formally submitted
-      - completed  (leader submitted)     => 95%
-      - closed     (admin accepted)       => 100%
-
-    Also returns display_label like "45% (3/7 tasks)" to avoid 1/1=100% confusion.
-    """
-    if status == "closed":
-        progress = 100
-    elif status == "completed":
-        progress = 95
-    elif status == "initiated":
-        progress = 0
-    elif status == "ongoing":
-        if total_tasks == 0:
-            # Leader assigned but no tasks created yet
-            progress = 1
-        else:
-            # 10% base (leader working) + up to 80% from task ratio, capped at 90%
-            task_ratio = approved_tasks / total_tasks
-            progress = min(10 + int(task_ratio * 80), 90)
-    else:
-        progress = 0
-
-    return progress
-
-
 @admin_bp.route("/api/project_progress/<int:project_id>")
 def get_project_progress(project_id):
     """
@@ -2038,29 +1939,14 @@ def get_project_progress(project_id):
     conn = get_db()
     cur = conn.cursor(cursor_factory=RealDictCursor)
 
-    cur.execute(
-        """
-        SELECT
-            p.status,
-            COUNT(t.task_id) AS total_tasks,
-            COUNT(t.task_id) FILTER (WHERE t.status = 'approved') AS approved_tasks
-        FROM projects p
-        LEFT JOIN tasks t ON t.project_id = p.project_id
-        WHERE p.project_id = %s
-        GROUP BY p.status
-        """,
-        (project_id,),
-    )
-    result = cur.fetchone()
+    result = get_task_counts(cur, project_id)
     cur.close()
     conn.close()
 
     if not result:
         return jsonify({"error": "Project not found"}), 404
 
-    status = result["status"]
-    total_tasks = int(result["total_tasks"])
-    approved_tasks = int(result["approved_tasks"])
+    status, total_tasks, approved_tasks = result
     progress = calculate_smart_progress(status, total_tasks, approved_tasks)
 
     # e.g. "45% (3/7 tasks)" — shows admin the real picture
@@ -2089,64 +1975,58 @@ def recalculate_all_progress():
       ongoing + tasks   => 10% + floor(approved/total * 80%), capped at 90%
       completed  => 95%
       closed     => 100%
+
+    Runs set-based (see services.recalculate_progress), ?chunk_size= projects
+    per statement/commit; only rows whose progress changed are written and
+    returned, the overall average comes back in stats.avg_progress.
     """
     if not admin_login_required():
         return jsonify({"error": "Unauthorized"}), 401
 
+    try:
+        chunk_size = int(request.args.get("chunk_size", RECALC_CHUNK_SIZE))
+    except ValueError:
+        chunk_size = RECALC_CHUNK_SIZE
+    chunk_size = max(1, chunk_size)
+
     conn = get_db()
     cur = conn.cursor(cursor_factory=RealDictCursor)
 
     try:
-        # Fetch all non-deleted projects with task counts
-        cur.execute(
-            """
-            SELECT
-                p.project_id,
-                p.project_name,
-                p.status,
-                COUNT(t.task_id) AS total_tasks,
-                COUNT(t.task_id) FILTER (WHERE t.status = 'approved') AS approved_tasks
-            FROM projects p
-            LEFT JOIN tasks t ON t.project_id = p.project_id
-            WHERE p.is_deleted = FALSE
-            GROUP BY p.project_id, p.project_name, p.status
-            """
-        )
-        projects = cur.fetchall()
+        started = time.perf_counter()
+        # one commit per chunk: the route owns the transaction
+        changed, totals = recalculate_progress(cur, chunk_size, after_chunk=conn.commit)
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
 
-        updated = []
-        for p in projects:
-            progress = calculate_smart_progress(
-                p["status"],
-                int(p["total_tasks"]),
-                int(p["approved_tasks"]),
-            )
-            cur.execute(
-                """
-                UPDATE projects
-                SET progress = %s, updated_at = NOW()
-                WHERE project_id = %s
-                """,
-                (progress, p["project_id"]),
-            )
-            updated.append(
-                {
-                    "project_id": p["project_id"],
-                    "project_name": p["project_name"],
-                    "status": p["status"],
-                    "total_tasks": int(p["total_tasks"]),
-                    "approved_tasks": int(p["approved_tasks"]),
-                    "progress": progress,
-                    "display_label": f"{progress}% ({p['approved_tasks']}/{p['total_tasks']} tasks)",
-                }
-            )
+        scanned = totals["scanned"]
+        avg_progress = round(totals["progress_sum"] / scanned, 1) if scanned else 0
 
-        conn.commit()
         return jsonify(
             {
                 "status": "success",
-                "message": f"Progress recalculated for {len(updated)} projects",
-                "projects": updated,
+                "message": f"Progress recalculated for {scanned} projects",
+                # only the projects whose progress changed
+                "projects": [
+                    {
+                        "project_id": p["project_id"],
+                        "project_name": p["project_name"],
+                        "status": p["status"],
+                        "total_tasks": int(p["total_tasks"]),
+                        "approved_tasks": int(p["approved_tasks"]),
+                        "progress": p["progress"],
+                        "display_label": f"{p['progress']}% ({p['approved_tasks']}/{p['total_tasks']} tasks)",
+                    }
+                    for p in changed
+                ],
+                "stats": {
+                    "scanned": scanned,
+                    "updated": totals["updated"],
+                    "unchanged": scanned - totals["updated"],
+                    "avg_progress": avg_progress,
+                    "chunks": totals["chunks"],
+                    "chunk_size": chunk_size,
+                    "elapsed_ms": elapsed_ms,
+                },
             }
         )
 
@@ -0,0 +1,354 @@
+# ============================
+# ADMIN SERVICES (DB logic shared by admin routes)
+# ============================
+
+
+def get_dashboard_kpis(cur):
+    """
+    All admin dashboard KPI cards in a single round trip.
+
+    Average progress reads the per-project counters of the progress engine
+    (database/progress.py, one row per project) instead of joining the tasks
+    table, so the cost follows the number of projects rather than tasks.
+
+    Formula for progress: AVG( approved_tasks / total_tasks * 100 )
+    across all non-deleted projects that have a project leader.
+    """
+    cur.execute(
+        """
+    SELECT
+        (SELECT COUNT(*) FROM users) AS total_users,
+
+        (
+            SELECT COUNT(*)
+            FROM projects
+            WHERE status = 'ongoing'
+              AND is_deleted = FALSE
+        ) AS active_projects,
+
+        (
+            SELECT ROUND(AVG(
+                CASE
+                    WHEN task_counts.total_tasks = 0 THEN 0
+                    ELSE task_counts.approved_tasks * 100.0 / task_counts.total_tasks
+                END
+            ))
+            FROM (
+                SELECT
+                    COALESCE(pp.total_tasks, 0) AS total_tasks,
+                    COALESCE(pp.approved_tasks, 0) AS approved_tasks
+                FROM projects p
+                JOIN users u ON p.leader_id = u.user_id
+                LEFT JOIN project_progress pp ON pp.project_id = p.project_id
+                WHERE p.is_deleted = FALSE
+                  AND u.role = 'project_leader'
+            ) AS task_counts
+        ) AS avg_progress,
+
+        (
+            SELECT COUNT(*)
+            FROM projects
+            WHERE status != 'completed'
+              AND end_date < NOW()
+              AND is_deleted = FALSE
+        ) AS overdue_projects
+    """
+    )
+    return cur.fetchone()
+
+
+def get_project_status_panel(cur, trend_args=None):
+    """
+    Project overview charts: status donut, per-project trend, deadlines,
+    creation rate. `trend_args` is passed on to get_progress_trend().
+    """
+
+    # ---------------- Status Count ----------------
+    cur.execute(
+        """
+    SELECT status, COUNT(*) AS total
+    FROM projects
+    WHERE is_deleted = FALSE
+    GROUP BY status
+    """
+    )
+
+    status_data = [
+        {"status": row["status"], "total": row["total"]} for row in cur.fetchall()
+    ]
+
+    # ---------------- Trend (Per Project) ----------------
+    trend_data = get_progress_trend(cur, **(trend_args or {}))
+
+    # ---------------- Deadline ----------------
+    cur.execute(
+        """
+        SELECT project_name, progress
+        FROM projects
+        WHERE is_deleted = FALSE
+        AND end_date IS NOT NULL
+        ORDER BY end_date ASC
+        LIMIT 6
+        """
+    )
+
+    deadline_data = [
+        {"project_name": row["project_name"], "progress": row["progress"]}
+        for row in cur.fetchall()
+    ]
+
+    # ---------------- Creation Rate ----------------
+    cur.execute(
+        """
+    SELECT TO_CHAR(created_at, 'YYYY-MM') AS month,
+           COUNT(*) AS total
+    FROM projects
+    WHERE is_deleted = FALSE
+    GROUP BY month
+    ORDER BY month
+    """
+    )
+
+    creation_data = [
+        {"month": row["month"], "total": row["total"]} for row in cur.fetchall()
+    ]
+
+    return {
+        "status": status_data,
+        "trend": trend_data,
+        "deadline": deadline_data,
+        "creation": creation_data,
+    }
+
+
+# Trend limits — the series never holds more than
+# TREND_MAX_PROJECTS x TREND_MAX_POINTS values, however old the data gets
+TREND_DEFAULT_PROJECTS = 10
+TREND_DEFAULT_MONTHS = 12
+TREND_DEFAULT_POINTS = 12
+TREND_MAX_PROJECTS = 50
+TREND_MAX_MONTHS = 120
+TREND_MAX_POINTS = 60
+
+
+def parse_trend_args(args):
+    """Read ?projects=&months=&points= from a request, clamped to the limits above."""
+
+    def clamp(name, default, upper):
+        try:
+            value = int(args.get(name, default))
+        except (TypeError, ValueError):
+            value = default
+        return max(1, min(value, upper))
+
+    return {
+        "top_n": clamp("projects", TREND_DEFAULT_PROJECTS, TREND_MAX_PROJECTS),
+        "months": clamp("months", TREND_DEFAULT_MONTHS, TREND_MAX_MONTHS),
+        "max_points": clamp("points", TREND_DEFAULT_POINTS, TREND_MAX_POINTS),
+    }
+
+
+def get_progress_trend(
+    cur,
+    top_n=TREND_DEFAULT_PROJECTS,
+    months=TREND_DEFAULT_MONTHS,
+    max_points=TREND_DEFAULT_POINTS,
+):
+    """
+    Average progress per project per time bucket, for the `top_n` most
+    recently created projects in the last `months` months.
+
+    Months are merged into buckets of `width` months so no series has more
+    than `max_points` points; the bucketing and AVG run in SQL, Python only
+    lays the rows out as {project_name: [{"month", "progress"}, ...]} with
+    one entry per bucket (progress is None where a project has no data).
+    """
+    width = -(-months // max_points)  # ceil
+    buckets = -(-months // width)
+
+    cur.execute(
+        """
+    WITH windowed AS (
+        SELECT
+            p.project_name,
+            COALESCE(p.progress, 0) AS progress,
+            p.created_at,
+            GREATEST(0, (
+                EXTRACT(YEAR FROM age(date_trunc('month', NOW()), date_trunc('month', p.created_at))) * 12
+                + EXTRACT(MONTH FROM age(date_trunc('month', NOW()), date_trunc('month', p.created_at)))
+            )::int) AS months_ago
+        FROM projects p
+        WHERE p.is_deleted = FALSE
+          AND p.created_at >= date_trunc('month', NOW()) - make_interval(months => %(months)s - 1)
+    ),
+    top_projects AS (
+        SELECT project_name, ROW_NUMBER() OVER (ORDER BY MAX(created_at) DESC) AS rank
+        FROM windowed
+        GROUP BY project_name
+        ORDER BY rank
+        LIMIT %(top_n)s
+    )
+    SELECT
+        w.project_name,
+        w.months_ago / %(width)s AS bucket,
+        ROUND(AVG(w.progress)) AS progress,
+        (EXTRACT(YEAR FROM NOW()) * 12 + EXTRACT(MONTH FROM NOW()) - 1)::int AS this_month
+    FROM windowed w
+    JOIN top_projects t ON t.project_name = w.project_name
+    GROUP BY w.project_name, t.rank, bucket
+    ORDER BY t.rank
+    """,
+        {"months": months, "top_n": top_n, "width": width},
+    )
+    rows = cur.fetchall()
+
+    if not rows:
+        return {}
+
+    # bucket b covers months_ago b*width .. b*width + width - 1; label it
+    # with its oldest month (clipped to the requested range). The current
+    # month comes from the same NOW() the buckets were computed with.
+    this_month = rows[0]["this_month"]
+    labels = []
+    for bucket in range(buckets - 1, -1, -1):
+        month_index = this_month - min(bucket * width + width - 1, months - 1)
+        labels.append(f"{month_index // 12:04d}-{month_index % 12 + 1:02d}")
+
+    trend_data = {}
+    for row in rows:
+        series = trend_data.setdefault(
+            row["project_name"],
+            [{"month": label, "progress": None} for label in labels],
+        )
+        series[buckets - 1 - int(row["bucket"])]["progress"] = int(row["progress"])
+
+    return trend_data
+
+
+def get_risk_projects(cur):
+    """Projects under 40% progress that are due within a week."""
+    cur.execute(
+        """
+    SELECT project_name, progress, end_date
+    FROM projects
+    WHERE progress < 40
+      AND end_date < NOW() + INTERVAL '7 days'
+      AND is_deleted = FALSE
+    """
+    )
+    return cur.fetchall()
+
+
+def get_recent_projects(cur):
+    cur.execute(
+        """
+    SELECT project_name, status, progress, end_date
+    FROM projects
+    WHERE is_deleted = FALSE
+    ORDER BY created_at DESC
+    LIMIT 5
+    """
+    )
+    return cur.fetchall()
+
+
+# Projects handled per UPDATE statement in recalculate_progress
+RECALC_CHUNK_SIZE = 1000
+
+
+def recalculate_progress(cur, chunk_size=RECALC_CHUNK_SIZE, after_chunk=None):
+    """
+    Set-based version of calculate_smart_progress() for every non-deleted
+    project.
+
+    Each chunk of `chunk_size` projects (in project_id order) is one
+    statement: task counts come from project_progress, the smart formula
+    runs in SQL and a single UPDATE ... FROM writes only the rows whose
+    progress actually changed. Runs in the caller's transaction and never
+    commits itself: `after_chunk()` is called after every chunk, and the
+    route passes conn.commit so row locks are held briefly even for very
+    large tenants.
+
+    Only the rows that changed are kept, so memory follows the number of
+    updates, not the size of the tenant. Returns (changed, totals): the
+    changed projects with their counts and new progress, and
+    {"scanned", "updated", "chunks", "progress_sum"} over all projects.
+    """
+    changed = []
+    totals = {"scanned": 0, "updated": 0, "chunks": 0, "progress_sum": 0}
+    last_id = 0
+
+    while True:
+        cur.execute(
+            """
+        WITH counts AS (
+            SELECT
+                p.project_id,
+                p.project_name,
+                p.status,
+                COALESCE(pp.total_tasks, 0) AS total_tasks,
+                COALESCE(pp.approved_tasks, 0) AS approved_tasks
+            FROM projects p
+            LEFT JOIN project_progress pp ON pp.project_id = p.project_id
+            WHERE p.is_deleted = FALSE
+              AND p.project_id > %(last_id)s
+            ORDER BY p.project_id
+            LIMIT %(chunk_size)s
+        ),
+        calc AS (
+            SELECT
+                counts.*,
+                CASE
+                    WHEN status = 'closed'    THEN 100
+                    WHEN status = 'completed' THEN 95
+                    WHEN status = 'initiated' THEN 0
+                    WHEN status = 'ongoing' AND total_tasks = 0 THEN 1
+                    WHEN status = 'ongoing'
+                        THEN LEAST(10 + FLOOR(approved_tasks * 80.0 / total_tasks), 90)
+                    ELSE 0
+                END::int AS progress
+            FROM counts
+        ),
+        updated AS (
+            UPDATE projects p
+            SET progress = c.progress, updated_at = NOW()
+            FROM calc c
+            WHERE p.project_id = c.project_id
+              AND p.progress IS DISTINCT FROM c.progress
+            RETURNING p.project_id
+        )
+        SELECT
+            (SELECT COUNT(*) FROM calc) AS scanned,
+            (SELECT MAX(project_id) FROM calc) AS last_id,
+            (SELECT COALESCE(SUM(progress), 0) FROM calc) AS progress_sum,
+            (SELECT COALESCE(json_agg(json_build_object(
+                        'project_id', c.project_id,
+                        'project_name', c.project_name,
+                        'status', c.status,
+                        'total_tasks', c.total_tasks,
+                        'approved_tasks', c.approved_tasks,
+                        'progress', c.progress
+                    ) ORDER BY c.project_id), '[]')
+             FROM calc c
+             JOIN updated u ON u.project_id = c.project_id) AS changed
+        """,
+            {"last_id": last_id, "chunk_size": chunk_size},
+        )
+        chunk = cur.fetchone()
+        if after_chunk is not None:
+            after_chunk()
+
+        if not chunk["scanned"]:
+            break
+
+        totals["chunks"] += 1
+        totals["scanned"] += chunk["scanned"]
+        totals["updated"] += len(chunk["changed"])
+        totals["progress_sum"] += int(chunk["progress_sum"])
+        changed.extend(chunk["changed"])
+        last_id = chunk["last_id"]
+
+        if chunk["scanned"] < chunk_size:
+            break
+
+    return changed, totals
@@ -1,8 +1,15 @@
+import os
 from flask import Flask, render_template, redirect, session, url_for
 from flask_mail import Mail, Message
 from auth import auth_bp
 from admin import admin_bp
-from database.db import get_db
+from auth.hashing import init_app as init_password_hashing
+from auth.utils import get_current_user
+from database.db import init_app as init_db
+from services.login_audit import init_app as init_login_audit
+from services.pdf_renderer import init_app as init_pdf_renderer
+from services.mail_queue import init_app as init_mail_queue
+from services.report_cache import init_app as init_report_cache
 from leader import project_leader_bp
 from employee import employee_bp
 
@@ -20,6 +27,45 @@ app.config["MAIL_DEFAULT_SENDER"] = "sharingcode14@gmail.com"
 
 mail = Mail(app)
 
+# Priority queue behind employee "My Work": "heap", "bucket" or "indexed"
+# (DS/TaskQueueFactory.py). "indexed" lists are cached per user and patched
+# in place by the task routes instead of being re-queried.
+app.config["TASK_QUEUE"] = "indexed"
+# "priority" (high → low only) or "composite": priority, overdue first,
+# due date, then status (DS/TaskPriorityQueue.composite_key)
+app.config["TASK_ORDER"] = "composite"
+# Gzip streamed CSV exports for clients that send Accept-Encoding: gzip
+app.config["EXPORT_GZIP"] = True
+
+# Pooled database connections (returned to the pool on app context teardown)
+init_db(app)
+
+# Report PDFs render in worker processes, off the request thread
+app.config["PDF_RENDER_WORKERS"] = 2
+app.config["PDF_RENDER_QUEUE_SIZE"] = 8
+app.config["PDF_RENDER_TIMEOUT"] = 30.0
+init_pdf_renderer(app)
+
+# Rendered report PDFs, keyed by project data version (LRU on disk)
+app.config["REPORT_CACHE_DIR"] = os.path.join(app.instance_path, "report_cache")
+app.config["REPORT_CACHE_MAX_BYTES"] = 64 * 1024 * 1024
+init_report_cache(app)
+
+# bcrypt cost is calibrated on each process's first hash so one takes
+# ~TARGET_MS here; set PASSWORD_HASH_ROUNDS to skip the measurement.
+app.config["PASSWORD_HASH_TARGET_MS"] = 250.0
+app.config["PASSWORD_HASH_WORKERS"] = 4
+init_password_hashing(app)
+
+# Outgoing mail goes through the mail_queue table and a background worker
+# (services/mail_queue.py), using the MAIL_* server settings above
+init_mail_queue(app)
+
+# Successful logins are queued and written to login_logs in batches
+app.config["LOGIN_AUDIT_BATCH_SIZE"] = 500
+app.config["LOGIN_AUDIT_FLUSH_INTERVAL"] = 1.0
+init_login_audit(app)
+
 # Register Blueprints
 app.register_blueprint(auth_bp, url_prefix="/auth")
 app.register_blueprint(admin_bp, url_prefix="/admin")
@@ -51,14 +97,8 @@ if __name__ == "__main__":
 @app.context_processor
 def inject_user():
     if "user_id" in session:
-        conn = get_db()
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT name, role FROM users WHERE user_id = %s", (session["user_id"],)
-        )
-        user = cur.fetchone()
-        cur.close()
-        conn.close()
+        # cached per user — the navbar doesn't touch the DB on a cache hit
+        user = get_current_user(session["user_id"])
         if user:
-            return dict(current_user={"name": user[0], "role": user[1]})
+            return dict(current_user={"name": user["name"], "role": user["role"]})
     return dict(current_user=None)
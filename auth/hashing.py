@@ -0,0 +1,258 @@
+import base64
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import bcrypt
+from flask import jsonify
+
+# -----------------------------
+# PASSWORD HASHING
+# -----------------------------
+# bcrypt is slow on purpose, so it runs on a small thread pool (bcrypt
+# releases the GIL while hashing, other requests keep running) with a
+# bounded number of jobs in flight. Unless `rounds` is configured, the
+# cost factor is calibrated lazily, on the first hash or verify of each
+# process, so one hash takes about `target_ms` on this host; importing
+# the app (gunicorn master, PDF render workers) costs nothing.
+#
+# auth.password_hash holds either a bcrypt hash ("$2b$...") or, for
+# accounts created before hashing, the plain password. verify_password()
+# accepts both and tells the caller when the stored value should be
+# replaced by a fresh hash (legacy value or lower cost than current).
+
+# Settings (override through app.config["PASSWORD_HASH_*"] in init_app)
+HASH_SETTINGS = {
+    "workers": 4,  # hashes computed at the same time
+    "max_pending": 32,  # jobs allowed in flight; more wait up to `timeout`
+    "timeout": 10.0,  # seconds to wait for a free slot / the result
+    "target_ms": 250.0,  # calibrate the cost so one hash takes about this long
+    "min_rounds": 10,
+    "max_rounds": 15,
+    "rounds": None,  # fixed cost factor; None → calibrate on first use
+}
+
+LATENCY_SAMPLES = 1024  # recent timings kept per operation for percentiles
+
+
+class PasswordHashBusyError(Exception):
+    """Raised when no hashing slot frees up, or the hash isn't done, within the timeout."""
+
+
+def _secret(password):
+    # bcrypt only looks at 72 bytes (bcrypt>=5 rejects longer input):
+    # longer passwords are pre-hashed so every byte still counts
+    data = password.encode("utf-8")
+    if len(data) > 72:
+        data = base64.b64encode(hashlib.sha256(data).digest())
+    return data
+
+
+def _is_bcrypt(stored):
+    return stored.startswith(("$2a$", "$2b$", "$2y$"))
+
+
+def _rounds_of(stored):
+    return int(stored.split("$")[2])
+
+
+def calibrate_rounds(target_ms, min_rounds=10, max_rounds=15):
+    """
+    Highest bcrypt cost whose hash takes at most target_ms here.
+
+    Each extra round doubles the work, so one cheap measurement at
+    cost 8 is enough to extrapolate.
+    """
+    password = b"calibration-password"
+    start = time.perf_counter()
+    bcrypt.hashpw(password, bcrypt.gensalt(8))
+    ms_at_8 = (time.perf_counter() - start) * 1000
+
+    rounds = min_rounds
+    while rounds < max_rounds and ms_at_8 * 2 ** (rounds + 1 - 8) <= target_ms:
+        rounds += 1
+    return rounds
+
+
+def _percentile(ordered, fraction):
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class PasswordHasher:
+    """bcrypt on a bounded thread pool, with latency percentiles."""
+
+    def __init__(self, rounds, workers=4, max_pending=32, timeout=10.0):
+        self.rounds = rounds
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="password-hash"
+        )
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._latency = {
+            "hash": deque(maxlen=LATENCY_SAMPLES),
+            "verify": deque(maxlen=LATENCY_SAMPLES),
+        }
+        self._counts = {"hash": 0, "verify": 0, "rehash": 0, "busy": 0}
+
+    def _run(self, op, func, *args):
+        if not self._slots.acquire(timeout=self.timeout):
+            self._count_busy()
+            raise PasswordHashBusyError("Too many logins in progress, try again")
+
+        start = time.perf_counter()
+        try:
+            future = self._executor.submit(func, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        # the slot is held until the job is really done, even if the caller
+        # stops waiting, so at most `max_pending` jobs are ever queued
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()  # only helps if it hasn't started yet
+            self._count_busy()
+            raise PasswordHashBusyError("Password check timed out, try again")
+        finally:
+            # queue wait included: this is what the request actually waited
+            elapsed = (time.perf_counter() - start) * 1000
+            with self._lock:
+                self._latency[op].append(elapsed)
+                self._counts[op] += 1
+
+    def _count_busy(self):
+        with self._lock:
+            self._counts["busy"] += 1
+
+    def hash(self, password):
+        salt = bcrypt.gensalt(self.rounds)
+        return self._run("hash", bcrypt.hashpw, _secret(password), salt).decode("ascii")
+
+    def verify(self, stored, password):
+        """
+        Check a password against the stored value.
+        Returns (matches, needs_rehash).
+        """
+        if not stored or not password:
+            return False, False
+
+        if not _is_bcrypt(stored):
+            # legacy plaintext row
+            matches = hmac.compare_digest(stored.encode("utf-8"), password.encode("utf-8"))
+            return matches, matches
+
+        matches = self._run(
+            "verify", bcrypt.checkpw, _secret(password), stored.encode("ascii")
+        )
+        return matches, matches and _rounds_of(stored) < self.rounds
+
+    def count_rehash(self):
+        with self._lock:
+            self._counts["rehash"] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = {"rounds": self.rounds, **self._counts}
+            for op, samples in self._latency.items():
+                ordered = sorted(samples)
+                stats[f"{op}_ms"] = (
+                    {
+                        "p50": round(_percentile(ordered, 0.50), 1),
+                        "p95": round(_percentile(ordered, 0.95), 1),
+                        "p99": round(_percentile(ordered, 0.99), 1),
+                        "max": round(ordered[-1], 1),
+                    }
+                    if ordered
+                    else None
+                )
+        return stats
+
+
+_hasher = None
+_hasher_pid = None
+_hasher_lock = threading.Lock()
+
+
+def get_hasher():
+    """
+    Return this process's hasher, building it (and calibrating the cost)
+    on first use and again after a fork, since pool threads don't survive one.
+    """
+    global _hasher, _hasher_pid
+
+    if _hasher is not None and _hasher_pid == os.getpid():
+        return _hasher
+
+    with _hasher_lock:
+        if _hasher is None or _hasher_pid != os.getpid():
+            rounds = HASH_SETTINGS["rounds"] or calibrate_rounds(
+                HASH_SETTINGS["target_ms"],
+                HASH_SETTINGS["min_rounds"],
+                HASH_SETTINGS["max_rounds"],
+            )
+            _hasher = PasswordHasher(
+                rounds,
+                workers=HASH_SETTINGS["workers"],
+                max_pending=HASH_SETTINGS["max_pending"],
+                timeout=HASH_SETTINGS["timeout"],
+            )
+            _hasher_pid = os.getpid()
+            print(f"Password hashing: bcrypt cost {rounds}")
+    return _hasher
+
+
+def hash_password(password):
+    """bcrypt hash of `password` to store in auth.password_hash."""
+    return get_hasher().hash(password)
+
+
+def verify_password(stored, password):
+    """(matches, needs_rehash) — see PasswordHasher.verify."""
+    return get_hasher().verify(stored, password)
+
+
+def rehash_if_needed(cur, user_id, password, needs_rehash):
+    """
+    After a successful login: store a fresh hash when the stored value was
+    plaintext or weaker than the current cost. The caller commits.
+    """
+    if not needs_rehash:
+        return False
+    cur.execute(
+        """
+        UPDATE auth
+        SET password_hash = %s, updated_at = CURRENT_TIMESTAMP
+        WHERE user_id = %s
+        """,
+        (hash_password(password), user_id),
+    )
+    get_hasher().count_rehash()
+    return True
+
+
+def get_hash_stats():
+    return get_hasher().stats()
+
+
+def _busy_response(error):
+    print("PASSWORD HASH BUSY:", error)
+    return jsonify({"success": False, "message": "Server busy, please try again"}), 503
+
+
+def init_app(app):
+    # routes that don't catch it themselves answer 503, not 500
+    app.register_error_handler(PasswordHashBusyError, _busy_response)
+
+    for key in HASH_SETTINGS:
+        config_key = "PASSWORD_HASH_" + key.upper()
+        if config_key in app.config:
+            HASH_SETTINGS[key] = app.config[config_key]
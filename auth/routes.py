@@ -8,6 +8,15 @@ from flask import (
     redirect,
 )
 from database.db import get_db
+from auth.hashing import (
+    PasswordHashBusyError,
+    hash_password,
+    rehash_if_needed,
+    verify_password,
+)
+from services.login_audit import record_login
+from services.mail_queue import enqueue_mail
+from auth.utils import cache_user, forget_login_misses, resolve_login
 
 # below for the forget pass
 import random
@@ -47,24 +56,12 @@ def login():
             conn = get_db()
             cur = conn.cursor()
 
-            # Fetch user INCLUDING NAME
-            cur.execute(
-                """
-                SELECT 
-                    u.user_id,
-                    u.name,
-                    u.role,
-                    a.password_hash,
-                    u.is_active,
-                    u.is_registered
-                FROM users u
-                JOIN auth a ON u.user_id = a.user_id
-                WHERE u.email = %s OR u.username = %s
-            """,
-                (email_or_username, email_or_username),
-            )
-
-            user = cur.fetchone()
+            # Fetch user INCLUDING NAME (one probe of the email or username index)
+            # Misses are cached per worker for LOGIN_MISS_TTL (3 s): repeated
+            # attempts against unknown accounts skip the database, at the cost
+            # of a just-created or renamed account getting "not registered"
+            # from another worker for up to those few seconds.
+            user = resolve_login(cur, email_or_username)
 
             cur.close()
             conn.close()
@@ -102,8 +99,9 @@ def login():
                     }
                 )
 
-            # Password check
-            if db_password != password:
+            # Password check (bcrypt hash, or a legacy plaintext row)
+            matches, needs_rehash = verify_password(db_password, password)
+            if not matches:
                 return jsonify(
                     {
                         "success": False,
@@ -119,27 +117,29 @@ def login():
             session["name"] = name  # THIS FIXES SIDEBAR
             session["role"] = role
             session["username"] = email_or_username
-
-            # 📝 Log login info into login_logs table
+            cache_user(user_id, name, role)
+
+            # 🔐 Upgrade plaintext / weaker hashes now that we know the password
+            if needs_rehash:
+                try:
+                    conn = get_db()
+                    hash_cur = conn.cursor()
+                    rehash_if_needed(hash_cur, user_id, password, needs_rehash)
+                    conn.commit()
+                    hash_cur.close()
+                    conn.close()
+                except Exception as rehash_err:
+                    print("REHASH ERROR:", rehash_err)
+
+            # 📝 Log login info into login_logs table (written in batches
+            # by services/login_audit.py, off the request)
             try:
-                log_conn = get_db()
-                log_cur = log_conn.cursor()
-
                 # Get client IP address (handle proxies/load balancers)
                 ip_address = request.headers.get("X-Forwarded-For", request.remote_addr)
                 if ip_address and "," in ip_address:
                     ip_address = ip_address.split(",")[0].strip()
 
-                log_cur.execute(
-                    """
-                    INSERT INTO login_logs (user_id, login_time, ip_address)
-                    VALUES (%s, CURRENT_TIMESTAMP, %s)
-                    """,
-                    (user_id, ip_address),
-                )
-                log_conn.commit()
-                log_cur.close()
-                log_conn.close()
+                record_login(user_id, ip_address)
             except Exception as log_err:
                 print("LOGIN LOG ERROR:", log_err)
 
@@ -164,6 +164,13 @@ def login():
                 }
             )
 
+        except PasswordHashBusyError as e:
+            print("LOGIN BUSY:", e)
+            return (
+                jsonify({"success": False, "message": "Server busy, please try again"}),
+                503,
+            )
+
         except Exception as e:
 
             print("LOGIN ERROR:", e)
@@ -197,6 +204,12 @@ def signup():
             if not all([username, email, password, confirm_password]):
                 return jsonify({"success": False, "message": "All fields are required"})
 
+            # "@" means email at login, so a username can't contain it
+            if "@" in username:
+                return jsonify(
+                    {"success": False, "message": "Username cannot contain @"}
+                )
+
             # 2️⃣ Password length
             if len(password) < 8:
                 return jsonify(
@@ -218,7 +231,7 @@ def signup():
                 """
                 SELECT user_id, role, is_active, is_registered
                 FROM users
-                WHERE email = %s
+                WHERE lower(email) = lower(%s)
             """,
                 (email,),
             )
@@ -250,7 +263,7 @@ def signup():
             cur.execute(
                 """
                 SELECT user_id FROM users
-                WHERE username = %s
+                WHERE lower(username) = lower(%s)
             """,
                 (username,),
             )
@@ -261,13 +274,13 @@ def signup():
 
                 return jsonify({"success": False, "message": "Username already taken"})
 
-            # 6️⃣ Insert password (PLAIN for now)
+            # 6️⃣ Insert password (bcrypt hash)
             cur.execute(
                 """
                 INSERT INTO auth (user_id, password_hash, updated_at)
                 VALUES (%s, %s, CURRENT_TIMESTAMP)
             """,
-                (user_id, password),
+                (user_id, hash_password(password)),
             )
 
             # 7️⃣ Update users table
@@ -284,6 +297,7 @@ def signup():
             conn.commit()
             cur.close()
             conn.close()
+            forget_login_misses(username, email)
 
             # 8️⃣ Set Session (AUTO LOGIN)
             session["user_id"] = user_id
@@ -352,7 +366,7 @@ def send_otp():
             """
             SELECT u.user_id, u.is_registered, u.is_active, u.name
             FROM users u
-            WHERE u.email = %s
+            WHERE lower(u.email) = lower(%s)
             """,
             (email,),
         )
@@ -414,12 +428,12 @@ def send_otp():
         """
 
         try:
-            mail = current_app.extensions["mail"]
-            mail.send(msg)
+            # queued — the mail worker talks to the SMTP server, not this request
+            enqueue_mail(msg)
             email_sent = True
-            print(f"OTP email sent successfully to {email}")
+            print(f"OTP email queued for {email}")
         except Exception as email_error:
-            print(f"Failed to send email: {email_error}")
+            print(f"Failed to queue email: {email_error}")
             email_sent = False
 
         # Store OTP in session
@@ -554,7 +568,9 @@ def reset_password(token):
             cur = conn.cursor()
 
             # Get user_id from email
-            cur.execute("SELECT user_id FROM users WHERE email = %s", (email,))
+            cur.execute(
+                "SELECT user_id FROM users WHERE lower(email) = lower(%s)", (email,)
+            )
 
             user = cur.fetchone()
             if not user:
@@ -572,7 +588,7 @@ def reset_password(token):
                     updated_at = CURRENT_TIMESTAMP
                 WHERE user_id = %s
                 """,
-                (new_password, user_id),
+                (hash_password(new_password), user_id),
             )
 
             conn.commit()
@@ -591,6 +607,13 @@ def reset_password(token):
                 }
             )
 
+        except PasswordHashBusyError as e:
+            print("RESET PASSWORD BUSY:", e)
+            return (
+                jsonify({"success": False, "message": "Server busy, please try again"}),
+                503,
+            )
+
         except Exception as e:
             print(f"Error in reset_password: {e}")
             return jsonify({"success": False, "message": "Server error"})
@@ -0,0 +1,103 @@
+from database.db import get_cursor
+from DS.TTLCache import TTLCache
+
+# -----------------------------
+# CURRENT USER CACHE
+# -----------------------------
+# user_id → {"name": ..., "role": ...} used by the navbar (app.inject_user).
+# Seeded at login and busted by every route that changes a user's name/role.
+USER_CACHE_TTL = 300  # seconds
+
+_user_cache = TTLCache(ttl=USER_CACHE_TTL, max_size=4096)
+
+
+def cache_user(user_id, name, role):
+    user = {"name": name, "role": role}
+    _user_cache.set(user_id, user)
+    return user
+
+
+def get_current_user(user_id):
+    """Return {"name", "role"} for user_id, hitting the DB only on a cache miss."""
+    user = _user_cache.get(user_id)
+    if user is not None:
+        return user
+
+    cur = get_cursor()
+    cur.execute("SELECT name, role FROM users WHERE user_id = %s", (user_id,))
+    row = cur.fetchone()
+    if not row:
+        return None
+
+    return cache_user(user_id, row[0], row[1])
+
+
+def invalidate_user(user_id):
+    _user_cache.pop(user_id)
+
+
+# -----------------------------
+# LOGIN IDENTITY RESOLVER
+# -----------------------------
+# Login accepts an email or a username. Instead of one query with
+# `email = %s OR username = %s` (a BitmapOr or a scan per attempt), pick
+# the column from the identifier's shape and probe its unique
+# lower(...) index (resources/migrations/007_login_identity_indexes.sql).
+#
+# Unknown identifiers are remembered for a short while so a burst of
+# attempts against made-up accounts doesn't reach the database each
+# time. Routes that make an identifier valid (signup, email / username
+# changes) call forget_login_misses(), but only in their own worker:
+# the others can still answer "not registered" for up to LOGIN_MISS_TTL,
+# so keep it to a few seconds — long enough to absorb a burst.
+LOGIN_MISS_TTL = 3  # seconds
+
+_login_misses = TTLCache(ttl=LOGIN_MISS_TTL, max_size=8192)
+
+LOGIN_BY_EMAIL = """
+SELECT u.user_id, u.name, u.role, a.password_hash, u.is_active, u.is_registered
+FROM users u
+JOIN auth a ON u.user_id = a.user_id
+WHERE lower(u.email) = %s
+"""
+
+LOGIN_BY_USERNAME = """
+SELECT u.user_id, u.name, u.role, a.password_hash, u.is_active, u.is_registered
+FROM users u
+JOIN auth a ON u.user_id = a.user_id
+WHERE lower(u.username) = %s
+"""
+
+
+def normalize_identifier(value):
+    return (value or "").strip().lower()
+
+
+def is_email_identifier(identifier):
+    # usernames can't contain "@" (checked at signup / profile update)
+    return "@" in identifier
+
+
+def resolve_login(cur, identifier):
+    """
+    (user_id, name, role, password_hash, is_active, is_registered) for an
+    email or username, or None. Case-insensitive; one index probe.
+    """
+    identifier = normalize_identifier(identifier)
+    if not identifier or identifier in _login_misses:
+        return None
+
+    if is_email_identifier(identifier):
+        cur.execute(LOGIN_BY_EMAIL, (identifier,))
+    else:
+        cur.execute(LOGIN_BY_USERNAME, (identifier,))
+    row = cur.fetchone()
+
+    if row is None:
+        _login_misses.set(identifier, True)
+    return row
+
+
+def forget_login_misses(*identifiers):
+    for identifier in identifiers:
+        _login_misses.pop(normalize_identifier(identifier))
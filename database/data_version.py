@@ -0,0 +1,91 @@
+# A per-project counter bumped inside every transaction that changes what
+# a project report shows (tasks, membership, names / designations of the
+# people in it). Readers compare versions
+# instead of re-running aggregates: same version → same data.
+
+
+def bump_data_version(cur, project_ids=None):
+    """
+    Bump the data version of the given projects (None → every project).
+    Run on the cursor of the change itself so both commit together.
+    """
+    if project_ids is None:
+        cur.execute(
+            """
+            INSERT INTO project_data_version (project_id, version, changed_at)
+            SELECT project_id, 1, NOW() FROM projects
+            ON CONFLICT (project_id) DO UPDATE SET
+                version    = project_data_version.version + 1,
+                changed_at = NOW()
+            """
+        )
+        return
+
+    # sorted → concurrent bumps lock the rows in the same order
+    project_ids = sorted({pid for pid in project_ids if pid is not None})
+    if not project_ids:
+        return
+    cur.execute(
+        """
+        INSERT INTO project_data_version (project_id, version, changed_at)
+        SELECT pid, 1, NOW() FROM unnest(%s::int[]) AS pid
+        ON CONFLICT (project_id) DO UPDATE SET
+            version    = project_data_version.version + 1,
+            changed_at = NOW()
+        """,
+        (project_ids,),
+    )
+
+
+def bump_user_projects(cur, user_id):
+    """
+    Bump every project the user leads or is a member of — after a change
+    to their name or designation, which reports print.
+    """
+    cur.execute(
+        """
+        INSERT INTO project_data_version (project_id, version, changed_at)
+        SELECT project_id, 1, NOW()
+        FROM (
+            SELECT project_id FROM project_members WHERE user_id = %(user_id)s
+            UNION
+            SELECT project_id FROM projects WHERE leader_id = %(user_id)s
+        ) p
+        ORDER BY project_id
+        ON CONFLICT (project_id) DO UPDATE SET
+            version    = project_data_version.version + 1,
+            changed_at = NOW()
+        """,
+        {"user_id": user_id},
+    )
+
+
+def get_data_version(cur, project_id):
+    """Current data version of a project (0 if it never changed)."""
+    with cur.connection.cursor() as c:
+        c.execute(
+            "SELECT version FROM project_data_version WHERE project_id = %s",
+            (project_id,),
+        )
+        row = c.fetchone()
+    return row[0] if row else 0
+
+
+def get_user_data_stamp(cur, user_id):
+    """
+    Sum of the data versions of every project the user has tasks in.
+    Any task change in those projects bumps one of them, so an unchanged
+    stamp means the user's task list is unchanged too.
+    """
+    with cur.connection.cursor() as c:
+        c.execute(
+            """
+            SELECT COALESCE(SUM(v.version), 0)
+            FROM project_data_version v
+            WHERE v.project_id IN (
+                SELECT project_id FROM project_task_stats WHERE assigned_to = %s
+            )
+            """,
+            (user_id,),
+        )
+        return int(c.fetchone()[0])
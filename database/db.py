@@ -1,12 +1,166 @@
-import psycopg2
+import os
+import threading
+
+from flask import g, has_app_context
+from psycopg2 import extensions
+
+from database.pool import ConnectionPool
+
+DB_CONFIG = {
+    "dbname": "CollabHub1",  # your database name
+    "user": "postgres",  # your username
+    "password": "",  # your password
+    "host": "localhost",
+    "port": "5432",
+}
+
+# Pool settings (override through app.config["DB_POOL_*"] in init_app)
+POOL_SETTINGS = {
+    "min_size": 1,
+    "max_size": 10,
+    "timeout": 30.0,  # seconds to wait for a free connection
+    "max_age": 1800.0,  # recycle connections older than this (seconds)
+    "health_check_after": 30.0,  # ping connections idle longer than this
+}
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the process-wide pool, creating it lazily (and again after a fork)."""
+    global _pool, _pool_pid
+
+    if _pool is not None and _pool_pid == os.getpid():
+        return _pool
+
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            # a pool inherited from a gunicorn master must not be reused
+            _pool = ConnectionPool(DB_CONFIG, **POOL_SETTINGS)
+            _pool_pid = os.getpid()
+    return _pool
+
+
+class RequestConnection:
+    """
+    Handle to the connection shared by everything running in one request.
+
+    The view, context processors and helpers all get a handle to the same
+    pooled connection. close() only ends the handle: once the last open
+    handle is closed, any uncommitted work is rolled back (matching
+    psycopg2's close()), but the connection itself stays with the request
+    until teardown_appcontext gives it back to the pool.
+
+    Because the connection is shared, a helper's commit() or rollback()
+    also commits or rolls back whatever the view has done so far on it.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+        self._open = True
+        g._db_handles = g.get("_db_handles", 0) + 1
+
+    def __getattr__(self, name):
+        return getattr(self.__dict__["_conn"], name)
+
+    def __enter__(self):
+        return self._conn.__enter__()
+
+    def __exit__(self, exc_type, exc, tb):
+        return self._conn.__exit__(exc_type, exc, tb)
+
+    @property
+    def closed(self):
+        return 1 if not self._open else self._conn.closed
+
+    def close(self):
+        if not self._open:
+            return
+        self._open = False
+
+        # a handle can outlive the request (a streamed generator, a late
+        # helper); after teardown there is no count left to decrement
+        handles = 0
+        if has_app_context():
+            handles = max(getattr(g, "_db_handles", 0) - 1, 0)
+            g._db_handles = handles
+
+        conn = self._conn
+        if conn.closed:
+            return
+        status = conn.info.transaction_status
+        if status == extensions.TRANSACTION_STATUS_INERROR or (
+            handles == 0 and status != extensions.TRANSACTION_STATUS_IDLE
+        ):
+            conn.rollback()
+
+
+def _request_connection():
+    conn = g.get("_db_conn")
+    if conn is None or conn.closed:
+        conn = g._db_conn = get_pool().getconn()
+        g._db_cursors = {}
+    return conn
 
 
 def get_db():
+    """
+    Return a database connection.
+
+    Inside a request (or any app context) this is a handle to the single
+    pooled connection bound to flask.g; outside one it is a plain pooled
+    connection. Either way conn.close() is the right thing to call.
+    """
+    if has_app_context():
+        return RequestConnection(_request_connection())
+
+    return get_pool().getconn()
+
+
+def get_cursor(cursor_factory=None):
+    """
+    Return the request's shared cursor for `cursor_factory`.
+
+    Meant for helpers and context processors that only run a query or two;
+    the cursor is closed at teardown, so callers must not close it. They
+    run in the caller's transaction and never commit.
+    """
+    conn = _request_connection()
+    if conn.info.transaction_status == extensions.TRANSACTION_STATUS_INERROR:
+        # an earlier statement of this request failed (e.g. the view that
+        # is now rendering its error page): the transaction can only be
+        # rolled back, so do that instead of failing this query too
+        conn.rollback()
+
+    cur = g._db_cursors.get(cursor_factory)
+    if cur is None or cur.closed:
+        cur = g._db_cursors[cursor_factory] = conn.cursor(
+            cursor_factory=cursor_factory
+        )
+    return cur
+
+
+def get_pool_stats():
+    return get_pool().stats()
+
+
+def release_request_connection(exc=None):
+    for cur in g.pop("_db_cursors", {}).values():
+        if not cur.closed:
+            cur.close()
+
+    g.pop("_db_handles", None)
+    conn = g.pop("_db_conn", None)
+    if conn is not None and not conn.closed:
+        conn.close()
+
+
+def init_app(app):
+    for key in POOL_SETTINGS:
+        config_key = "DB_POOL_" + key.upper()
+        if config_key in app.config:
+            POOL_SETTINGS[key] = app.config[config_key]
 
-    return psycopg2.connect(
-        dbname="CollabHub1",  # your database name
-        user="postgres",  # your username
-        password="",  # your password
-        host="localhost",
-        port="5432",
-    )
+    app.teardown_appcontext(release_request_connection)
@@ -0,0 +1,627 @@
+# ============================================================
+# EXPLAIN ANALYZE replay for the hot query shapes
+#
+# Builds a throwaway schema with the app's tables, fills it with a
+# generated dataset, runs the queries the app issues on every page
+# load under EXPLAIN ANALYZE, applies an index migration and runs
+# them again, then reports both plans side by side.
+#
+# Nothing outside the scratch schema is touched; it is dropped at
+# the end unless --keep is given.
+#
+#   python -m database.explain_replay
+#   python -m database.explain_replay --tasks-per-member 100 --plans
+#   python -m database.explain_replay --json > replay.json
+# ============================================================
+
+import argparse
+import json
+import os
+import statistics
+import sys
+
+import psycopg2
+from psycopg2 import sql
+
+from database.db import DB_CONFIG
+
+MIGRATIONS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "resources",
+    "migrations",
+)
+DEFAULT_MIGRATION = os.path.join(MIGRATIONS_DIR, "004_hot_path_indexes.sql")
+
+
+# -----------------------------
+# SCHEMA (resources/CollabHub(1).sql, the columns the replayed queries read)
+# -----------------------------
+SCHEMA_DDL = """
+CREATE TABLE users (
+    user_id       SERIAL PRIMARY KEY,
+    name          VARCHAR(100) NOT NULL,
+    username      VARCHAR(50) UNIQUE,
+    email         VARCHAR(100) NOT NULL UNIQUE,
+    role          VARCHAR(20),
+    designation   VARCHAR(50),
+    avatar        TEXT DEFAULT 'avatars/default.png',
+    is_active     BOOLEAN DEFAULT TRUE,
+    is_registered BOOLEAN DEFAULT FALSE,
+    created_at    TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at    TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE projects (
+    project_id   SERIAL PRIMARY KEY,
+    leader_id    INTEGER,
+    project_name VARCHAR(150) NOT NULL,
+    features     TEXT,
+    status       VARCHAR(20) DEFAULT 'initiated',
+    progress     INTEGER DEFAULT 0,
+    start_date   DATE,
+    end_date     DATE,
+    created_by   INTEGER NOT NULL,
+    created_at   TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at   TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    is_deleted   BOOLEAN DEFAULT FALSE
+);
+
+CREATE TABLE project_members (
+    project_id      INTEGER NOT NULL,
+    user_id         INTEGER NOT NULL,
+    role_in_project VARCHAR(20),
+    joined_at       TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    is_deleted      BOOLEAN DEFAULT FALSE,
+    PRIMARY KEY (project_id, user_id)
+);
+
+CREATE TABLE tasks (
+    task_id      SERIAL PRIMARY KEY,
+    project_id   INTEGER NOT NULL,
+    title        VARCHAR(150) NOT NULL,
+    description  TEXT,
+    status       VARCHAR(20),
+    priority     VARCHAR(10),
+    assigned_to  INTEGER NOT NULL,
+    assigned_by  INTEGER NOT NULL,
+    due_date     DATE,
+    completed_at TIMESTAMP,
+    created_at   TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at   TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    submitted_at TIMESTAMP,
+    rejection_reason TEXT
+);
+
+CREATE TABLE notifications (
+    notification_id SERIAL PRIMARY KEY,
+    sender_id       INTEGER NOT NULL,
+    receiver_id     INTEGER NOT NULL,
+    title           VARCHAR(150) NOT NULL,
+    message         TEXT,
+    type            VARCHAR(20) NOT NULL,
+    is_read         BOOLEAN DEFAULT FALSE,
+    sent_at         TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE login_logs (
+    log_id     SERIAL PRIMARY KEY,
+    user_id    INTEGER NOT NULL,
+    login_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    ip_address VARCHAR(45)
+);
+"""
+
+# %(name)s parameters come from the `sizes` dict built in main()
+DATASET_SQL = """
+SELECT setseed(%(seed)s);
+
+INSERT INTO users (name, username, email, role, designation)
+SELECT
+    'User ' || g,
+    'user' || g,
+    'user' || g || '@example.com',
+    CASE
+        WHEN g = 1 THEN 'admin'
+        WHEN g %% 20 = 0 THEN 'project_leader'
+        ELSE 'employee'
+    END,
+    'Engineer'
+FROM generate_series(1, %(users)s) g;
+
+INSERT INTO projects (leader_id, project_name, status, progress, start_date, end_date,
+                      created_by, created_at, is_deleted)
+SELECT
+    (SELECT user_id FROM users WHERE role = 'project_leader'
+     ORDER BY user_id OFFSET (g %% %(leaders)s) LIMIT 1),
+    'Project ' || g,
+    (ARRAY['initiated', 'ongoing', 'ongoing', 'ongoing', 'completed', 'closed'])
+        [1 + floor(random() * 6)::int],
+    floor(random() * 100)::int,
+    CURRENT_DATE - (random() * 365)::int,
+    CURRENT_DATE + (random() * 180)::int - 60,
+    1,
+    NOW() - random() * INTERVAL '365 days',
+    random() < 0.05
+FROM generate_series(1, %(projects)s) g;
+
+INSERT INTO project_members (project_id, user_id, role_in_project, is_deleted)
+SELECT project_id, leader_id, 'leader', FALSE
+FROM projects
+WHERE leader_id IS NOT NULL
+ON CONFLICT DO NOTHING;
+
+INSERT INTO project_members (project_id, user_id, role_in_project, is_deleted)
+SELECT
+    p.project_id,
+    2 + floor(random() * (%(users)s - 1))::int,
+    'member',
+    random() < 0.1
+FROM projects p, generate_series(1, %(members_per_project)s)
+ON CONFLICT DO NOTHING;
+
+INSERT INTO tasks (project_id, title, status, priority, assigned_to, assigned_by,
+                   due_date, completed_at)
+SELECT
+    pm.project_id,
+    'Task ' || g,
+    (ARRAY['in_progress', 'submitted', 'approved', 'rejected', 'todo'])
+        [1 + floor(random() * 5)::int],
+    (ARRAY['high', 'medium', 'low'])[1 + floor(random() * 3)::int],
+    pm.user_id,
+    1,
+    CURRENT_DATE + (random() * 120)::int - 60,
+    CASE WHEN random() < 0.3 THEN NOW() - random() * INTERVAL '30 days' END
+FROM project_members pm, generate_series(1, %(tasks_per_member)s) g
+WHERE pm.role_in_project = 'member';
+
+INSERT INTO notifications (sender_id, receiver_id, title, type, is_read, sent_at)
+SELECT
+    1,
+    1 + floor(random() * %(users)s)::int,
+    'Notification ' || g,
+    'info',
+    random() < 0.8,
+    NOW() - random() * INTERVAL '180 days'
+FROM generate_series(1, %(users)s * %(notifications_per_user)s) g;
+
+INSERT INTO login_logs (user_id, login_time, ip_address)
+SELECT
+    1 + floor(random() * %(users)s)::int,
+    NOW() - random() * INTERVAL '365 days',
+    '127.0.0.1'
+FROM generate_series(1, %(users)s * %(logins_per_user)s) g;
+"""
+
+# Rollups the routes read instead of tasks, built by their own migrations
+ROLLUP_MIGRATIONS = [
+    os.path.join(MIGRATIONS_DIR, "001_project_task_stats.sql"),
+    os.path.join(MIGRATIONS_DIR, "003_project_task_due.sql"),
+]
+
+# Scratch tables only: a bare ANALYZE would touch every table in the database
+SCRATCH_TABLES = [
+    "users",
+    "projects",
+    "project_members",
+    "tasks",
+    "notifications",
+    "login_logs",
+    "project_task_stats",
+    "project_task_due",
+]
+
+
+# -----------------------------
+# QUERIES (copied from the routes)
+# -----------------------------
+# (name, where it runs, SQL) — the statements as the routes run them, with
+# %s turned into named parameters. Parameters are picked from the dataset
+# by pick_params(): leader_id, project_id, employee_id, user_id. Keep these
+# in step when a route's query changes.
+QUERIES = [
+    (
+        "leader_active_project",
+        "leader.get_leader_project (every leader page)",
+        """
+        SELECT p.project_id, p.project_name
+        FROM projects p
+        JOIN project_members pm ON p.project_id = pm.project_id
+        WHERE p.leader_id = %(leader_id)s
+        AND p.status != 'closed'
+        AND p.is_deleted = FALSE
+        AND pm.user_id = %(leader_id)s
+        AND (pm.is_deleted = FALSE OR pm.is_deleted IS NULL)
+        ORDER BY p.project_id DESC
+        LIMIT 1
+        """,
+    ),
+    (
+        "leader_active_project_count",
+        "leader.dashboard",
+        """
+        SELECT COUNT(*) 
+        FROM projects 
+        WHERE leader_id = %(leader_id)s AND status NOT IN ('completed', 'closed') AND is_deleted = FALSE;
+        """,
+    ),
+    (
+        "project_task_counters",
+        "leader.tasks / leader.dashboard (database.task_stats.get_task_counters)",
+        """
+        SELECT 'status', status, SUM(task_count)
+        FROM project_task_stats
+        WHERE project_id = %(project_id)s
+        GROUP BY status
+        HAVING SUM(task_count) > 0
+
+        UNION ALL
+
+        SELECT 'priority', priority, SUM(task_count)
+        FROM project_task_stats
+        WHERE project_id = %(project_id)s
+        GROUP BY priority
+        HAVING SUM(task_count) > 0
+
+        UNION ALL
+
+        SELECT 'overdue', NULL, COALESCE(SUM(open_count), 0)
+        FROM project_task_due
+        WHERE project_id = %(project_id)s
+          AND due_date < CURRENT_DATE
+        """,
+    ),
+    (
+        "leader_project_tasks",
+        "leader.tasks (review queue first)",
+        """
+        SELECT 
+            t.task_id, t.title, t.description, t.priority, t.status,
+            t.due_date, p.project_name, u.name AS assigned_to_name,
+            t.rejection_reason, t.submitted_at
+        FROM tasks t
+        JOIN projects p ON t.project_id = p.project_id
+        JOIN users u ON t.assigned_to = u.user_id
+        WHERE p.leader_id = %(leader_id)s
+        AND t.project_id = %(project_id)s
+        ORDER BY 
+            CASE 
+                WHEN t.status = 'submitted' THEN 1
+                WHEN t.status = 'in_progress' THEN 2
+                WHEN t.status = 'rejected' THEN 3
+                ELSE 4
+            END,
+            t.created_at DESC;
+        """,
+    ),
+    (
+        "leader_team_members",
+        "leader.team",
+        """
+        SELECT u.user_id, u.name, u.email, u.designation, p.project_name, pm.role_in_project
+        FROM users u
+        JOIN project_members pm ON u.user_id = pm.user_id
+        JOIN projects p ON pm.project_id = p.project_id
+        WHERE p.leader_id = %(leader_id)s
+        AND p.project_id = %(project_id)s
+        AND u.role = 'employee'
+        AND (pm.is_deleted = FALSE OR pm.is_deleted IS NULL)
+        ORDER BY u.name;
+        """,
+    ),
+    (
+        "employee_my_work",
+        "employee.my_work",
+        """
+        SELECT 
+            t.task_id,
+            t.title,
+            t.status,
+            t.priority,
+            t.due_date
+        FROM tasks t
+        JOIN projects p ON t.project_id = p.project_id
+        WHERE t.assigned_to = %(employee_id)s
+        AND p.is_deleted = FALSE
+        AND COALESCE(t.status, '') NOT IN ('completed', 'approved')
+        ORDER BY t.due_date ASC NULLS LAST
+        """,
+    ),
+    (
+        "employee_my_work_progress",
+        "employee.my_work",
+        """
+        SELECT
+            COALESCE(SUM(s.task_count), 0) AS total_tasks,
+            COALESCE(SUM(s.task_count) FILTER (WHERE s.status = 'completed'), 0)
+                AS completed_tasks
+        FROM project_task_stats s
+        JOIN projects p ON p.project_id = s.project_id
+        WHERE s.assigned_to = %(employee_id)s
+          AND p.is_deleted = FALSE
+        """,
+    ),
+    (
+        "employee_projects",
+        "employee.my_team",
+        """
+        SELECT pm.project_id
+        FROM project_members pm
+        JOIN projects p ON pm.project_id = p.project_id
+        WHERE pm.user_id = %(employee_id)s
+          AND p.is_deleted = FALSE
+          AND pm.is_deleted = FALSE
+        """,
+    ),
+    (
+        "unread_notification_count",
+        "leader.get_notifications (every leader page)",
+        """
+        SELECT COUNT(*) 
+        FROM notifications 
+        WHERE receiver_id = %(user_id)s AND is_read = false
+        """,
+    ),
+    (
+        "latest_unread_notifications",
+        "leader.get_notifications (every leader page)",
+        """
+        SELECT n.message, n.sent_at, u.name as sender_name
+        FROM notifications n
+        JOIN users u ON n.sender_id = u.user_id
+        WHERE n.receiver_id = %(user_id)s AND n.is_read = false
+        ORDER BY n.sent_at DESC
+        LIMIT 3
+        """,
+    ),
+    (
+        "past_members_last_login",
+        "admin.manage_employees",
+        """
+        SELECT
+            u.user_id,
+            u.name,
+            u.email,
+            u.designation,
+            u.role,
+            u.is_active,
+            u.is_registered,
+            u.created_at,
+            u.updated_at,
+
+            (
+                SELECT p.project_name
+                FROM project_members pm
+                JOIN projects p
+                    ON pm.project_id = p.project_id
+                WHERE pm.user_id = u.user_id
+                  AND p.is_deleted = FALSE
+                ORDER BY p.created_at DESC
+                LIMIT 1
+            ) AS last_project,
+
+            (
+                SELECT login_time
+                FROM login_logs
+                WHERE user_id = u.user_id
+                ORDER BY login_time DESC
+                LIMIT 1
+            ) AS last_login
+
+        FROM users u
+
+        WHERE u.role != 'admin'
+            AND (u.is_active = FALSE AND u.is_registered = FALSE)
+
+        ORDER BY u.updated_at DESC
+        """,
+    ),
+    (
+        "login_history",
+        "admin.profile",
+        """
+        SELECT login_time, ip_address
+        FROM login_logs
+        WHERE user_id=%(user_id)s
+        ORDER BY login_time DESC
+        LIMIT 5
+        """,
+    ),
+]
+
+
+def pick_params(cur):
+    """Representative ids: the busiest leader / project / employee."""
+    cur.execute(
+        """
+        SELECT leader_id FROM projects
+        WHERE is_deleted = FALSE AND status != 'closed' AND leader_id IS NOT NULL
+        GROUP BY leader_id ORDER BY COUNT(*) DESC, leader_id LIMIT 1
+        """
+    )
+    leader_id = cur.fetchone()[0]
+    cur.execute(
+        "SELECT project_id FROM tasks GROUP BY project_id ORDER BY COUNT(*) DESC LIMIT 1"
+    )
+    project_id = cur.fetchone()[0]
+    cur.execute(
+        "SELECT assigned_to FROM tasks GROUP BY assigned_to ORDER BY COUNT(*) DESC LIMIT 1"
+    )
+    employee_id = cur.fetchone()[0]
+    return {
+        "leader_id": leader_id,
+        "project_id": project_id,
+        "employee_id": employee_id,
+        "user_id": leader_id,
+    }
+
+
+# -----------------------------
+# EXPLAIN
+# -----------------------------
+def _plan_nodes(node, out=None):
+    """Flatten a JSON plan into "Node Type on relation (index)" strings."""
+    if out is None:
+        out = []
+    label = node["Node Type"]
+    if node.get("Index Name"):
+        label += f" using {node['Index Name']}"
+    elif node.get("Relation Name"):
+        label += f" on {node['Relation Name']}"
+    out.append(label)
+    for child in node.get("Plans", []):
+        _plan_nodes(child, out)
+    return out
+
+
+def explain(cur, query, params, repeat):
+    """Run EXPLAIN ANALYZE `repeat` times; keep the median timing."""
+    runs = []
+    for _ in range(repeat):
+        cur.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + query, params)
+        runs.append(cur.fetchone()[0][0])
+
+    times = [r["Execution Time"] for r in runs]
+    plan = runs[-1]["Plan"]
+    cur.execute("EXPLAIN (ANALYZE, FORMAT TEXT) " + query, params)
+    text = "\n".join(row[0] for row in cur.fetchall())
+    return {
+        "execution_ms": round(statistics.median(times), 3),
+        "planning_ms": round(runs[-1]["Planning Time"], 3),
+        "total_cost": plan["Total Cost"],
+        "shared_hit_blocks": plan.get("Shared Hit Blocks", 0),
+        "shared_read_blocks": plan.get("Shared Read Blocks", 0),
+        "nodes": _plan_nodes(plan),
+        "text": text,
+    }
+
+
+def replay(cur, params, repeat):
+    return {
+        name: explain(cur, query, params, repeat) for name, _, query in QUERIES
+    }
+
+
+def migration_statements(path):
+    """Split a .sql migration into statements (drops -- comments)."""
+    with open(path, encoding="utf-8") as f:
+        lines = [line.split("--", 1)[0] for line in f]
+    body = "".join(lines)
+    return [stmt.strip() for stmt in body.split(";") if stmt.strip()]
+
+
+# -----------------------------
+# REPORT
+# -----------------------------
+def print_report(results, show_plans, out=sys.stdout):
+    where = {name: used_by for name, used_by, _ in QUERIES}
+    for name, res in results.items():
+        before, after = res["before"], res["after"]
+        speedup = (
+            before["execution_ms"] / after["execution_ms"]
+            if after["execution_ms"]
+            else float("inf")
+        )
+        print(f"\n=== {name}  ({where[name]})", file=out)
+        print(
+            f"  before: {before['execution_ms']:>9.3f} ms  cost {before['total_cost']:>10.2f}"
+            f"  blocks {before['shared_hit_blocks'] + before['shared_read_blocks']}",
+            file=out,
+        )
+        print(
+            f"  after:  {after['execution_ms']:>9.3f} ms  cost {after['total_cost']:>10.2f}"
+            f"  blocks {after['shared_hit_blocks'] + after['shared_read_blocks']}"
+            f"  ({speedup:.1f}x)",
+            file=out,
+        )
+        print(f"  plan before: {' > '.join(before['nodes'])}", file=out)
+        print(f"  plan after:  {' > '.join(after['nodes'])}", file=out)
+        if show_plans:
+            print("\n  -- before --", file=out)
+            print("  " + before["text"].replace("\n", "\n  "), file=out)
+            print("\n  -- after --", file=out)
+            print("  " + after["text"].replace("\n", "\n  "), file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Replay the app's hot queries under EXPLAIN ANALYZE before/after an index migration."
+    )
+    parser.add_argument("--schema", default="explain_replay", help="scratch schema name")
+    parser.add_argument("--migration", default=DEFAULT_MIGRATION)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--projects", type=int, default=500)
+    parser.add_argument("--members-per-project", type=int, default=8)
+    parser.add_argument("--tasks-per-member", type=int, default=25)
+    parser.add_argument("--notifications-per-user", type=int, default=20)
+    parser.add_argument("--logins-per-user", type=int, default=50)
+    parser.add_argument("--seed", type=float, default=0.42)
+    parser.add_argument("--repeat", type=int, default=5, help="runs per query (median kept)")
+    parser.add_argument("--plans", action="store_true", help="print full text plans")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    parser.add_argument("--keep", action="store_true", help="don't drop the scratch schema")
+    args = parser.parse_args(argv)
+
+    sizes = {
+        "seed": args.seed,
+        "users": args.users,
+        "leaders": max(1, args.users // 20),
+        "projects": args.projects,
+        "members_per_project": args.members_per_project,
+        "tasks_per_member": args.tasks_per_member,
+        "notifications_per_user": args.notifications_per_user,
+        "logins_per_user": args.logins_per_user,
+    }
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    conn.autocommit = True  # CREATE INDEX CONCURRENTLY can't run in a transaction
+    cur = conn.cursor()
+    schema = sql.Identifier(args.schema)
+
+    try:
+        cur.execute(sql.SQL("DROP SCHEMA IF EXISTS {} CASCADE").format(schema))
+        cur.execute(sql.SQL("CREATE SCHEMA {}").format(schema))
+        cur.execute(sql.SQL("SET search_path TO {}").format(schema))
+
+        print(f"[replay] generating dataset in schema {args.schema} ...", file=sys.stderr)
+        cur.execute(SCHEMA_DDL)
+        cur.execute(DATASET_SQL, sizes)
+        for path in ROLLUP_MIGRATIONS:
+            for stmt in migration_statements(path):
+                cur.execute(stmt)
+        for table in SCRATCH_TABLES:
+            cur.execute(sql.SQL("ANALYZE {}").format(sql.Identifier(args.schema, table)))
+        params = pick_params(cur)
+
+        print("[replay] running queries without indexes ...", file=sys.stderr)
+        before = replay(cur, params, args.repeat)
+
+        print(f"[replay] applying {os.path.basename(args.migration)} ...", file=sys.stderr)
+        for stmt in migration_statements(args.migration):
+            cur.execute(stmt)
+
+        print("[replay] running queries with indexes ...", file=sys.stderr)
+        after = replay(cur, params, args.repeat)
+
+        results = {
+            name: {"before": before[name], "after": after[name]}
+            for name, _, _ in QUERIES
+        }
+        if args.json:
+            json.dump(
+                {"sizes": sizes, "params": params, "results": results},
+                sys.stdout,
+                indent=2,
+            )
+            print()
+        else:
+            print_report(results, args.plans)
+
+    finally:
+        if not args.keep:
+            cur.execute(sql.SQL("DROP SCHEMA IF EXISTS {} CASCADE").format(schema))
+        cur.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+import threading
+import time
+
+import psycopg2
+from psycopg2 import extensions
+from psycopg2.pool import PoolError
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection could be checked out within the timeout."""
+
+
+class PooledConnection:
+    """
+    Thin wrapper around a psycopg2 connection handed out by ConnectionPool.
+
+    Behaves exactly like the real connection (cursor, commit, rollback, ...)
+    except that close() gives the connection back to the pool instead of
+    tearing down the TCP socket.
+    """
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+
+    def __getattr__(self, name):
+        raw = self.__dict__.get("_raw")
+        if raw is None:
+            raise psycopg2.InterfaceError("connection already returned to pool")
+        return getattr(raw, name)
+
+    def __enter__(self):
+        return self._raw.__enter__()
+
+    def __exit__(self, exc_type, exc, tb):
+        return self._raw.__exit__(exc_type, exc, tb)
+
+    @property
+    def closed(self):
+        return 1 if self._raw is None else self._raw.closed
+
+    def close(self):
+        raw, self._raw = self._raw, None
+        if raw is not None:
+            self._pool.release(raw)
+
+
+class ConnectionPool:
+    """
+    Thread-safe PostgreSQL connection pool.
+
+    - keeps at least `min_size` connections open, never more than `max_size`
+    - callers wait up to `timeout` seconds when every connection is busy
+    - connections older than `max_age` seconds are recycled on return
+    - connections idle for more than `health_check_after` seconds are
+      pinged with SELECT 1 before being handed out again
+    """
+
+    def __init__(
+        self,
+        connect_kwargs,
+        min_size=1,
+        max_size=10,
+        timeout=30.0,
+        max_age=1800.0,
+        health_check_after=30.0,
+    ):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("invalid pool size: min=%s max=%s" % (min_size, max_size))
+
+        self._connect_kwargs = dict(connect_kwargs)
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_age = max_age
+        self.health_check_after = health_check_after
+
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+
+        # idle entries are [raw_conn, created_at, last_used_at]
+        self._idle = []
+        self._created_at = {}
+        self._size = 0
+        self._closed = False
+
+        self._stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "connects": 0,
+            "recycled": 0,
+            "health_check_failures": 0,
+        }
+
+        for _ in range(min_size):
+            self._size += 1
+            raw = self._connect()
+            self._idle.append([raw, self._created_at[id(raw)], time.monotonic()])
+
+    # ----------------------------
+    # connection lifecycle
+    # ----------------------------
+    def _bump(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _connect(self):
+        """Open a connection for a slot already reserved in self._size."""
+        try:
+            raw = psycopg2.connect(**self._connect_kwargs)
+        except Exception:
+            with self._lock:
+                self._size -= 1
+                self._available.notify()
+            raise
+        with self._lock:
+            self._stats["connects"] += 1
+            self._created_at[id(raw)] = time.monotonic()
+        return raw
+
+    def _discard(self, raw):
+        """Close a connection and free its slot. Caller must NOT hold the lock."""
+        try:
+            raw.close()
+        except Exception:
+            pass
+        with self._lock:
+            self._created_at.pop(id(raw), None)
+            self._size -= 1
+            self._available.notify()
+
+    def _is_healthy(self, raw, last_used_at):
+        if raw.closed:
+            return False
+        if time.monotonic() - last_used_at < self.health_check_after:
+            return True
+        try:
+            cur = raw.cursor()
+            cur.execute("SELECT 1")
+            cur.close()
+            raw.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _is_expired(self, raw):
+        created_at = self._created_at.get(id(raw))
+        if created_at is None:
+            return True
+        return self.max_age is not None and time.monotonic() - created_at > self.max_age
+
+    # ----------------------------
+    # public API
+    # ----------------------------
+    def getconn(self):
+        """Check out a connection, waiting up to `timeout` seconds for one."""
+        deadline = time.monotonic() + self.timeout
+        waited = False
+
+        while True:
+            with self._lock:
+                if self._closed:
+                    raise PoolError("connection pool is closed")
+
+                while not self._idle and self._size >= self.max_size:
+                    if not waited:
+                        waited = True
+                        self._stats["waits"] += 1
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeoutError(
+                            "no database connection available after %.1fs"
+                            % self.timeout
+                        )
+                    self._available.wait(remaining)
+
+                if self._idle:
+                    entry = self._idle.pop()
+                else:
+                    entry = None
+                    self._size += 1  # reserve the slot before connecting
+
+            if entry is None:
+                raw = self._connect()
+            else:
+                raw, _, last_used_at = entry
+                if self._is_expired(raw):
+                    self._bump("recycled")
+                    self._discard(raw)
+                    continue
+                if not self._is_healthy(raw, last_used_at):
+                    self._bump("health_check_failures")
+                    self._discard(raw)
+                    continue
+
+            self._bump("checkouts")
+            return PooledConnection(self, raw)
+
+    def release(self, raw):
+        """Return a raw connection to the pool (called by PooledConnection.close)."""
+        if raw.closed or self._closed:
+            self._discard(raw)
+            return
+
+        status = raw.info.transaction_status
+        if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+            self._discard(raw)
+            return
+        if status != extensions.TRANSACTION_STATUS_IDLE:
+            # same semantics as psycopg2's close(): uncommitted work is dropped
+            try:
+                raw.rollback()
+            except Exception:
+                self._discard(raw)
+                return
+
+        if self._is_expired(raw):
+            self._bump("recycled")
+            self._discard(raw)
+            return
+
+        with self._lock:
+            self._idle.append([raw, self._created_at[id(raw)], time.monotonic()])
+            self._available.notify()
+
+    def closeall(self):
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for raw, _, _ in idle:
+            self._discard(raw)
+
+    def stats(self):
+        with self._lock:
+            idle = len(self._idle)
+            return dict(
+                self._stats,
+                size=self._size,
+                idle=idle,
+                in_use=self._size - idle,
+                min_size=self.min_size,
+                max_size=self.max_size,
+            )
@@ -0,0 +1,239 @@
+from psycopg2.extras import execute_values
+
+from database.data_version import bump_data_version
+
+# ============================
+# PROJECT PROGRESS ENGINE
+# ============================
+# One place for every progress formula in the app. Instead of rescanning a
+# project's tasks, callers read the per-project running aggregates kept in
+# project_progress:
+#
+#   total_tasks / approved_tasks       → every task of the project
+#   counted_tasks, weight_total,
+#   weighted_sum, in_progress_tasks    → only tasks that are unassigned or
+#                                        assigned to an active member
+#
+# record_task_change() (database/task_stats.py) feeds every task insert /
+# update / delete into apply_progress_deltas() inside the same transaction.
+# Membership changes flip which tasks are "counted", so routes that add or
+# remove project members call resync_project_progress() afterwards — that
+# rebuilds one project's row from the project_task_stats rollup, never
+# from tasks. Both paths end with refresh_progress(), which rewrites the
+# persisted projects.progress from the aggregates in the same transaction,
+# so every page that reads p.progress sees the current value.
+
+# Priority weight and status score of the leader's weighted formula (C1)
+PRIORITY_WEIGHT = "CASE s.priority WHEN 'high' THEN 3 WHEN 'medium' THEN 2 ELSE 1 END"
+STATUS_SCORE = """CASE s.status
+    WHEN 'approved'    THEN 1.0
+    WHEN 'submitted'   THEN 0.7
+    WHEN 'in_progress' THEN 0.4
+    ELSE 0.0
+END"""
+
+# `s` is a set of (project_id, assigned_to, status, priority, task_count)
+# buckets — project_task_stats rows or signed deltas.
+_COUNTED = """
+    CROSS JOIN LATERAL (
+        SELECT s.assigned_to IS NULL OR EXISTS (
+            SELECT 1 FROM project_members pm
+            WHERE pm.project_id = s.project_id
+              AND pm.user_id = s.assigned_to
+              AND (pm.is_deleted = FALSE OR pm.is_deleted IS NULL)
+        ) AS counted
+    ) m
+"""
+
+_AGGREGATES = f"""
+    COALESCE(SUM(s.task_count), 0),
+    COALESCE(SUM(s.task_count) FILTER (WHERE s.status = 'approved'), 0),
+    COALESCE(SUM(s.task_count) FILTER (WHERE m.counted), 0),
+    COALESCE(SUM(s.task_count * {PRIORITY_WEIGHT}) FILTER (WHERE m.counted), 0),
+    COALESCE(SUM(s.task_count * ({PRIORITY_WEIGHT}) * ({STATUS_SCORE}))
+        FILTER (WHERE m.counted), 0),
+    COALESCE(SUM(s.task_count) FILTER (WHERE m.counted AND s.status = 'in_progress'), 0)
+"""
+
+_PROGRESS_COLUMNS = """
+    (project_id, total_tasks, approved_tasks, counted_tasks,
+     weight_total, weighted_sum, in_progress_tasks)
+"""
+
+
+def apply_progress_deltas(cur, deltas):
+    """
+    Add signed task deltas to the running aggregates.
+
+    `deltas` are (project_id, assigned_to, status, priority, +1/-1) tuples,
+    as built by record_task_change().
+    """
+    execute_values(
+        cur,
+        f"""
+        INSERT INTO project_progress AS pp {_PROGRESS_COLUMNS}
+        SELECT s.project_id, {_AGGREGATES}
+        FROM (VALUES %s) AS s (project_id, assigned_to, status, priority, task_count)
+        {_COUNTED}
+        GROUP BY s.project_id
+        ON CONFLICT (project_id) DO UPDATE SET
+            total_tasks       = pp.total_tasks       + EXCLUDED.total_tasks,
+            approved_tasks    = pp.approved_tasks    + EXCLUDED.approved_tasks,
+            counted_tasks     = pp.counted_tasks     + EXCLUDED.counted_tasks,
+            weight_total      = pp.weight_total      + EXCLUDED.weight_total,
+            weighted_sum      = pp.weighted_sum      + EXCLUDED.weighted_sum,
+            in_progress_tasks = pp.in_progress_tasks + EXCLUDED.in_progress_tasks
+        """,
+        deltas,
+        template="(%s::int, %s::int, %s::text, %s::text, %s::int)",
+    )
+
+
+def resync_project_progress(cur, project_id=None):
+    """Rebuild the aggregates of one project (or all) from project_task_stats."""
+    where, params = "", ()
+    if project_id is not None:
+        where, params = "WHERE p.project_id = %s", (project_id,)
+
+    cur.execute(
+        f"""
+        INSERT INTO project_progress AS pp {_PROGRESS_COLUMNS}
+        SELECT p.project_id, {_AGGREGATES}
+        FROM projects p
+        LEFT JOIN project_task_stats s ON s.project_id = p.project_id
+        {_COUNTED}
+        {where}
+        GROUP BY p.project_id
+        ON CONFLICT (project_id) DO UPDATE SET
+            total_tasks       = EXCLUDED.total_tasks,
+            approved_tasks    = EXCLUDED.approved_tasks,
+            counted_tasks     = EXCLUDED.counted_tasks,
+            weight_total      = EXCLUDED.weight_total,
+            weighted_sum      = EXCLUDED.weighted_sum,
+            in_progress_tasks = EXCLUDED.in_progress_tasks
+        """,
+        params,
+    )
+    project_ids = None if project_id is None else [project_id]
+    refresh_progress(cur, project_ids)
+    bump_data_version(cur, project_ids)
+
+
+# -----------------------------
+# FORMULAS
+# -----------------------------
+def refresh_progress(cur, project_ids=None):
+    """
+    Write the leader's weighted progress into projects.progress for the
+    given projects (all of them when None). Reads only project_progress,
+    so it is cheap enough to run after every change.
+
+    Component1: Weighted Task Score (70%)  | pending=0, in_progress=0.4, submitted=0.7, approved=1.0
+    Component2: In-Progress Bonus (10%)    | rewards active work in progress
+    Component3: Leader Approval Bonus (10%)| unlocks when leader marks project 'completed'
+    Component4: Admin Closure Bonus (10%)  | closed projects are pinned at 100 by the
+                                           | admin's accept and left alone here
+
+    Returns {project_id: progress} of the rows written.
+    """
+    where, params = "", ()
+    if project_ids is not None:
+        project_ids = sorted({pid for pid in project_ids if pid is not None})
+        if not project_ids:
+            return {}
+        where, params = "AND p.project_id = ANY(%s::int[])", (project_ids,)
+
+    with cur.connection.cursor() as c:
+        c.execute(
+            f"""
+            UPDATE projects p
+            SET progress = LEAST(100, FLOOR(
+                    COALESCE(pp.weighted_sum * 70.0 / NULLIF(pp.weight_total, 0), 0)
+                  + COALESCE(pp.in_progress_tasks * 10.0 / NULLIF(pp.counted_tasks, 0), 0)
+                  + CASE WHEN p.status = 'completed' THEN 10 ELSE 0 END
+                )),
+                updated_at = NOW()
+            FROM projects target
+            LEFT JOIN project_progress pp ON pp.project_id = target.project_id
+            WHERE p.project_id = target.project_id
+              AND p.status IS DISTINCT FROM 'closed'
+              {where}
+            RETURNING p.project_id, p.progress
+            """,
+            params,
+        )
+        return dict(c.fetchall())
+
+
+def refresh_project_progress(cur, project_id):
+    """refresh_progress() for one project; returns its progress (None if closed or missing)."""
+    return refresh_progress(cur, [project_id]).get(project_id)
+
+
+def get_task_counts(cur, project_id):
+    """(status, total_tasks, approved_tasks) of a project, or None if it doesn't exist."""
+    with cur.connection.cursor() as c:
+        c.execute(
+            """
+            SELECT p.status,
+                   COALESCE(pp.total_tasks, 0),
+                   COALESCE(pp.approved_tasks, 0)
+            FROM projects p
+            LEFT JOIN project_progress pp ON pp.project_id = p.project_id
+            WHERE p.project_id = %s
+            """,
+            (project_id,),
+        )
+        return c.fetchone()
+
+
+def get_completion_progress(cur, project_id):
+    """Plain completion ratio: ROUND(approved_tasks * 100.0 / total_tasks)."""
+    with cur.connection.cursor() as c:
+        c.execute(
+            """
+            SELECT CASE
+                WHEN COALESCE(total_tasks, 0) = 0 THEN 0
+                ELSE ROUND(approved_tasks * 100.0 / total_tasks)
+            END
+            FROM project_progress
+            WHERE project_id = %s
+            """,
+            (project_id,),
+        )
+        row = c.fetchone()
+    return int(row[0]) if row else 0
+
+
+def calculate_smart_progress(status, total_tasks, approved_tasks):
+    """
+    Smart progress formula based on project lifecycle + task completion.
+
+    Rules:
+      - initiated  (no leader, no tasks)  => always 0%
+      - ongoing, 0 tasks                  => 1%  (leader assigned, work not started)
+      - ongoing, tasks exist              => 10% + FLOOR(approved/total * 89%)
+                                             capped at 90% max until formally submitted
+      - completed  (leader submitted)     => 95%
+      - closed     (admin accepted)       => 100%
+
+    Also returns display_label like "45% (3/7 tasks)" to avoid 1/1=100% confusion.
+    """
+    if status == "closed":
+        progress = 100
+    elif status == "completed":
+        progress = 95
+    elif status == "initiated":
+        progress = 0
+    elif status == "ongoing":
+        if total_tasks == 0:
+            # Leader assigned but no tasks created yet
+            progress = 1
+        else:
+            # 10% base (leader working) + up to 80% from task ratio, capped at 90%
+            task_ratio = approved_tasks / total_tasks
+            progress = min(10 + int(task_ratio * 80), 90)
+    else:
+        progress = 0
+
+    return progress
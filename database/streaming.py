@@ -0,0 +1,64 @@
+import csv
+import io
+import uuid
+import zlib
+
+from database.db import get_pool
+
+# Rows pulled from the server per round trip by iter_rows()
+STREAM_ITERSIZE = 2000
+# Bytes of CSV buffered before a chunk is handed to the WSGI server
+CSV_CHUNK_SIZE = 64 * 1024
+
+
+def iter_rows(query, params=None, itersize=STREAM_ITERSIZE):
+    """
+    Yield the rows of `query` through a named (server-side) cursor.
+
+    Only `itersize` rows are in memory at a time. The generator checks
+    out its OWN pooled connection: a streamed response is still being
+    read after the request's connection has gone back to the pool. The
+    connection is returned when the generator is exhausted or closed
+    (werkzeug closes the response iterable on client disconnect too).
+    """
+    conn = get_pool().getconn()
+    try:
+        cur = conn.cursor(name=f"stream_{uuid.uuid4().hex}")
+        cur.itersize = itersize
+        try:
+            cur.execute(query, params)
+            for row in cur:
+                yield row
+        finally:
+            cur.close()
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def csv_chunks(rows, header=None, chunk_size=CSV_CHUNK_SIZE):
+    """Encode rows as CSV and yield them as UTF-8 chunks of ~chunk_size bytes."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(header)
+
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def gzip_chunks(chunks, level=6):
+    """Gzip a stream of byte chunks on the fly."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31 → gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,211 @@
+from psycopg2.extras import execute_values
+from database.data_version import bump_data_version
+from database.progress import (
+    apply_progress_deltas,
+    refresh_progress,
+    resync_project_progress,
+)
+
+# Two rollups are kept in step with the tasks table:
+#   project_task_stats → task counts per (project, assignee, status, priority)
+#   project_task_due   → open (not approved) task counts per (project, assignee,
+#                        due_date); overdue = rows with due_date < CURRENT_DATE,
+#                        so the counts stay right as days pass.
+
+# Columns that describe a task for the rollups, in this order. Use them in
+# RETURNING clauses so the rows can be passed straight to record_task_change().
+TASK_STATS_COLUMNS = "project_id, assigned_to, status, priority, due_date"
+
+# For UPDATEs: `UPDATE tasks t SET ... FROM {OLD_TASK_ROW} WHERE t.task_id = old.task_id
+# {RETURNING_BEFORE_AFTER}` locks the row, updates it and returns both versions
+# in one round trip; hand the cursor to record_task_update() afterwards.
+OLD_TASK_ROW = (
+    f"(SELECT task_id, {TASK_STATS_COLUMNS} FROM tasks WHERE task_id = %s FOR UPDATE) old"
+)
+RETURNING_BEFORE_AFTER = """
+    RETURNING old.project_id, old.assigned_to, old.status, old.priority, old.due_date,
+              t.project_id, t.assigned_to, t.status, t.priority, t.due_date
+"""
+
+# Per-member counters of one project for leader views:
+# `LEFT JOIN {MEMBER_TASK_COUNTS} mc ON mc.assigned_to = u.user_id`,
+# with the project_id as its one parameter.
+MEMBER_TASK_COUNTS = """(
+    SELECT
+        s.assigned_to,
+        SUM(s.task_count) AS tasks,
+        COALESCE(SUM(s.task_count) FILTER (WHERE s.status = 'approved'), 0) AS completed,
+        COALESCE((
+            SELECT SUM(d.open_count)
+            FROM project_task_due d
+            WHERE d.project_id = s.project_id
+              AND d.assigned_to = s.assigned_to
+              AND d.due_date < CURRENT_DATE
+        ), 0) AS overdue
+    FROM project_task_stats s
+    WHERE s.project_id = %s
+      AND s.assigned_to IS NOT NULL
+    GROUP BY s.project_id, s.assigned_to
+)"""
+
+
+def _is_open(status):
+    return status is not None and status != "approved"
+
+
+def _net_deltas(rows):
+    """Sum (*key, n) rows per key and drop the ones that cancel out."""
+    counts = {}
+    for *key, n in rows:
+        key = tuple(key)
+        counts[key] = counts.get(key, 0) + n
+    return [key + (n,) for key, n in counts.items() if n]
+
+
+def record_task_change(cur, before=None, after=None):
+    """
+    Apply one task mutation to the rollups, to the project_progress
+    running aggregates and to projects.progress.
+
+    `before` / `after` are TASK_STATS_COLUMNS tuples describing the task
+    before and after the change; pass only `after` for an INSERT and only
+    `before` for a DELETE. Must run on the same cursor/transaction as the
+    mutation so everything commits together.
+    """
+    changes = []
+    if before:
+        changes.append((tuple(before), -1))
+    if after:
+        changes.append((tuple(after), 1))
+    bump_data_version(cur, [row[0] for row, _ in changes])
+
+    stats = _net_deltas(row[:4] + (n,) for row, n in changes)
+    if stats:
+        execute_values(
+            cur,
+            """
+            INSERT INTO project_task_stats
+                (project_id, assigned_to, status, priority, task_count)
+            VALUES %s
+            ON CONFLICT ON CONSTRAINT project_task_stats_key
+            DO UPDATE SET task_count = project_task_stats.task_count + EXCLUDED.task_count
+            """,
+            stats,
+        )
+        apply_progress_deltas(cur, stats)
+        refresh_progress(cur, [row[0] for row in stats])
+
+    due = _net_deltas(
+        (row[0], row[1], row[4], n) for row, n in changes if _is_open(row[2])
+    )
+    if due:
+        execute_values(
+            cur,
+            """
+            INSERT INTO project_task_due (project_id, assigned_to, due_date, open_count)
+            VALUES %s
+            ON CONFLICT ON CONSTRAINT project_task_due_key
+            DO UPDATE SET open_count = project_task_due.open_count + EXCLUDED.open_count
+            """,
+            due,
+        )
+
+
+def record_task_update(cur):
+    """
+    Fetch the RETURNING_BEFORE_AFTER row of an UPDATE and apply it.
+    Returns the task's (before, after) TASK_STATS_COLUMNS tuples, or
+    (None, None) if nothing was updated.
+    """
+    row = cur.fetchone()
+    if not row:
+        return None, None
+    half = len(row) // 2
+    before, after = tuple(row[:half]), tuple(row[half:])
+    record_task_change(cur, before, after)
+    return before, after
+
+
+def get_task_counters(cur, project_id):
+    """
+    Task counters of one project, read from the rollups:
+    {"total", "overdue", "status": {status: n}, "priority": {priority: n}}.
+    Statuses / priorities without tasks are left out, like a GROUP BY would.
+    """
+    counters = {"total": 0, "overdue": 0, "status": {}, "priority": {}}
+    if project_id is None:
+        return counters
+
+    with cur.connection.cursor() as c:
+        c.execute(
+            """
+            SELECT 'status', status, SUM(task_count)
+            FROM project_task_stats
+            WHERE project_id = %(project_id)s
+            GROUP BY status
+            HAVING SUM(task_count) > 0
+
+            UNION ALL
+
+            SELECT 'priority', priority, SUM(task_count)
+            FROM project_task_stats
+            WHERE project_id = %(project_id)s
+            GROUP BY priority
+            HAVING SUM(task_count) > 0
+
+            UNION ALL
+
+            SELECT 'overdue', NULL, COALESCE(SUM(open_count), 0)
+            FROM project_task_due
+            WHERE project_id = %(project_id)s
+              AND due_date < CURRENT_DATE
+            """,
+            {"project_id": project_id},
+        )
+        rows = c.fetchall()
+
+    for kind, key, count in rows:
+        if kind == "overdue":
+            counters["overdue"] = int(count)
+        else:
+            counters[kind][key] = int(count)
+    counters["total"] = sum(counters["status"].values())
+    return counters
+
+
+def rebuild_task_stats(cur, project_id=None):
+    """Recompute the rollups (and progress aggregates) from tasks — all projects, or just one."""
+    if project_id is None:
+        cur.execute("DELETE FROM project_task_stats")
+        cur.execute("DELETE FROM project_task_due")
+        where, params = "WHERE project_id IS NOT NULL", ()
+    else:
+        cur.execute(
+            "DELETE FROM project_task_stats WHERE project_id = %s", (project_id,)
+        )
+        cur.execute("DELETE FROM project_task_due WHERE project_id = %s", (project_id,))
+        where, params = "WHERE project_id = %s", (project_id,)
+
+    cur.execute(
+        f"""
+        INSERT INTO project_task_stats
+            (project_id, assigned_to, status, priority, task_count)
+        SELECT project_id, assigned_to, status, priority, COUNT(*)
+        FROM tasks
+        {where}
+        GROUP BY project_id, assigned_to, status, priority
+        """,
+        params,
+    )
+    cur.execute(
+        f"""
+        INSERT INTO project_task_due (project_id, assigned_to, due_date, open_count)
+        SELECT project_id, assigned_to, due_date, COUNT(*)
+        FROM tasks
+        {where}
+          AND status <> 'approved'
+        GROUP BY project_id, assigned_to, due_date
+        """,
+        params,
+    )
+    resync_project_progress(cur, project_id)
@@ -6,13 +6,23 @@ from flask import (
     url_for,
     jsonify,
     session,
+    current_app,
 )
 from database.db import get_db
+from database.data_version import bump_user_projects, get_user_data_stamp
+from auth.hashing import hash_password, verify_password
+from auth.utils import forget_login_misses, invalidate_user
+from database.task_stats import OLD_TASK_ROW, RETURNING_BEFORE_AFTER, record_task_update
 from psycopg2.extras import RealDictCursor
-from DS.TaskPriorityQueue import TaskPriorityQueue
+from employee.work_queue import get_work_tasks, patch_task
+from DS.TaskPriorityQueue import composite_key
 
 employee_bp = Blueprint("employee", __name__)
 
+# My Work pagination (?page= / ?per_page= / ?offset=)
+WORK_PAGE_SIZE = 20
+WORK_PAGE_SIZE_MAX = 100
+
 
 # ============================
 # LOGIN CHECK HELPER (LIKE ADMIN)
@@ -182,31 +192,68 @@ def my_work():
     )
     project = cur.fetchone()
 
+    def load_tasks():
+        cur.execute(
+            """
+        SELECT 
+            t.task_id,
+            t.title,
+            t.status,
+            t.priority,
+            t.due_date
+        FROM tasks t
+        JOIN projects p ON t.project_id = p.project_id
+        WHERE t.assigned_to = %s
+        AND p.is_deleted = FALSE   -- 🔥 hide deleted project tasks
+        AND COALESCE(t.status, '') NOT IN ('completed', 'approved')   -- finished work never enters the queue
+        ORDER BY t.due_date ASC NULLS LAST
+        """,
+            (user_id,),
+        )
+        return cur.fetchall() or []
+
+    per_page = request.args.get("per_page", WORK_PAGE_SIZE, type=int)
+    per_page = min(max(per_page, 1), WORK_PAGE_SIZE_MAX)
+    page = max(request.args.get("page", 1, type=int), 1)
+    offset = request.args.get("offset", type=int)
+    if offset is None:
+        offset = (page - 1) * per_page
+    offset = max(offset, 0)
+
+    # 🔢 Apply Priority Queue — sort tasks: high → medium → low
+    # (TASK_QUEUE config picks the implementation: "heap", "bucket" or
+    # "indexed"; indexed queues are cached per user and patched in place.
+    # TASK_ORDER = "composite" also orders by overdue, due date and status.)
+    key = None
+    if current_app.config.get("TASK_ORDER") == "composite":
+        key = composite_key()
+    tasks, open_tasks = get_work_tasks(
+        user_id,
+        load_tasks,
+        current_app.config.get("TASK_QUEUE"),
+        key,
+        offset=offset,
+        limit=per_page,
+        stamp=get_user_data_stamp(cur, user_id),  # changes made by other workers
+    )
+
+    # Progress over ALL tasks (finished ones included) — from the rollup
     cur.execute(
         """
-    SELECT 
-        t.task_id,
-        t.title,
-        t.status,
-        t.priority,
-        t.due_date
-    FROM tasks t
-    JOIN projects p ON t.project_id = p.project_id
-    WHERE t.assigned_to = %s
-    AND p.is_deleted = FALSE   -- 🔥 hide deleted project tasks
-    ORDER BY t.due_date ASC NULLS LAST
-    """,
+        SELECT
+            COALESCE(SUM(s.task_count), 0) AS total_tasks,
+            COALESCE(SUM(s.task_count) FILTER (WHERE s.status = 'completed'), 0)
+                AS completed_tasks
+        FROM project_task_stats s
+        JOIN projects p ON p.project_id = s.project_id
+        WHERE s.assigned_to = %s
+          AND p.is_deleted = FALSE
+        """,
         (user_id,),
     )
-    raw_tasks = cur.fetchall() or []
-
-    # 🔢 Apply Priority Queue — sort tasks: high → medium → low
-    pq = TaskPriorityQueue()
-    pq.push_all(raw_tasks)
-    tasks = pq.get_all()
-
-    total_tasks = len(tasks)
-    completed_tasks = sum(1 for t in tasks if t.get("status") == "completed")
+    counts = cur.fetchone()
+    total_tasks = counts["total_tasks"]
+    completed_tasks = counts["completed_tasks"]
     progress = int((completed_tasks / total_tasks) * 100) if total_tasks else 0
 
     cur.close()
@@ -217,6 +264,11 @@ def my_work():
         project=project,
         tasks=tasks,
         progress=progress,
+        page=page,
+        per_page=per_page,
+        offset=offset,
+        open_tasks=open_tasks,
+        has_next=offset + len(tasks) < open_tasks,
         active_page="work",
     )
 
@@ -262,19 +314,24 @@ def submit_task(task_id):
 
     # Update to submitted status
     cur.execute(
-        """
-        UPDATE tasks
+        f"""
+        UPDATE tasks t
         SET status = 'submitted', 
             submitted_at = CURRENT_TIMESTAMP,
             last_action_by = %s,
             last_action_at = CURRENT_TIMESTAMP
-        WHERE task_id = %s AND assigned_to = %s
+        FROM {OLD_TASK_ROW}
+        WHERE t.task_id = old.task_id AND t.assigned_to = %s
+        {RETURNING_BEFORE_AFTER}
     """,
         (user_id, task_id, user_id),
     )
+    updated = cur.rowcount
+    before, after = record_task_update(cur)
 
     conn.commit()
-    updated = cur.rowcount
+    if after:
+        patch_task(task_id, before, after)
 
     cur.close()
     conn.close()
@@ -314,7 +371,10 @@ def profile():
         """,
             (name, email, user_id),
         )
+        bump_user_projects(cur, user_id)  # reports print the name
         conn.commit()
+        invalidate_user(user_id)
+        forget_login_misses(email)
 
         # keep sidebar name updated
         if name:
@@ -381,7 +441,7 @@ def change_password():
         conn.close()
         return jsonify({"success": False, "message": "Auth record not found"}), 404
 
-    if row[0] != current_password:
+    if not verify_password(row[0], current_password)[0]:
         cur.close()
         conn.close()
         return jsonify({"success": False, "message": "Current password is wrong"}), 400
@@ -392,7 +452,7 @@ def change_password():
         SET password_hash=%s, updated_at=CURRENT_TIMESTAMP
         WHERE user_id=%s
     """,
-        (new_password, user_id),
+        (hash_password(new_password), user_id),
     )
     conn.commit()
 
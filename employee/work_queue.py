@@ -0,0 +1,129 @@
+import threading
+
+from DS.TTLCache import TTLCache
+from DS.TaskPriorityQueue import DONE_STATUSES
+from DS.TaskQueueFactory import create_task_queue
+
+# -----------------------------
+# MY WORK QUEUE CACHE
+# -----------------------------
+# user_id → the ordered queue of OPEN tasks behind /employee/my-work
+# (approved / completed tasks never enter it).
+# Only queues that can be patched by task_id (the "indexed" kind) are
+# cached. The task routes call patch_task() after committing, so a cached
+# list is patched in place (O(log n)) instead of being rebuilt from SQL.
+#
+# The cache is per process, so each queue is stored with the user's data
+# stamp (database.data_version.get_user_data_stamp) and a read with a
+# different stamp reloads: a change committed by another worker shows up
+# on the next view. A local patch can't know the stamp its own commit
+# produced, so the next read adopts whatever stamp it sees; a change made
+# elsewhere in that short gap is caught by the TTL.
+WORK_QUEUE_TTL = 60  # seconds
+
+_work_queues = TTLCache(ttl=WORK_QUEUE_TTL, max_size=1024)
+_lock = threading.RLock()
+_version = 0  # bumped on every patch — a queue loaded meanwhile isn't cached
+
+
+def _bump():
+    global _version
+    _version += 1
+
+
+def _page(queue, offset, limit):
+    if limit is None:
+        tasks = queue.get_all()[offset:]
+    else:
+        # only the prefix up to the page end is extracted: O(n + k log n)
+        tasks = queue.nlargest(offset + limit)[offset:]
+    # copies: the cached rows are patched in place under _lock, the
+    # caller reads (and may edit) its page without it
+    return [dict(task) for task in tasks], queue.size()
+
+
+def get_work_tasks(
+    user_id, load_tasks, kind=None, key=None, offset=0, limit=None, stamp=None
+):
+    """
+    One page of a user's ordered work list, as (tasks, total_queued).
+
+    Served from the cached queue when there is one and its stamp matches
+    `stamp` (None skips the check); otherwise load_tasks() is called (the
+    SQL query) and the resulting queue is cached if it can be patched later.
+    """
+    with _lock:
+        entry = _work_queues.get(user_id)  # [stamp, queue]
+        if entry is not None:
+            if entry[0] is None:
+                entry[0] = stamp  # first read after a local patch
+            if stamp is None or entry[0] == stamp:
+                return _page(entry[1], offset, limit)
+            _work_queues.pop(user_id)
+        version = _version
+
+    queue = create_task_queue(kind, key)
+    queue.push_all(load_tasks())
+
+    with _lock:
+        if hasattr(queue, "contains") and version == _version:
+            _work_queues.set(user_id, [stamp, queue])
+        return _page(queue, offset, limit)
+
+
+def _patched_queue(user_id):
+    # the queue is about to change here, so its stored stamp no longer
+    # applies; edited in place so the entry keeps its original expiry
+    entry = _work_queues.get(user_id)
+    if entry is None:
+        return None
+    entry[0] = None
+    return entry[1]
+
+
+def patch_task(task_id, before=None, after=None, **fields):
+    """
+    Apply a committed task change to the cached queues.
+
+    `before` / `after` are database.task_stats TASK_STATS_COLUMNS tuples
+    (project_id, assigned_to, status, priority, due_date); pass only
+    `after` for a new task and only `before` for a deleted one. `fields`
+    are other My Work columns the caller knows (e.g. title).
+    """
+    old_user = before[1] if before else None
+    new_user = after[1] if after else None
+
+    with _lock:
+        _bump()
+
+        if old_user is not None and old_user != new_user:
+            queue = _patched_queue(old_user)
+            if queue is not None:
+                queue.remove(task_id)
+
+        if new_user is None:
+            return
+        queue = _patched_queue(new_user)
+        if queue is None:
+            return
+
+        if after[2] in DONE_STATUSES:
+            queue.remove(task_id)
+            return
+
+        changes = {"status": after[2], "priority": after[3], "due_date": after[4]}
+        changes.update(fields)
+        if queue.contains(task_id):
+            queue.update(task_id, changes)
+        elif "title" in changes:
+            queue.push({"task_id": task_id, **changes})
+        else:
+            # not enough columns to build the row — rebuild on next view
+            _work_queues.pop(new_user)
+
+
+def clear_work_queues():
+    """Drop every cached queue (e.g. a project was deleted / restored)."""
+    with _lock:
+        _bump()
+        _work_queues.clear()
@@ -0,0 +1,144 @@
+from datetime import datetime
+
+from database.data_version import get_data_version
+from DS.TTLCache import TTLCache
+
+# -----------------------------
+# PROJECT REPORT DATA
+# -----------------------------
+# Everything the reports page, the PDF export and the emailed report show
+# about one project, fetched in ONE round trip and shared by all three.
+# Results are memoized per (project_id, data version): any task or
+# membership change bumps the version (database/data_version.py), and the
+# TTL bounds how stale names / designations can get.
+REPORT_DATA_TTL = 30  # seconds
+
+_report_data = TTLCache(ttl=REPORT_DATA_TTL, max_size=256)
+
+REPORT_DATA_QUERY = """
+WITH members AS (
+    SELECT u.user_id, u.name, u.designation, pm.role_in_project, pm.joined_at
+    FROM project_members pm
+    JOIN users u ON u.user_id = pm.user_id
+    WHERE pm.project_id = %(project_id)s
+      AND (pm.is_deleted = FALSE OR pm.is_deleted IS NULL)
+),
+member_counts AS (
+    SELECT
+        s.assigned_to,
+        SUM(s.task_count) AS tasks,
+        COALESCE(SUM(s.task_count) FILTER (WHERE s.status = 'approved'), 0) AS completed
+    FROM project_task_stats s
+    WHERE s.project_id = %(project_id)s
+      AND s.assigned_to IS NOT NULL
+    GROUP BY s.assigned_to
+),
+member_overdue AS (
+    SELECT d.assigned_to, SUM(d.open_count) AS overdue
+    FROM project_task_due d
+    WHERE d.project_id = %(project_id)s
+      AND d.assigned_to IS NOT NULL
+      AND d.due_date < CURRENT_DATE
+    GROUP BY d.assigned_to
+),
+counts AS (
+    SELECT
+        CASE WHEN GROUPING(s.status) = 0 THEN 'status' ELSE 'priority' END AS kind,
+        CASE WHEN GROUPING(s.status) = 0 THEN s.status ELSE s.priority END AS key,
+        SUM(s.task_count) AS n
+    FROM project_task_stats s
+    WHERE s.project_id = %(project_id)s
+    GROUP BY GROUPING SETS ((s.status), (s.priority))
+    HAVING SUM(s.task_count) > 0
+),
+activities AS (
+    (SELECT 'task_completed' AS type, t.title AS description,
+            u.name AS user_name, t.completed_at AS created_at
+     FROM tasks t
+     JOIN users u ON t.assigned_to = u.user_id
+     WHERE t.project_id = %(project_id)s AND t.completed_at IS NOT NULL
+     ORDER BY t.completed_at DESC LIMIT 5)
+    UNION ALL
+    (SELECT 'member_joined', m.role_in_project, m.name, m.joined_at
+     FROM members m
+     ORDER BY m.joined_at DESC LIMIT 5)
+)
+SELECT
+    (SELECT COUNT(*) FROM members) AS team_count,
+    (SELECT COALESCE(SUM(open_count), 0)
+     FROM project_task_due
+     WHERE project_id = %(project_id)s AND due_date < CURRENT_DATE) AS overdue,
+    (SELECT COALESCE(json_agg(json_build_array(kind, key, n) ORDER BY kind, key), '[]')
+     FROM counts) AS counts,
+    (SELECT COALESCE(json_agg(json_build_array(
+                m.user_id, m.name, m.designation,
+                COALESCE(mc.tasks, 0), COALESCE(mc.completed, 0), COALESCE(mo.overdue, 0)
+            ) ORDER BY COALESCE(mc.completed, 0) DESC), '[]')
+     FROM members m
+     LEFT JOIN member_counts mc ON mc.assigned_to = m.user_id
+     LEFT JOIN member_overdue mo ON mo.assigned_to = m.user_id) AS team,
+    (SELECT COALESCE(json_agg(json_build_array(type, description, user_name, created_at)
+                              ORDER BY created_at DESC), '[]')
+     FROM (SELECT * FROM activities ORDER BY created_at DESC LIMIT 10) a) AS activities
+"""
+
+
+def _timestamp(value):
+    return datetime.fromisoformat(value) if value else None
+
+
+def _fetch_report_data(cur, project_id, data_version):
+    with cur.connection.cursor() as c:
+        c.execute(REPORT_DATA_QUERY, {"project_id": project_id})
+        team_count, overdue, counts, team, activities = c.fetchone()
+
+    by_kind = {"status": {}, "priority": {}}
+    for kind, key, n in counts:
+        by_kind[kind][key] = int(n)
+    total = sum(by_kind["status"].values())
+    approved = by_kind["status"].get("approved", 0)
+
+    return {
+        "project_id": project_id,
+        "data_version": data_version,
+        # (total, completed, in progress, pending review, overdue)
+        "task_stats": (
+            total,
+            approved,
+            by_kind["status"].get("In Progress", 0),
+            by_kind["status"].get("Pending Review", 0),
+            int(overdue),
+        ),
+        "team_count": team_count,
+        "completion_rate": round(approved / total * 100, 1) if total > 0 else 0,
+        "tasks_by_status": list(by_kind["status"].items()),
+        "tasks_by_priority": list(by_kind["priority"].items()),
+        # (user_id, name, designation, assigned, completed, overdue)
+        "team_performance": [tuple(member) for member in team],
+        # (type, description, user_name, created_at)
+        "recent_activities": [
+            (kind, description, user_name, _timestamp(created_at))
+            for kind, description, user_name, created_at in activities
+        ],
+    }
+
+
+def get_report_data(cur, project_id):
+    """
+    Report data of one project (see _fetch_report_data for the shape).
+
+    Shared by every caller in this process until the project's data
+    version changes or REPORT_DATA_TTL runs out. Treat it as read-only.
+    """
+    data_version = get_data_version(cur, project_id)
+    key = (project_id, data_version)
+    data = _report_data.get(key)
+    if data is None:
+        data = _fetch_report_data(cur, project_id, data_version)
+        _report_data.set(key, data)
+    return data
+
+
+def pdf_team_rows(data):
+    """team_performance without user_id — the row shape generate_pdf_report expects."""
+    return [member[1:] for member in data["team_performance"]]
@@ -8,15 +8,34 @@ from flask import (
     url_for,
     make_response,
     current_app,
+    Response,
 )
-from database.db import get_db
+from database.db import get_db, get_cursor
+from database.streaming import csv_chunks, gzip_chunks, iter_rows
+from database.data_version import bump_user_projects, get_data_version
+from leader.report_data import get_report_data, pdf_team_rows
+from services.pdf_renderer import (
+    PdfQueueFullError,
+    PdfRenderError,
+    PdfRenderTimeout,
+    render_report_pdf,
+)
+from services.mail_queue import enqueue_mail
+from services.report_cache import get_report_cache, report_key
+from database.task_stats import (
+    OLD_TASK_ROW,
+    RETURNING_BEFORE_AFTER,
+    TASK_STATS_COLUMNS,
+    get_task_counters,
+    record_task_change,
+    record_task_update,
+)
+from database.progress import refresh_project_progress, resync_project_progress
+from employee.work_queue import patch_task
+from auth.hashing import PasswordHashBusyError, hash_password, verify_password
+from auth.utils import forget_login_misses, invalidate_user
 from datetime import datetime, timedelta
 import io
-import csv
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from flask_mail import Mail, Message
 
 
@@ -28,8 +47,9 @@ project_leader_bp = Blueprint("project_leader", __name__)
 # ============================
 
 
-def get_leader_project(leader_id, cur):
+def get_leader_project(leader_id, cur=None):
     """Get the leader's active project only. Returns None if closed or not found."""
+    cur = cur or get_cursor()
     cur.execute(
         """
         SELECT p.project_id, p.project_name
@@ -48,8 +68,9 @@ def get_leader_project(leader_id, cur):
     return cur.fetchone()
 
 
-def get_notifications(leader_id, cur):
+def get_notifications(leader_id, cur=None):
     """Fetch notification count and recent 3 notifications for a leader."""
+    cur = cur or get_cursor()
     cur.execute(
         """
         SELECT COUNT(*) 
@@ -84,179 +105,6 @@ def get_notifications(leader_id, cur):
     return notification_count, recent_notifications
 
 
-def generate_pdf_report(
-    project,
-    stats,
-    team_data,
-    tasks_by_status=None,
-    tasks_by_priority=None,
-    recent_activities=None,
-    completion_rate=0,
-):
-    """Generate a PDF report and return the buffer."""
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4)
-    styles = getSampleStyleSheet()
-    story = []
-
-    title_style = ParagraphStyle(
-        "CustomTitle",
-        parent=styles["Heading1"],
-        fontSize=24,
-        spaceAfter=30,
-        textColor=colors.HexColor("#2563eb"),
-    )
-
-    story.append(Paragraph(f"Project Report: {project[1]}", title_style))
-    story.append(
-        Paragraph(
-            f"Generated: {datetime.now().strftime('%B %d, %Y %I:%M %p')}",
-            styles["Normal"],
-        )
-    )
-    story.append(Spacer(1, 20))
-
-    # Task Statistics
-    story.append(Paragraph("Task Statistics", styles["Heading2"]))
-    story.append(Spacer(1, 10))
-
-    stats_data = [
-        ["Metric", "Count"],
-        ["Total Tasks", str(stats[0] or 0)],
-        ["Completed", str(stats[1] or 0)],
-        ["In Progress", str(stats[2] or 0)],
-        ["Pending Review", str(stats[3] or 0)],
-        ["Overdue", str(stats[4] or 0)],
-        ["Completion Rate", f"{completion_rate}%"],
-    ]
-    stats_table = Table(stats_data)
-    stats_table.setStyle(
-        TableStyle(
-            [
-                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#2563eb")),
-                ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                ("FONTSIZE", (0, 0), (-1, 0), 14),
-                ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
-                ("BACKGROUND", (0, 1), (-1, -1), colors.beige),
-                ("GRID", (0, 0), (-1, -1), 1, colors.black),
-            ]
-        )
-    )
-    story.append(stats_table)
-    story.append(Spacer(1, 30))
-
-    # Tasks by Status
-    if tasks_by_status:
-        story.append(Paragraph("Tasks by Status", styles["Heading2"]))
-        story.append(Spacer(1, 10))
-        status_data = [["Status", "Count"]] + [
-            [s[0], str(s[1])] for s in tasks_by_status
-        ]
-        status_table = Table(status_data)
-        status_table.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#10b981")),
-                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                    ("GRID", (0, 0), (-1, -1), 1, colors.black),
-                ]
-            )
-        )
-        story.append(status_table)
-        story.append(Spacer(1, 30))
-
-    # Tasks by Priority
-    if tasks_by_priority:
-        story.append(Paragraph("Tasks by Priority", styles["Heading2"]))
-        story.append(Spacer(1, 10))
-        priority_data = [["Priority", "Count"]] + [
-            [p[0], str(p[1])] for p in tasks_by_priority
-        ]
-        priority_table = Table(priority_data)
-        priority_table.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#f59e0b")),
-                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                    ("GRID", (0, 0), (-1, -1), 1, colors.black),
-                ]
-            )
-        )
-        story.append(priority_table)
-        story.append(Spacer(1, 30))
-
-    # Team Performance
-    story.append(Paragraph("Team Performance", styles["Heading2"]))
-    story.append(Spacer(1, 10))
-    team_table_data = [["Name", "Role", "Tasks", "Completed", "Overdue"]]
-    for member in team_data:
-        team_table_data.append(
-            [
-                member[0],
-                member[1] or "N/A",
-                str(member[2] or 0),
-                str(member[3] or 0),
-                str(member[4] or 0) if len(member) > 4 else "0",
-            ]
-        )
-    team_table = Table(team_table_data)
-    team_table.setStyle(
-        TableStyle(
-            [
-                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#8b5cf6")),
-                ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                ("GRID", (0, 0), (-1, -1), 1, colors.black),
-            ]
-        )
-    )
-    story.append(team_table)
-    story.append(Spacer(1, 30))
-
-    # Recent Activities
-    if recent_activities:
-        story.append(Paragraph("Recent Activities", styles["Heading2"]))
-        story.append(Spacer(1, 10))
-        activities_data = [["User", "Activity", "Date"]]
-        for activity in recent_activities:
-            desc = (
-                f"Completed task: {activity[1]}"
-                if activity[0] == "task_completed"
-                else f"Joined as {activity[1]}"
-            )
-            activities_data.append(
-                [
-                    activity[2],
-                    desc,
-                    activity[3].strftime("%b %d, %Y") if activity[3] else "N/A",
-                ]
-            )
-        activities_table = Table(activities_data)
-        activities_table.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#6b7280")),
-                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                    ("GRID", (0, 0), (-1, -1), 1, colors.black),
-                ]
-            )
-        )
-        story.append(activities_table)
-
-    doc.build(story)
-    buffer.seek(0)
-    return buffer
-
-
 # ============================
 # ROUTES
 # ============================
@@ -696,21 +544,14 @@ def tasks():
     )
     tasks = cur.fetchall()
 
-    cur.execute(
-        """
-        SELECT 
-            COUNT(*) FILTER (WHERE t.status = 'approved') as completed,
-            COUNT(*) FILTER (WHERE t.due_date < CURRENT_DATE AND t.status != 'approved') as overdue,
-            COUNT(*) FILTER (WHERE t.status = 'in_progress') as in_progress,
-            COUNT(*) FILTER (WHERE t.status = 'submitted') as pending_review
-        FROM tasks t
-        JOIN projects p ON t.project_id = p.project_id
-        WHERE p.leader_id = %s
-        AND t.project_id = %s;
-    """,
-        (leader_id, active_project_id),
+    # Summary cards — read from the task rollups, not the tasks table
+    counters = get_task_counters(cur, active_project_id)
+    task_summary = (
+        counters["status"].get("approved", 0),
+        counters["overdue"],
+        counters["status"].get("in_progress", 0),
+        counters["status"].get("submitted", 0),
     )
-    task_summary = cur.fetchone()
 
     cur.execute(
         """
@@ -807,6 +648,9 @@ def add_team_member():
         (project[0], user_id, role),
     )
 
+    # membership decides which tasks count towards progress
+    resync_project_progress(cur, project[0])
+
     conn.commit()
     cur.close()
     conn.close()
@@ -843,104 +687,7 @@ def reports():
     if not project:
         return render_template("projectLeader/reports.html", error="No project found")
 
-    project_id = project[0]
-
-    cur.execute(
-        """
-        SELECT 
-            COUNT(*) as total_tasks,
-            COUNT(*) FILTER (WHERE status = 'approved') as completed_tasks,
-            COUNT(*) FILTER (WHERE status = 'In Progress') as in_progress_tasks,
-            COUNT(*) FILTER (WHERE status = 'Pending Review') as pending_review_tasks,
-            COUNT(*) FILTER (WHERE due_date < CURRENT_DATE AND status != 'approved') as overdue_tasks
-        FROM tasks 
-        WHERE project_id = %s;
-    """,
-        (project_id,),
-    )
-    task_stats = cur.fetchone()
-
-    cur.execute(
-        """
-        SELECT COUNT(*) 
-        FROM project_members 
-        WHERE project_id = %s
-        AND (is_deleted = FALSE OR is_deleted IS NULL);
-    """,
-        (project_id,),
-    )
-    team_count = cur.fetchone()[0]
-
-    total_tasks = task_stats[0] or 0
-    completed_tasks = task_stats[1] or 0
-    completion_rate = (
-        round((completed_tasks / total_tasks * 100), 1) if total_tasks > 0 else 0
-    )
-
-    cur.execute(
-        """
-        SELECT 
-            u.user_id, u.name, u.designation,
-            COUNT(t.task_id) as total_assigned,
-            COUNT(*) FILTER (WHERE t.status = 'approved') as tasks_completed,
-            COUNT(*) FILTER (WHERE t.due_date < CURRENT_DATE AND t.status != 'approved') as overdue_tasks
-        FROM users u
-        JOIN project_members pm ON u.user_id = pm.user_id
-        LEFT JOIN tasks t ON u.user_id = t.assigned_to AND t.project_id = pm.project_id
-        WHERE pm.project_id = %s
-        AND (pm.is_deleted = FALSE OR pm.is_deleted IS NULL)
-        GROUP BY u.user_id, u.name, u.designation
-        ORDER BY tasks_completed DESC;
-    """,
-        (project_id,),
-    )
-    team_performance = cur.fetchall()
-
-    cur.execute(
-        """
-        SELECT status, COUNT(*) 
-        FROM tasks 
-        WHERE project_id = %s 
-        GROUP BY status;
-    """,
-        (project_id,),
-    )
-    tasks_by_status = cur.fetchall()
-
-    cur.execute(
-        """
-        SELECT priority, COUNT(*) 
-        FROM tasks 
-        WHERE project_id = %s 
-        GROUP BY priority;
-    """,
-        (project_id,),
-    )
-    tasks_by_priority = cur.fetchall()
-
-    cur.execute(
-        """
-        (SELECT 
-            'task_completed' as type, t.title as description,
-            u.name as user_name, t.completed_at as created_at
-        FROM tasks t
-        JOIN users u ON t.assigned_to = u.user_id
-        WHERE t.project_id = %s AND t.completed_at IS NOT NULL
-        ORDER BY t.completed_at DESC LIMIT 5)
-        UNION ALL
-        (SELECT 
-            'member_joined' as type, pm.role_in_project as description,
-            u.name as user_name, pm.joined_at as created_at
-        FROM project_members pm
-        JOIN users u ON pm.user_id = u.user_id
-        WHERE pm.project_id = %s
-        AND (pm.is_deleted = FALSE OR pm.is_deleted IS NULL)
-        ORDER BY pm.joined_at DESC LIMIT 5)
-        ORDER BY created_at DESC LIMIT 10;
-    """,
-        (project_id, project_id),
-    )
-    recent_activities = cur.fetchall()
+    data = get_report_data(cur, project[0])
 
     cur.close()
     conn.close()
@@ -948,13 +695,13 @@ def reports():
     return render_template(
         "projectLeader/reports.html",
         project=project,
-        task_stats=task_stats,
-        team_count=team_count,
-        completion_rate=completion_rate,
-        team_performance=team_performance,
-        tasks_by_status=tasks_by_status,
-        tasks_by_priority=tasks_by_priority,
-        recent_activities=recent_activities,
+        task_stats=data["task_stats"],
+        team_count=data["team_count"],
+        completion_rate=data["completion_rate"],
+        team_performance=data["team_performance"],
+        tasks_by_status=data["tasks_by_status"],
+        tasks_by_priority=data["tasks_by_priority"],
+        recent_activities=data["recent_activities"],
     )
 
 
@@ -1107,23 +854,10 @@ def dashboard():
     active_proj = cur.fetchone()
     active_project_id = active_proj[0] if active_proj else None
 
-    cur.execute(
-        """
-        SELECT 
-            COUNT(*) FILTER (WHERE t.status = 'approved') as completed_tasks,
-            COUNT(*) FILTER (WHERE t.due_date < CURRENT_DATE AND t.status != 'approved') as overdue_tasks,
-            COUNT(*) as total_tasks
-        FROM tasks t
-        JOIN projects p ON t.project_id = p.project_id
-        WHERE p.leader_id = %s
-        AND t.project_id = %s;
-    """,
-        (leader_id, active_project_id),
-    )
-    task_stats = cur.fetchone()
-    completed_tasks = task_stats[0] or 0
-    overdue_tasks = task_stats[1] or 0
-    total_tasks = task_stats[2] or 0
+    counters = get_task_counters(cur, active_project_id)
+    completed_tasks = counters["status"].get("approved", 0)
+    overdue_tasks = counters["overdue"]
+    total_tasks = counters["total"]
 
     cur.execute(
         """
@@ -1311,10 +1045,11 @@ def create_task():
         print(f"[CREATE TASK] form data: {dict(request.form)}")
 
         cur.execute(
-            """
+            f"""
             INSERT INTO tasks 
             (project_id, title, description, priority, assigned_to, assigned_by, due_date, status)
             VALUES (%s, %s, %s, %s, %s, %s, %s, 'in_progress')
+            RETURNING task_id, {TASK_STATS_COLUMNS}
         """,
             (
                 project_id,
@@ -1326,72 +1061,12 @@ def create_task():
                 request.form["due_date"],
             ),
         )
+        new_task = cur.fetchone()
+        record_task_change(cur, after=new_task[1:])
         print(f"[CREATE TASK] INSERT done")
 
-        # 🚀 AUTO-RECALCULATE project progress — Advanced Industry Formula
-        # Component1: Weighted Task Score (70%) | pending=0, in_progress=0.4, submitted=0.7, approved=1.0
-        # Component2: In-Progress Bonus (10%)   | rewards active work in progress
-        # Component3: Leader Approval Bonus (10%)| unlocks when leader marks project 'completed'
-        # Component4: Admin Closure Bonus (10%) | unlocks when admin closes the project
-        cur.execute(
-            """
-            UPDATE projects
-            SET progress = (
-                WITH task_score AS (
-                    -- C1 + C2: weighted task completion + in-progress bonus
-                    SELECT
-                        COALESCE(
-                            SUM(
-                                CASE t.priority WHEN 'high' THEN 3 WHEN 'medium' THEN 2 ELSE 1 END
-                                *
-                                CASE t.status
-                                    WHEN 'approved'    THEN 1.0
-                                    WHEN 'submitted'   THEN 0.7
-                                    WHEN 'in_progress' THEN 0.4
-                                    ELSE 0.0
-                                END
-                            ) * 70.0
-                            / NULLIF(SUM(
-                                CASE t.priority WHEN 'high' THEN 3 WHEN 'medium' THEN 2 ELSE 1 END
-                            ), 0)
-                        , 0) AS weighted_score,
-                        COALESCE(
-                            COUNT(*) FILTER (WHERE t.status = 'in_progress') * 10.0
-                            / NULLIF(COUNT(*), 0)
-                        , 0) AS inprogress_bonus
-                    FROM tasks t
-                    WHERE t.project_id = %s
-                    AND (
-                        t.assigned_to IS NULL
-                        OR EXISTS (
-                            SELECT 1 FROM project_members pm
-                            WHERE pm.project_id = t.project_id
-                              AND pm.user_id = t.assigned_to
-                              AND (pm.is_deleted = FALSE OR pm.is_deleted IS NULL)
-                        )
-                    )
-                ),
-                proj_status AS (
-                    -- C3 + C4: authority bonuses from project status
-                    SELECT
-                        CASE WHEN status IN ('completed', 'closed') THEN 10 ELSE 0 END AS leader_bonus,
-                        CASE WHEN status = 'closed'                 THEN 10 ELSE 0 END AS admin_bonus
-                    FROM projects
-                    WHERE project_id = %s
-                )
-                SELECT LEAST(100, FLOOR(
-                    ts.weighted_score + ts.inprogress_bonus + ps.leader_bonus + ps.admin_bonus
-                ))
-                FROM task_score ts, proj_status ps
-            ),
-            updated_at = NOW()
-            WHERE project_id = %s
-            """,
-            (project_id, project_id, project_id),
-        )
-        print(f"[CREATE TASK] Progress updated successfully")
-
         conn.commit()
+        patch_task(new_task[0], after=new_task[1:], title=request.form["title"])
         cur.close()
         conn.close()
         return jsonify({"success": True, "message": "Task created successfully"})
@@ -1410,6 +1085,15 @@ def create_task():
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+def _pdf_attachment(pdf):
+    response = make_response(pdf)
+    response.headers["Content-Type"] = "application/pdf"
+    response.headers["Content-Disposition"] = (
+        f'attachment; filename=project_report_{datetime.now().strftime("%Y%m%d")}.pdf'
+    )
+    return response
+
+
 @project_leader_bp.route("/export_pdf")
 def export_pdf():
     if "user_id" not in session:
@@ -1427,68 +1111,42 @@ def export_pdf():
 
     project_id = project[0]
 
-    cur.execute(
-        """
-        SELECT 
-            COUNT(*) as total_tasks,
-            COUNT(*) FILTER (WHERE status = 'approved') as completed,
-            COUNT(*) FILTER (WHERE status = 'In Progress') as in_progress,
-            COUNT(*) FILTER (WHERE status = 'Pending Review') as pending_review,
-            COUNT(*) FILTER (WHERE due_date < CURRENT_DATE AND status != 'approved') as overdue
-        FROM tasks WHERE project_id = %s
-    """,
-        (project_id,),
-    )
-    stats = cur.fetchone()
-
-    cur.execute(
-        """
-        SELECT u.name, u.designation, COUNT(t.task_id) as tasks,
-               COUNT(*) FILTER (WHERE t.status = 'approved') as completed,
-               COUNT(*) FILTER (WHERE t.due_date < CURRENT_DATE AND t.status != 'approved') as overdue
-        FROM users u
-        JOIN project_members pm ON u.user_id = pm.user_id
-        LEFT JOIN tasks t ON u.user_id = t.assigned_to AND t.project_id = pm.project_id
-        WHERE pm.project_id = %s
-        AND (pm.is_deleted = FALSE OR pm.is_deleted IS NULL)
-        GROUP BY u.user_id, u.name, u.designation
-    """,
-        (project_id,),
-    )
-    team_data = cur.fetchall()
-
-    cur.execute(
-        "SELECT status, COUNT(*) FROM tasks WHERE project_id = %s GROUP BY status",
-        (project_id,),
+    # Unchanged project data → same PDF: serve it without aggregates or reportlab
+    cache = get_report_cache()
+    cache_key = report_key(
+        "export", project_id, get_data_version(cur, project_id), project[1]
     )
-    tasks_by_status = cur.fetchall()
+    pdf = cache.get(cache_key)
+    if pdf is not None:
+        cur.close()
+        conn.close()
+        return _pdf_attachment(pdf)
 
-    cur.execute(
-        "SELECT priority, COUNT(*) FROM tasks WHERE project_id = %s GROUP BY priority",
-        (project_id,),
-    )
-    tasks_by_priority = cur.fetchall()
+    data = get_report_data(cur, project_id)
 
     cur.close()
     conn.close()
 
-    total = stats[0] or 0
-    completion_rate = round((stats[1] or 0) / total * 100, 1) if total > 0 else 0
-    buffer = generate_pdf_report(
-        project,
-        stats,
-        team_data,
-        tasks_by_status,
-        tasks_by_priority,
-        completion_rate=completion_rate,
-    )
+    try:
+        pdf = render_report_pdf(
+            project,
+            data["task_stats"],
+            pdf_team_rows(data),
+            data["tasks_by_status"],
+            data["tasks_by_priority"],
+            None,
+            data["completion_rate"],
+        )
+    except PdfQueueFullError as e:
+        return str(e), 503
+    except PdfRenderTimeout as e:
+        return str(e), 504
+    except PdfRenderError as e:
+        print("PDF export error:", e)
+        return "Could not generate the PDF report", 500
 
-    response = make_response(buffer.getvalue())
-    response.headers["Content-Type"] = "application/pdf"
-    response.headers["Content-Disposition"] = (
-        f'attachment; filename=project_report_{datetime.now().strftime("%Y%m%d")}.pdf'
-    )
-    return response
+    cache.put(cache_key, pdf)
+    return _pdf_attachment(pdf)
 
 
 @project_leader_bp.route("/export_csv")
@@ -1497,10 +1155,10 @@ def export_csv():
         return "Login required"
 
     leader_id = session["user_id"]
-    conn = get_db()
-    cur = conn.cursor()
 
-    cur.execute(
+    # Streamed: rows come through a server-side cursor and leave as CSV
+    # chunks, so memory stays flat however many tasks there are.
+    rows = iter_rows(
         """
         SELECT t.title, t.description, t.status, t.priority, u.name as assigned_to, t.due_date
         FROM tasks t
@@ -1511,26 +1169,20 @@ def export_csv():
     """,
         (leader_id,),
     )
-    tasks = cur.fetchall()
-    cur.close()
-    conn.close()
-
-    si = io.StringIO()
-    cw = csv.writer(si)
-    cw.writerow(
-        ["Title", "Description", "Status", "Priority", "Assigned To", "Due Date"]
+    body = csv_chunks(
+        rows, ["Title", "Description", "Status", "Priority", "Assigned To", "Due Date"]
     )
-    for task in tasks:
-        cw.writerow(task)
 
-    output = si.getvalue()
-    si.close()
-
-    response = make_response(output)
+    gzip = current_app.config.get("EXPORT_GZIP", True) and bool(
+        request.accept_encodings["gzip"]
+    )
+    response = Response(gzip_chunks(body) if gzip else body, mimetype="text/csv")
+    if gzip:
+        response.headers["Content-Encoding"] = "gzip"
+    response.headers["Vary"] = "Accept-Encoding"
     response.headers["Content-Disposition"] = (
         f'attachment; filename=tasks_export_{datetime.now().strftime("%Y%m%d")}.csv'
     )
-    response.headers["Content-type"] = "text/csv"
     return response
 
 
@@ -1561,90 +1213,38 @@ def email_report():
 
     project_id = project[0]
 
-    cur.execute(
-        """
-        SELECT 
-            COUNT(*) as total_tasks,
-            COUNT(*) FILTER (WHERE status = 'approved') as completed,
-            COUNT(*) FILTER (WHERE status = 'In Progress') as in_progress,
-            COUNT(*) FILTER (WHERE status = 'Pending Review') as pending_review,
-            COUNT(*) FILTER (WHERE due_date < CURRENT_DATE AND status != 'approved') as overdue
-        FROM tasks WHERE project_id = %s
-    """,
-        (project_id,),
-    )
-    stats = cur.fetchone()
-
-    cur.execute(
-        """
-        SELECT u.name, u.designation, COUNT(t.task_id) as tasks,
-               COUNT(*) FILTER (WHERE t.status = 'approved') as completed,
-               COUNT(*) FILTER (WHERE t.due_date < CURRENT_DATE AND t.status != 'approved') as overdue
-        FROM users u
-        JOIN project_members pm ON u.user_id = pm.user_id
-        LEFT JOIN tasks t ON u.user_id = t.assigned_to AND t.project_id = pm.project_id
-        WHERE pm.project_id = %s
-        AND (pm.is_deleted = FALSE OR pm.is_deleted IS NULL)
-        GROUP BY u.user_id, u.name, u.designation
-    """,
-        (project_id,),
-    )
-    team_data = cur.fetchall()
-
-    cur.execute(
-        "SELECT status, COUNT(*) FROM tasks WHERE project_id = %s GROUP BY status",
-        (project_id,),
-    )
-    tasks_by_status = cur.fetchall()
-
-    cur.execute(
-        "SELECT priority, COUNT(*) FROM tasks WHERE project_id = %s GROUP BY priority",
-        (project_id,),
-    )
-    tasks_by_priority = cur.fetchall()
+    data = get_report_data(cur, project_id)
+    total, completed = data["task_stats"][0], data["task_stats"][1]
+    team_count = data["team_count"]
+    completion_rate = data["completion_rate"]
 
-    cur.execute(
-        """
-        (SELECT 'task_completed' as type, t.title, u.name, t.completed_at
-        FROM tasks t JOIN users u ON t.assigned_to = u.user_id
-        WHERE t.project_id = %s AND t.completed_at IS NOT NULL
-        ORDER BY t.completed_at DESC LIMIT 5)
-        UNION ALL
-        (SELECT 'member_joined' as type, pm.role_in_project, u.name, pm.joined_at
-        FROM project_members pm JOIN users u ON pm.user_id = u.user_id
-        WHERE pm.project_id = %s AND (pm.is_deleted = FALSE OR pm.is_deleted IS NULL)
-        ORDER BY pm.joined_at DESC LIMIT 5)
-        ORDER BY completed_at DESC LIMIT 10;
-    """,
-        (project_id, project_id),
-    )
-    recent_activities = cur.fetchall()
-
-    cur.execute(
-        """
-        SELECT COUNT(*) FROM project_members 
-        WHERE project_id = %s AND (is_deleted = FALSE OR is_deleted IS NULL)
-    """,
-        (project_id,),
-    )
-    team_count = cur.fetchone()[0]
+    # Unchanged project data → same PDF: skip reportlab
+    cache = get_report_cache()
+    cache_key = report_key("email", project_id, data["data_version"], project[1])
 
     cur.close()
     conn.close()
 
-    total = stats[0] or 0
-    completed = stats[1] or 0
-    completion_rate = round((completed / total * 100), 1) if total > 0 else 0
-
-    buffer = generate_pdf_report(
-        project,
-        stats,
-        team_data,
-        tasks_by_status,
-        tasks_by_priority,
-        recent_activities,
-        completion_rate,
-    )
+    pdf = cache.get(cache_key)
+    if pdf is None:
+        try:
+            pdf = render_report_pdf(
+                project,
+                data["task_stats"],
+                pdf_team_rows(data),
+                data["tasks_by_status"],
+                data["tasks_by_priority"],
+                data["recent_activities"],
+                completion_rate,
+            )
+        except PdfQueueFullError as e:
+            return jsonify({"error": str(e)}), 503
+        except PdfRenderTimeout as e:
+            return jsonify({"error": str(e)}), 504
+        except PdfRenderError as e:
+            print("PDF email report error:", e)
+            return jsonify({"error": "Could not generate the PDF report"}), 500
+        cache.put(cache_key, pdf)
 
     try:
         msg = Message(
@@ -1659,12 +1259,10 @@ def email_report():
         msg.attach(
             f"project_report_{datetime.now().strftime('%Y%m%d')}.pdf",
             "application/pdf",
-            buffer.getvalue(),
+            pdf,
         )
-        from app import mail
-
-        mail.send(msg)
-        return jsonify({"success": True, "message": "Report sent successfully!"})
+        enqueue_mail(msg)
+        return jsonify({"success": True, "message": "Report queued for delivery!"})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -1718,8 +1316,15 @@ def delete_task(task_id):
             ),
             400,
         )
-    cur.execute("DELETE FROM tasks WHERE task_id = %s", (task_id,))
+    cur.execute(
+        f"DELETE FROM tasks WHERE task_id = %s RETURNING {TASK_STATS_COLUMNS}",
+        (task_id,),
+    )
+    deleted = cur.fetchone()
+    record_task_change(cur, before=deleted)
     conn.commit()
+    if deleted:
+        patch_task(task_id, before=deleted)
     cur.close()
     conn.close()
 
@@ -1821,11 +1426,13 @@ def update_task(task_id):
         )
 
     cur.execute(
-        """
-        UPDATE tasks 
+        f"""
+        UPDATE tasks t
         SET title = %s, description = %s, assigned_to = %s, project_id = %s,
             priority = %s, due_date = %s, updated_at = CURRENT_TIMESTAMP
-        WHERE task_id = %s
+        FROM {OLD_TASK_ROW}
+        WHERE t.task_id = old.task_id
+        {RETURNING_BEFORE_AFTER}
         """,
         (
             request.form["title"],
@@ -1837,8 +1444,11 @@ def update_task(task_id):
             task_id,
         ),
     )
+    before, after = record_task_update(cur)
 
     conn.commit()
+    if after:
+        patch_task(task_id, before, after, title=request.form["title"])
     cur.close()
     conn.close()
 
@@ -1873,8 +1483,11 @@ def update_profile():
         if not cur.fetchone():
             conn.rollback()
             return jsonify({"success": False, "error": "User not found"}), 404
+        bump_user_projects(cur, leader_id)  # reports print name / designation
 
         conn.commit()
+        invalidate_user(leader_id)
+        forget_login_misses(request.form.get("email"))
         return jsonify({"success": True, "message": "Profile updated successfully!"})
 
     except Exception as e:
@@ -1922,7 +1535,7 @@ def change_password():
                 404,
             )
 
-        if auth_data[0] != current_password:  # NOTE: Use proper hash verification here!
+        if not verify_password(auth_data[0], current_password)[0]:
             return (
                 jsonify({"success": False, "error": "Current password is incorrect"}),
                 400,
@@ -1934,12 +1547,15 @@ def change_password():
             SET password_hash = %s, updated_at = CURRENT_TIMESTAMP
             WHERE user_id = %s;
         """,
-            (new_password, leader_id),
-        )  # NOTE: Hash the password before storing!
+            (hash_password(new_password), leader_id),
+        )
 
         conn.commit()
         return jsonify({"success": True, "message": "Password changed successfully!"})
 
+    except PasswordHashBusyError:
+        conn.rollback()
+        return jsonify({"success": False, "error": "Server busy, please try again"}), 503
     except Exception as e:
         conn.rollback()
         return jsonify({"success": False, "error": str(e)}), 500
@@ -1990,6 +1606,8 @@ def remove_team_member():
         (project[0], user_id),
     )
 
+    resync_project_progress(cur, project[0])
+
     conn.commit()
     cur.close()
     conn.close()
@@ -2051,8 +1669,8 @@ def approve_task(task_id):
             )
 
         cur.execute(
-            """
-            UPDATE tasks 
+            f"""
+            UPDATE tasks t
             SET status = 'approved',
                 approved_at = CURRENT_TIMESTAMP,
                 approved_by = %s,
@@ -2060,74 +1678,17 @@ def approve_task(task_id):
                 last_action_at = CURRENT_TIMESTAMP,
                 rejected_at = NULL,
                 rejection_reason = NULL
-            WHERE task_id = %s
+            FROM {OLD_TASK_ROW}
+            WHERE t.task_id = old.task_id
+            {RETURNING_BEFORE_AFTER}
         """,
             (leader_id, leader_id, task_id),
         )
-
-        # 🚀 AUTO-RECALCULATE project progress — Advanced Industry Formula
-        # Component1: Weighted Task Score (70%) | pending=0, in_progress=0.4, submitted=0.7, approved=1.0
-        # Component2: In-Progress Bonus (10%)   | rewards active work in progress
-        # Component3: Leader Approval Bonus (10%)| unlocks when leader marks project 'completed'
-        # Component4: Admin Closure Bonus (10%) | unlocks when admin closes the project
-        cur.execute(
-            """
-            UPDATE projects
-            SET progress = (
-                WITH task_score AS (
-                    -- C1 + C2: weighted task completion + in-progress bonus
-                    SELECT
-                        COALESCE(
-                            SUM(
-                                CASE t.priority WHEN 'high' THEN 3 WHEN 'medium' THEN 2 ELSE 1 END
-                                *
-                                CASE t.status
-                                    WHEN 'approved'    THEN 1.0
-                                    WHEN 'submitted'   THEN 0.7
-                                    WHEN 'in_progress' THEN 0.4
-                                    ELSE 0.0
-                                END
-                            ) * 70.0
-                            / NULLIF(SUM(
-                                CASE t.priority WHEN 'high' THEN 3 WHEN 'medium' THEN 2 ELSE 1 END
-                            ), 0)
-                        , 0) AS weighted_score,
-                        COALESCE(
-                            COUNT(*) FILTER (WHERE t.status = 'in_progress') * 10.0
-                            / NULLIF(COUNT(*), 0)
-                        , 0) AS inprogress_bonus
-                    FROM tasks t
-                    WHERE t.project_id = (SELECT project_id FROM tasks WHERE task_id = %s)
-                    AND (
-                        t.assigned_to IS NULL
-                        OR EXISTS (
-                            SELECT 1 FROM project_members pm
-                            WHERE pm.project_id = t.project_id
-                              AND pm.user_id = t.assigned_to
-                              AND (pm.is_deleted = FALSE OR pm.is_deleted IS NULL)
-                        )
-                    )
-                ),
-                proj_status AS (
-                    -- C3 + C4: authority bonuses from project status
-                    SELECT
-                        CASE WHEN status IN ('completed', 'closed') THEN 10 ELSE 0 END AS leader_bonus,
-                        CASE WHEN status = 'closed'                 THEN 10 ELSE 0 END AS admin_bonus
-                    FROM projects
-                    WHERE project_id = (SELECT project_id FROM tasks WHERE task_id = %s)
-                )
-                SELECT LEAST(100, FLOOR(
-                    ts.weighted_score + ts.inprogress_bonus + ps.leader_bonus + ps.admin_bonus
-                ))
-                FROM task_score ts, proj_status ps
-            ),
-            updated_at = NOW()
-            WHERE project_id = (SELECT project_id FROM tasks WHERE task_id = %s)
-            """,
-            (task_id, task_id, task_id),
-        )
+        before, after = record_task_update(cur)
 
         conn.commit()
+        if after:
+            patch_task(task_id, before, after)
         cur.close()
         conn.close()
 
@@ -2202,8 +1763,8 @@ def reject_task(task_id):
             )
 
         cur.execute(
-            """
-            UPDATE tasks 
+            f"""
+            UPDATE tasks t
             SET status = 'in_progress',
                 rejected_at = CURRENT_TIMESTAMP,
                 rejection_reason = %s,
@@ -2211,12 +1772,17 @@ def reject_task(task_id):
                 last_action_at = CURRENT_TIMESTAMP,
                 approved_at = NULL,
                 approved_by = NULL
-            WHERE task_id = %s
+            FROM {OLD_TASK_ROW}
+            WHERE t.task_id = old.task_id
+            {RETURNING_BEFORE_AFTER}
         """,
             (reason, leader_id, task_id),
         )
+        before, after = record_task_update(cur)
 
         conn.commit()
+        if after:
+            patch_task(task_id, before, after)
         cur.close()
         conn.close()
 
@@ -2276,6 +1842,8 @@ def submit_project(project_id):
             """,
             (project_id,),
         )
+        # unlocks the leader approval bonus (C3)
+        refresh_project_progress(cur, project_id)
 
         # Find admin user_id to send notification
         cur.execute("SELECT user_id FROM users WHERE role = 'admin' LIMIT 1")
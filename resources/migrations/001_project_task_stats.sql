@@ -0,0 +1,35 @@
+-- ============================================================
+-- 001 — project_task_stats rollup
+--
+-- Task counts grouped per (project, assignee, status, priority).
+-- Kept in step with the tasks table by database/task_stats.py
+-- inside the same transaction as every task insert/update/delete,
+-- so dashboards read a handful of rows per project instead of
+-- aggregating the whole tasks table.
+--
+-- Safe to re-run: the backfill rebuilds the table from tasks.
+-- Apply with: psql -d CollabHub1 -f resources/migrations/001_project_task_stats.sql
+-- ============================================================
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS project_task_stats (
+    project_id  INTEGER NOT NULL,
+    assigned_to INTEGER,
+    status      VARCHAR(50),
+    priority    VARCHAR(50),
+    task_count  INTEGER NOT NULL DEFAULT 0,
+    CONSTRAINT project_task_stats_key
+        UNIQUE NULLS NOT DISTINCT (project_id, assigned_to, status, priority)
+);
+
+-- Backfill / resync from the source of truth
+DELETE FROM project_task_stats;
+
+INSERT INTO project_task_stats (project_id, assigned_to, status, priority, task_count)
+SELECT project_id, assigned_to, status, priority, COUNT(*)
+FROM tasks
+WHERE project_id IS NOT NULL
+GROUP BY project_id, assigned_to, status, priority;
+
+COMMIT;
@@ -0,0 +1,65 @@
+-- ============================================================
+-- 002 — project_progress running aggregates
+--
+-- One row per project holding everything the progress formulas
+-- need (database/progress.py):
+--   total_tasks / approved_tasks   → all tasks of the project
+--   counted_tasks, weight_total,
+--   weighted_sum, in_progress_tasks → tasks that are unassigned or
+--                                    assigned to an active member
+-- Updated by deltas on every task change and resynced from
+-- project_task_stats when membership changes.
+--
+-- Requires 001. Safe to re-run: the backfill rebuilds every row.
+-- Apply with: psql -d CollabHub1 -f resources/migrations/002_project_progress.sql
+-- ============================================================
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS project_progress (
+    project_id        INTEGER PRIMARY KEY,
+    total_tasks       INTEGER NOT NULL DEFAULT 0,
+    approved_tasks    INTEGER NOT NULL DEFAULT 0,
+    counted_tasks     INTEGER NOT NULL DEFAULT 0,
+    weight_total      INTEGER NOT NULL DEFAULT 0,
+    weighted_sum      NUMERIC NOT NULL DEFAULT 0,
+    in_progress_tasks INTEGER NOT NULL DEFAULT 0
+);
+
+-- Backfill / resync from the project_task_stats rollup
+DELETE FROM project_progress;
+
+INSERT INTO project_progress
+    (project_id, total_tasks, approved_tasks, counted_tasks,
+     weight_total, weighted_sum, in_progress_tasks)
+SELECT
+    p.project_id,
+    COALESCE(SUM(s.task_count), 0),
+    COALESCE(SUM(s.task_count) FILTER (WHERE s.status = 'approved'), 0),
+    COALESCE(SUM(s.task_count) FILTER (WHERE m.counted), 0),
+    COALESCE(SUM(s.task_count
+        * CASE s.priority WHEN 'high' THEN 3 WHEN 'medium' THEN 2 ELSE 1 END)
+        FILTER (WHERE m.counted), 0),
+    COALESCE(SUM(s.task_count
+        * CASE s.priority WHEN 'high' THEN 3 WHEN 'medium' THEN 2 ELSE 1 END
+        * CASE s.status
+              WHEN 'approved'    THEN 1.0
+              WHEN 'submitted'   THEN 0.7
+              WHEN 'in_progress' THEN 0.4
+              ELSE 0.0
+          END)
+        FILTER (WHERE m.counted), 0),
+    COALESCE(SUM(s.task_count) FILTER (WHERE m.counted AND s.status = 'in_progress'), 0)
+FROM projects p
+LEFT JOIN project_task_stats s ON s.project_id = p.project_id
+CROSS JOIN LATERAL (
+    SELECT s.assigned_to IS NULL OR EXISTS (
+        SELECT 1 FROM project_members pm
+        WHERE pm.project_id = s.project_id
+          AND pm.user_id = s.assigned_to
+          AND (pm.is_deleted = FALSE OR pm.is_deleted IS NULL)
+    ) AS counted
+) m
+GROUP BY p.project_id;
+
+COMMIT;
@@ -0,0 +1,35 @@
+-- ============================================================
+-- 003 — project_task_due rollup
+--
+-- Open (not approved) task counts grouped per (project, assignee,
+-- due_date). Overdue counts are SUM(open_count) over the rows with
+-- due_date < CURRENT_DATE, so they stay correct as days pass without
+-- touching the tasks table. Kept in step with tasks by
+-- database/task_stats.py next to project_task_stats.
+--
+-- Safe to re-run: the backfill rebuilds the table from tasks.
+-- Apply with: psql -d CollabHub1 -f resources/migrations/003_project_task_due.sql
+-- ============================================================
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS project_task_due (
+    project_id  INTEGER NOT NULL,
+    assigned_to INTEGER,
+    due_date    DATE,
+    open_count  INTEGER NOT NULL DEFAULT 0,
+    CONSTRAINT project_task_due_key
+        UNIQUE NULLS NOT DISTINCT (project_id, assigned_to, due_date)
+);
+
+-- Backfill / resync from the source of truth
+DELETE FROM project_task_due;
+
+INSERT INTO project_task_due (project_id, assigned_to, due_date, open_count)
+SELECT project_id, assigned_to, due_date, COUNT(*)
+FROM tasks
+WHERE project_id IS NOT NULL
+  AND status <> 'approved'
+GROUP BY project_id, assigned_to, due_date;
+
+COMMIT;
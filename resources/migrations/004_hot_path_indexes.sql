@@ -0,0 +1,58 @@
+-- ============================================================
+-- 004 — secondary indexes for the hot query predicates
+--
+-- The base dump only has primary keys / unique constraints. Each
+-- index below matches a WHERE / ORDER BY shape the app runs on
+-- every page load (see database/explain_replay.py, which replays
+-- those queries with EXPLAIN ANALYZE before and after this file).
+--
+-- Built CONCURRENTLY so writes are not blocked; that cannot run
+-- inside a transaction, so this file has no BEGIN/COMMIT.
+--
+-- Re-running: IF NOT EXISTS skips indexes that already exist, including
+-- an INVALID one left behind by a failed or cancelled concurrent build.
+-- Before re-running after a failure, list and drop those:
+--   SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+--   WHERE NOT i.indisvalid;
+--   DROP INDEX CONCURRENTLY IF EXISTS <name>;
+-- Apply with: psql -d CollabHub1 -f resources/migrations/004_hot_path_indexes.sql
+-- ============================================================
+
+-- Leader views: every task panel filters one project, usually by status
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tasks_project_status
+    ON tasks (project_id, status);
+
+-- Employee "My Work" + per-member stats: tasks of one assignee by due date
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tasks_assigned_due
+    ON tasks (assigned_to, due_date);
+
+-- "Which projects is this user in" — the PK (project_id, user_id) can't
+-- serve user_id lookups. Not partial: many queries test
+-- (is_deleted = FALSE OR is_deleted IS NULL), which a partial index can't match.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_project_members_user_active
+    ON project_members (user_id, is_deleted);
+
+-- Leader's live projects; deleted projects are never read by these queries
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_projects_leader_status_live
+    ON projects (leader_id, status)
+    WHERE is_deleted = FALSE;
+
+-- Admin project lists / KPIs over live projects by status
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_projects_status_live
+    ON projects (status)
+    WHERE is_deleted = FALSE;
+
+-- Navbar bell: unread count + latest unread for one receiver
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_notifications_unread
+    ON notifications (receiver_id, sent_at DESC)
+    WHERE is_read = FALSE;
+
+-- Last login / login history per user
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_login_logs_user_time
+    ON login_logs (user_id, login_time DESC);
+
+ANALYZE tasks;
+ANALYZE project_members;
+ANALYZE projects;
+ANALYZE notifications;
+ANALYZE login_logs;
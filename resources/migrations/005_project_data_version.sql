@@ -0,0 +1,24 @@
+-- ============================================================
+-- 005 — project_data_version
+--
+-- One counter per project, bumped in the same transaction as every
+-- task insert / update / delete, every membership resync and every
+-- name / designation change of a member or leader
+-- (database/data_version.py). Cached report PDFs are keyed on it
+-- (services/report_cache.py), so a report is rebuilt only after
+-- the project's data really changed.
+--
+-- A project without a row is at version 0.
+-- Safe to re-run.
+-- Apply with: psql -d CollabHub1 -f resources/migrations/005_project_data_version.sql
+-- ============================================================
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS project_data_version (
+    project_id INTEGER PRIMARY KEY,
+    version    BIGINT NOT NULL DEFAULT 0,
+    changed_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+COMMIT;
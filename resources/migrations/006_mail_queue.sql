@@ -0,0 +1,39 @@
+-- ============================================================
+-- 006 — mail_queue (outbound mail spool)
+--
+-- Routes insert fully built messages here instead of talking to the
+-- SMTP server; the mail worker (services/mail_queue.py) claims due
+-- rows with FOR UPDATE SKIP LOCKED, sends them over one reused SMTP
+-- connection and retries failures with exponential backoff.
+--
+--   status: pending → sending → sent
+--                            ↘ pending (retry, next_attempt_at later)
+--                            ↘ failed  (permanent error / out of attempts)
+--
+-- Safe to re-run.
+-- Apply with: psql -d CollabHub1 -f resources/migrations/006_mail_queue.sql
+-- ============================================================
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS mail_queue (
+    mail_id         BIGSERIAL PRIMARY KEY,
+    sender          TEXT NOT NULL,
+    recipients      TEXT[] NOT NULL,
+    subject         TEXT,
+    message         BYTEA NOT NULL,          -- the complete RFC 5322 message
+    status          VARCHAR(10) NOT NULL DEFAULT 'pending',
+    attempts        INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    locked_at       TIMESTAMP,
+    last_error      TEXT,
+    created_at      TIMESTAMP NOT NULL DEFAULT NOW(),
+    sent_at         TIMESTAMP
+);
+
+-- The worker's poll: due pending rows, oldest first
+CREATE INDEX IF NOT EXISTS idx_mail_queue_due
+    ON mail_queue (next_attempt_at, mail_id)
+    WHERE status = 'pending';
+
+COMMIT;
@@ -0,0 +1,45 @@
+-- ============================================================
+-- 007 — case-normalized identity indexes for login
+--
+-- Login looks a user up by lower(email) or lower(username), picked
+-- from the identifier's shape (auth/utils.py resolve_login). The
+-- existing users_email_key / users_username_key constraints are on
+-- the raw values and can't serve lower(...), so each lookup gets its
+-- own unique expression index: one index probe per login attempt,
+-- and "Alice@x.com" / "alice@x.com" can no longer be two accounts.
+--
+-- The unique build fails if rows already differ only by case. Find
+-- them first with:
+--   SELECT lower(email), array_agg(user_id) FROM users
+--   GROUP BY lower(email) HAVING COUNT(*) > 1;
+--   SELECT lower(username), array_agg(user_id) FROM users
+--   WHERE username IS NOT NULL
+--   GROUP BY lower(username) HAVING COUNT(*) > 1;
+--
+-- Usernames containing "@" are looked up as emails from now on, so
+-- those accounts can no longer log in by username. Rename them (or
+-- tell their owners to use their email) before deploying:
+--   SELECT user_id, username, email FROM users WHERE username LIKE '%@%';
+--
+-- Built CONCURRENTLY so writes are not blocked; that cannot run
+-- inside a transaction, so this file has no BEGIN/COMMIT.
+--
+-- Re-running: a failed unique build (e.g. on case-duplicates) leaves
+-- an INVALID index behind, and IF NOT EXISTS then skips it silently.
+-- Check for one and drop it before running this file again:
+--   SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+--   WHERE NOT i.indisvalid
+--     AND c.relname IN ('idx_users_email_lower', 'idx_users_username_lower');
+--   DROP INDEX CONCURRENTLY IF EXISTS idx_users_email_lower;
+--   DROP INDEX CONCURRENTLY IF EXISTS idx_users_username_lower;
+-- Apply with: psql -d CollabHub1 -f resources/migrations/007_login_identity_indexes.sql
+-- ============================================================
+
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS idx_users_email_lower
+    ON users (lower(email));
+
+-- NULL usernames (not yet signed up) don't conflict
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS idx_users_username_lower
+    ON users (lower(username));
+
+ANALYZE users;
@@ -0,0 +1,213 @@
+# ============================================================
+# Write-behind login audit
+#
+# A successful login used to INSERT its login_logs row before the
+# response went out. Now auth.login calls record_login(): the event is
+# put on a bounded in-process queue and a background writer thread
+# stores queued events with one multi-row INSERT per batch, either
+# when `batch_size` events are waiting or `flush_interval` seconds
+# after the first one arrived, whichever comes first.
+#
+# When the queue is full the "drop" policy discards the event at once
+# (login never waits on the audit log); "block" waits up to
+# `put_timeout` for room before dropping. Dropped events are counted
+# in stats(). Whatever is still queued is flushed on shutdown (atexit).
+# ============================================================
+
+import atexit
+import os
+import queue
+import threading
+import time
+
+from psycopg2.extras import execute_values
+
+from database.db import get_pool
+
+# Audit settings (override through app.config["LOGIN_AUDIT_*"] in init_app)
+AUDIT_SETTINGS = {
+    "worker": True,  # False → write each event inline (old behaviour)
+    "queue_size": 10000,  # events buffered before the full-queue policy applies
+    "batch_size": 500,  # rows per INSERT
+    "flush_interval": 1.0,  # seconds an event may wait before it is written
+    "policy": "drop",  # "drop" or "block" when the queue is full
+    "put_timeout": 0.05,  # seconds "block" waits for room
+    "shutdown_timeout": 5.0,  # seconds to flush what's left at exit
+}
+
+INSERT_LOGIN_LOGS = "INSERT INTO login_logs (user_id, login_time, ip_address) VALUES %s"
+
+# login_time is taken when the event is recorded, not when it is written
+ROW_TEMPLATE = "(%s, to_timestamp(%s), %s)"
+
+
+def _write(events):
+    conn = get_pool().getconn()
+    try:
+        cur = conn.cursor()
+        execute_values(
+            cur, INSERT_LOGIN_LOGS, events, template=ROW_TEMPLATE, page_size=len(events)
+        )
+        conn.commit()
+        cur.close()
+    finally:
+        conn.close()
+
+
+class LoginAuditWriter(threading.Thread):
+    """Batches login events from a bounded queue into login_logs."""
+
+    def __init__(self, settings=None):
+        super().__init__(name="login-audit-writer", daemon=True)
+        self.settings = dict(settings or AUDIT_SETTINGS)
+        self._queue = queue.Queue(maxsize=self.settings["queue_size"])
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self.stats = {"queued": 0, "written": 0, "dropped": 0, "batches": 0, "errors": 0}
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self.stats[key] += n
+
+    def record(self, event):
+        """Queue one (user_id, unix time, ip) event; False if it was dropped."""
+        try:
+            if self.settings["policy"] == "block" and not self._stopping.is_set():
+                self._queue.put(event, timeout=self.settings["put_timeout"])
+            else:
+                self._queue.put_nowait(event)
+        except queue.Full:
+            self._count("dropped")
+            return False
+        self._count("queued")
+        return True
+
+    # -----------------------------
+    # BATCHING
+    # -----------------------------
+    def _next_batch(self):
+        """Wait for the first event, then collect until full or the interval ends."""
+        try:
+            batch = [self._queue.get(timeout=self.settings["flush_interval"])]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + self.settings["flush_interval"]
+        while len(batch) < self.settings["batch_size"] and not self._stopping.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _flush(self, batch):
+        try:
+            _write(batch)
+        except Exception as e:
+            # the database is down or refusing the batch: the audit log is
+            # best effort, so count the rows as lost instead of piling up
+            print(f"LOGIN AUDIT ERROR ({len(batch)} event(s) lost): {e}")
+            self._count("errors")
+            self._count("dropped", len(batch))
+            return
+        self._count("batches")
+        self._count("written", len(batch))
+
+    def flush_pending(self):
+        """Write everything queued right now (used at shutdown)."""
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+            if len(batch) >= self.settings["batch_size"]:
+                self._flush(batch)
+                batch = []
+        if batch:
+            self._flush(batch)
+
+    # -----------------------------
+    # THREAD
+    # -----------------------------
+    def run(self):
+        while not self._stopping.is_set():
+            batch = self._next_batch()
+            if batch:
+                self._flush(batch)
+
+    def stop(self, timeout=None):
+        timeout = self.settings["shutdown_timeout"] if timeout is None else timeout
+        self._stopping.set()
+        if self.is_alive():
+            self.join(timeout)
+        self.flush_pending()
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+        stats["pending"] = self._queue.qsize()
+        return stats
+
+
+_writer = None
+_writer_pid = None
+_writer_lock = threading.Lock()
+
+
+def get_audit_writer():
+    """
+    Return this process's writer, starting it on first use (and again
+    after a fork). None when AUDIT_SETTINGS["worker"] is off.
+    """
+    global _writer, _writer_pid
+
+    if not AUDIT_SETTINGS["worker"]:
+        return None
+    if _writer is not None and _writer_pid == os.getpid():
+        return _writer
+
+    with _writer_lock:
+        if _writer is None or _writer_pid != os.getpid():
+            _writer = LoginAuditWriter()
+            _writer_pid = os.getpid()
+            _writer.start()
+    return _writer
+
+
+def _stop_writer():
+    # A forked child inherits this hook and the parent's writer object,
+    # queue included: only flush a writer that this process started, or
+    # events queued before the fork would be written twice.
+    if _writer is not None and _writer_pid == os.getpid():
+        _writer.stop()
+
+
+atexit.register(_stop_writer)
+
+
+def record_login(user_id, ip_address):
+    """Log a successful login; returns False if the event was dropped."""
+    event = (user_id, time.time(), ip_address)
+    writer = get_audit_writer()
+    if writer is None:
+        _write([event])
+        return True
+    return writer.record(event)
+
+
+def get_audit_stats():
+    """Counters of this process's writer; zeros if it hasn't started (no logins yet)."""
+    if _writer is None or _writer_pid != os.getpid():
+        return {"queued": 0, "written": 0, "dropped": 0, "batches": 0, "errors": 0, "pending": 0}
+    return _writer.get_stats()
+
+
+def init_app(app):
+    for key in AUDIT_SETTINGS:
+        config_key = "LOGIN_AUDIT_" + key.upper()
+        if config_key in app.config:
+            AUDIT_SETTINGS[key] = app.config[config_key]
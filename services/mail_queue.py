@@ -0,0 +1,345 @@
+# ============================================================
+# Outbound mail queue
+#
+# Routes call enqueue_mail(msg): the finished message is stored in the
+# mail_queue table (resources/migrations/006_mail_queue.sql) and the
+# request returns at once. A background worker thread per process
+# claims due rows (FOR UPDATE SKIP LOCKED, so several gunicorn workers
+# can drain the same table), sends them over ONE SMTP connection that
+# is kept open between batches, and reschedules failures with
+# exponential backoff until MAIL_QUEUE_MAX_ATTEMPTS.
+#
+# Local testing with aiosmtpd as the SMTP server:
+#   python -m aiosmtpd -n -l localhost:8025
+#   MAIL_SERVER=localhost, MAIL_PORT=8025, MAIL_USE_TLS=False
+# then either let the worker run or call get_mail_worker().drain_once().
+# ============================================================
+
+import atexit
+import os
+import random
+import smtplib
+import threading
+import time
+
+from flask_mail import sanitize_address, sanitize_addresses
+
+from database.db import get_pool
+
+# Queue settings (override through app.config["MAIL_QUEUE_*"] in init_app)
+QUEUE_SETTINGS = {
+    "worker": True,  # start the background worker in this process
+    "batch_size": 20,  # messages claimed per round
+    "poll_interval": 5.0,  # seconds between polls when the queue is idle
+    "max_attempts": 6,  # then the message is marked failed
+    "backoff_base": 30.0,  # first retry after ~30s, then 60s, 120s, ...
+    "backoff_max": 3600.0,
+    "idle_close_after": 60.0,  # close the SMTP connection after this much idle time
+    "stale_after": 600.0,  # "sending" rows older than this are retried (worker died)
+}
+
+# SMTP server, filled from the app's Flask-Mail settings in init_app
+SMTP_SETTINGS = {
+    "server": "localhost",
+    "port": 25,
+    "use_tls": False,
+    "use_ssl": False,
+    "username": None,
+    "password": None,
+    "timeout": 30.0,
+}
+
+
+def enqueue_mail(msg):
+    """
+    Store a flask_mail.Message for delivery and return its mail_id.
+
+    Uses its own pooled connection and commits straight away, so the
+    message is queued whatever happens to the caller's transaction.
+    """
+    if msg.date is None:
+        msg.date = time.time()
+    sender = sanitize_address(msg.sender)
+    recipients = list(sanitize_addresses(msg.send_to))
+    if not recipients:
+        raise ValueError("Message has no recipients")
+
+    conn = get_pool().getconn()
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            INSERT INTO mail_queue (sender, recipients, subject, message)
+            VALUES (%s, %s, %s, %s)
+            RETURNING mail_id
+            """,
+            (sender, recipients, msg.subject, msg.as_bytes()),
+        )
+        mail_id = cur.fetchone()[0]
+        conn.commit()
+        cur.close()
+    finally:
+        conn.close()
+
+    worker = get_mail_worker()
+    if worker is not None:
+        worker.wake()
+    return mail_id
+
+
+def _is_permanent(error):
+    # 5xx replies won't get better by retrying; everything else might
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code >= 500
+    return False
+
+
+class MailWorker(threading.Thread):
+    """Drains mail_queue in the background over one reused SMTP connection."""
+
+    def __init__(self, settings=None, smtp_settings=None):
+        super().__init__(name="mail-queue-worker", daemon=True)
+        self.settings = dict(settings or QUEUE_SETTINGS)
+        self.smtp_settings = dict(smtp_settings or SMTP_SETTINGS)
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._smtp = None
+        self._smtp_used_at = 0.0
+        self.stats = {"sent": 0, "retried": 0, "failed": 0, "connections": 0}
+
+    # -----------------------------
+    # SMTP CONNECTION
+    # -----------------------------
+    def _connect(self):
+        s = self.smtp_settings
+        if s["use_ssl"]:
+            smtp = smtplib.SMTP_SSL(s["server"], s["port"], timeout=s["timeout"])
+        else:
+            smtp = smtplib.SMTP(s["server"], s["port"], timeout=s["timeout"])
+            if s["use_tls"]:
+                smtp.starttls()
+        if s["username"]:
+            smtp.login(s["username"], s["password"])
+        self.stats["connections"] += 1
+        return smtp
+
+    def _get_smtp(self):
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except smtplib.SMTPException:
+                pass
+            except OSError:
+                pass
+            self._close_smtp()
+        self._smtp = self._connect()
+        return self._smtp
+
+    def _close_smtp(self):
+        smtp, self._smtp = self._smtp, None
+        if smtp is None:
+            return
+        try:
+            smtp.quit()
+        except Exception:
+            smtp.close()
+
+    # -----------------------------
+    # QUEUE
+    # -----------------------------
+    def _claim(self, cur):
+        cur.execute(
+            """
+            UPDATE mail_queue
+            SET status = 'pending', locked_at = NULL
+            WHERE status = 'sending'
+              AND locked_at < NOW() - make_interval(secs => %s)
+            """,
+            (self.settings["stale_after"],),
+        )
+        cur.execute(
+            """
+            UPDATE mail_queue m
+            SET status = 'sending', attempts = m.attempts + 1, locked_at = NOW()
+            FROM (
+                SELECT mail_id
+                FROM mail_queue
+                WHERE status = 'pending' AND next_attempt_at <= NOW()
+                ORDER BY next_attempt_at, mail_id
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            ) due
+            WHERE m.mail_id = due.mail_id
+            RETURNING m.mail_id, m.sender, m.recipients, m.message, m.attempts
+            """,
+            (self.settings["batch_size"],),
+        )
+        return sorted(cur.fetchall())
+
+    def _backoff(self, attempts):
+        delay = self.settings["backoff_base"] * 2 ** (attempts - 1)
+        return min(delay, self.settings["backoff_max"]) * random.uniform(0.8, 1.2)
+
+    def _deliver(self, sender, recipients, message):
+        """
+        None if sent to everyone, else (permanent, error text, recipients
+        still to send to).
+        """
+        try:
+            refused = self._get_smtp().sendmail(sender, recipients, bytes(message))
+            self._smtp_used_at = time.monotonic()
+        except smtplib.SMTPServerDisconnected as e:
+            self._close_smtp()
+            return False, f"{type(e).__name__}: {e}", recipients
+        except smtplib.SMTPException as e:
+            # SMTPException is an OSError too — keep it before the next clause
+            return _is_permanent(e), f"{type(e).__name__}: {e}", recipients
+        except OSError as e:
+            self._close_smtp()
+            return False, f"{type(e).__name__}: {e}", recipients
+
+        if not refused:
+            return None
+        # accepted for some recipients only: only the refused ones are left
+        # (a retry must not send the message again to the others)
+        permanent = all(code >= 500 for code, _ in refused.values())
+        error = "Recipients refused: " + ", ".join(
+            f"{rcpt} ({code} {reply.decode(errors='replace')})"
+            for rcpt, (code, reply) in refused.items()
+        )
+        return permanent, error, list(refused)
+
+    def drain_once(self):
+        """Claim and send one batch; returns the number of messages claimed."""
+        conn = get_pool().getconn()
+        try:
+            cur = conn.cursor()
+            batch = self._claim(cur)
+            conn.commit()
+
+            for mail_id, sender, recipients, message, attempts in batch:
+                failure = self._deliver(sender, recipients, message)
+                if failure is None:
+                    cur.execute(
+                        """
+                        UPDATE mail_queue
+                        SET status = 'sent', sent_at = NOW(), locked_at = NULL, last_error = NULL
+                        WHERE mail_id = %s
+                        """,
+                        (mail_id,),
+                    )
+                    self.stats["sent"] += 1
+                else:
+                    permanent, error, remaining = failure
+                    if permanent or attempts >= self.settings["max_attempts"]:
+                        cur.execute(
+                            """
+                            UPDATE mail_queue
+                            SET status = 'failed', locked_at = NULL, last_error = %s,
+                                recipients = %s
+                            WHERE mail_id = %s
+                            """,
+                            (error, remaining, mail_id),
+                        )
+                        self.stats["failed"] += 1
+                        print(f"Mail {mail_id} failed after {attempts} attempt(s): {error}")
+                    else:
+                        cur.execute(
+                            """
+                            UPDATE mail_queue
+                            SET status = 'pending', locked_at = NULL, last_error = %s,
+                                recipients = %s,
+                                next_attempt_at = NOW() + make_interval(secs => %s)
+                            WHERE mail_id = %s
+                            """,
+                            (error, remaining, self._backoff(attempts), mail_id),
+                        )
+                        self.stats["retried"] += 1
+                # one commit per message: a crash never re-sends what went out
+                conn.commit()
+
+            cur.close()
+            return len(batch)
+        finally:
+            conn.close()
+
+    # -----------------------------
+    # THREAD
+    # -----------------------------
+    def wake(self):
+        self._wake.set()
+
+    def run(self):
+        while not self._stopping.is_set():
+            try:
+                claimed = self.drain_once()
+            except Exception as e:
+                print(f"Mail queue worker error: {e}")
+                claimed = 0
+
+            if claimed >= self.settings["batch_size"]:
+                continue  # more may be waiting
+
+            if (
+                self._smtp is not None
+                and time.monotonic() - self._smtp_used_at > self.settings["idle_close_after"]
+            ):
+                self._close_smtp()
+
+            self._wake.wait(self.settings["poll_interval"])
+            self._wake.clear()
+
+    def stop(self, timeout=5.0):
+        self._stopping.set()
+        self._wake.set()
+        if self.is_alive():
+            self.join(timeout)
+        self._close_smtp()
+
+
+_worker = None
+_worker_pid = None
+_worker_lock = threading.Lock()
+
+
+def get_mail_worker():
+    """
+    Return this process's worker, starting it on first use (and again
+    after a fork). None when QUEUE_SETTINGS["worker"] is off.
+    """
+    global _worker, _worker_pid
+
+    if not QUEUE_SETTINGS["worker"]:
+        return None
+    if _worker is not None and _worker_pid == os.getpid():
+        return _worker
+
+    with _worker_lock:
+        if _worker is None or _worker_pid != os.getpid():
+            _worker = MailWorker()
+            _worker_pid = os.getpid()
+            _worker.start()
+            atexit.register(_worker.stop)
+    return _worker
+
+
+def _ensure_worker():
+    get_mail_worker()
+
+
+def init_app(app):
+    # Started (or restarted in a forked worker) by the first request, so
+    # mail queued before a restart goes out without waiting for new mail
+    app.before_request(_ensure_worker)
+
+    for key in QUEUE_SETTINGS:
+        config_key = "MAIL_QUEUE_" + key.upper()
+        if config_key in app.config:
+            QUEUE_SETTINGS[key] = app.config[config_key]
+    for key in SMTP_SETTINGS:
+        config_key = "MAIL_" + key.upper()
+        if config_key in app.config:
+            SMTP_SETTINGS[key] = app.config[config_key]
@@ -0,0 +1,166 @@
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from services.pdf_worker import init_worker, render_report
+
+# Render pool settings (override through app.config["PDF_RENDER_*"] in init_app)
+RENDER_SETTINGS = {
+    "workers": 2,  # PDFs rendered at the same time (one process each)
+    "queue_size": 8,  # jobs allowed to wait for a worker; more → PdfQueueFullError
+    "timeout": 30.0,  # seconds a request waits for its PDF
+}
+
+
+class PdfRenderError(Exception):
+    """Raised when a PDF could not be rendered."""
+
+
+class PdfQueueFullError(PdfRenderError):
+    """Raised when every worker is busy and the wait queue is full."""
+
+
+class PdfRenderTimeout(PdfRenderError):
+    """Raised when a PDF was not ready within the timeout."""
+
+
+class PdfRenderService:
+    """
+    Renders PDFs in a pool of worker processes.
+
+    reportlab is pure Python and CPU-bound: rendering in the request
+    thread holds the GIL and stalls every other request of the worker.
+    Here it runs in `workers` separate processes; at most `queue_size`
+    more jobs may wait, anything beyond that is refused straight away
+    instead of piling up. A job that times out keeps its slot until its
+    process is really done with it, so the bound holds.
+    """
+
+    def __init__(self, workers=2, queue_size=8, timeout=30.0):
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "timeouts": 0,
+            "rejected": 0,
+        }
+
+    def _bump(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a threaded web worker can copy held locks.
+                # Workers run services.pdf_worker, which keeps Flask and the
+                # app out of the worker (see app.py for `python app.py`).
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=init_worker,
+                )
+            return self._executor
+
+    def _reset_executor(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _release(self, future):
+        self._slots.release()
+        if not future.cancelled() and future.exception() is None:
+            self._bump("completed")
+
+    def render(self, func, *args, timeout=None):
+        """
+        Run func(*args) in a worker process and return its result.
+
+        func must be a module-level function and args picklable.
+        Raises PdfQueueFullError, PdfRenderTimeout or PdfRenderError.
+        """
+        if not self._slots.acquire(blocking=False):
+            self._bump("rejected")
+            raise PdfQueueFullError("Too many PDF exports in progress, try again shortly")
+
+        executor = self._get_executor()
+        try:
+            future = executor.submit(func, *args)
+        except Exception as e:
+            self._slots.release()
+            self._bump("failed")
+            if isinstance(e, BrokenProcessPool):
+                self._reset_executor(executor)
+            raise PdfRenderError(f"Could not start PDF rendering: {e}") from e
+
+        self._bump("submitted")
+        future.add_done_callback(self._release)
+
+        try:
+            return future.result(timeout=timeout or self.timeout)
+        except FutureTimeoutError:
+            future.cancel()  # only helps if it hasn't started yet
+            self._bump("timeouts")
+            raise PdfRenderTimeout(
+                f"PDF rendering took longer than {timeout or self.timeout:g}s"
+            )
+        except BrokenProcessPool as e:
+            # a worker died (OOM, segfault) — start a fresh pool next time
+            self._bump("failed")
+            self._reset_executor(executor)
+            raise PdfRenderError("PDF worker crashed") from e
+        except Exception as e:
+            self._bump("failed")
+            raise PdfRenderError(f"PDF rendering failed: {e}") from e
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, workers=self.workers)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+_service = None
+_service_pid = None
+_service_lock = threading.Lock()
+
+
+def get_pdf_service():
+    """Return the process-wide render service (a new one after a fork)."""
+    global _service, _service_pid
+
+    if _service is not None and _service_pid == os.getpid():
+        return _service
+
+    with _service_lock:
+        if _service is None or _service_pid != os.getpid():
+            _service = PdfRenderService(**RENDER_SETTINGS)
+            _service_pid = os.getpid()
+            atexit.register(_service.shutdown)
+    return _service
+
+
+def render_report_pdf(*args, timeout=None):
+    """generate_pdf_report(*args) in the render pool; returns the PDF bytes."""
+    return get_pdf_service().render(render_report, *args, timeout=timeout)
+
+
+def init_app(app):
+    for key in RENDER_SETTINGS:
+        config_key = "PDF_RENDER_" + key.upper()
+        if config_key in app.config:
+            RENDER_SETTINGS[key] = app.config[config_key]
@@ -0,0 +1,188 @@
+import io
+from datetime import datetime
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+
+def generate_pdf_report(
+    project,
+    stats,
+    team_data,
+    tasks_by_status=None,
+    tasks_by_priority=None,
+    recent_activities=None,
+    completion_rate=0,
+):
+    """
+    Build the project report PDF and return it as bytes.
+
+    Runs in the PDF render pool's worker processes (services.pdf_renderer),
+    so it must stay a plain module-level function and take / return only
+    picklable values (DB row tuples, dates, numbers).
+
+    Only the date is printed: rendered reports are cached per day
+    (services.report_cache.report_key), so a time of day would be stale.
+    """
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4)
+    styles = getSampleStyleSheet()
+    story = []
+
+    title_style = ParagraphStyle(
+        "CustomTitle",
+        parent=styles["Heading1"],
+        fontSize=24,
+        spaceAfter=30,
+        textColor=colors.HexColor("#2563eb"),
+    )
+
+    story.append(Paragraph(f"Project Report: {project[1]}", title_style))
+    story.append(
+        Paragraph(
+            f"Generated: {datetime.now().strftime('%B %d, %Y')}",
+            styles["Normal"],
+        )
+    )
+    story.append(Spacer(1, 20))
+
+    # Task Statistics
+    story.append(Paragraph("Task Statistics", styles["Heading2"]))
+    story.append(Spacer(1, 10))
+
+    stats_data = [
+        ["Metric", "Count"],
+        ["Total Tasks", str(stats[0] or 0)],
+        ["Completed", str(stats[1] or 0)],
+        ["In Progress", str(stats[2] or 0)],
+        ["Pending Review", str(stats[3] or 0)],
+        ["Overdue", str(stats[4] or 0)],
+        ["Completion Rate", f"{completion_rate}%"],
+    ]
+    stats_table = Table(stats_data)
+    stats_table.setStyle(
+        TableStyle(
+            [
+                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#2563eb")),
+                ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+                ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+                ("FONTSIZE", (0, 0), (-1, 0), 14),
+                ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
+                ("BACKGROUND", (0, 1), (-1, -1), colors.beige),
+                ("GRID", (0, 0), (-1, -1), 1, colors.black),
+            ]
+        )
+    )
+    story.append(stats_table)
+    story.append(Spacer(1, 30))
+
+    # Tasks by Status
+    if tasks_by_status:
+        story.append(Paragraph("Tasks by Status", styles["Heading2"]))
+        story.append(Spacer(1, 10))
+        status_data = [["Status", "Count"]] + [
+            [s[0], str(s[1])] for s in tasks_by_status
+        ]
+        status_table = Table(status_data)
+        status_table.setStyle(
+            TableStyle(
+                [
+                    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#10b981")),
+                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+                    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+                    ("GRID", (0, 0), (-1, -1), 1, colors.black),
+                ]
+            )
+        )
+        story.append(status_table)
+        story.append(Spacer(1, 30))
+
+    # Tasks by Priority
+    if tasks_by_priority:
+        story.append(Paragraph("Tasks by Priority", styles["Heading2"]))
+        story.append(Spacer(1, 10))
+        priority_data = [["Priority", "Count"]] + [
+            [p[0], str(p[1])] for p in tasks_by_priority
+        ]
+        priority_table = Table(priority_data)
+        priority_table.setStyle(
+            TableStyle(
+                [
+                    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#f59e0b")),
+                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+                    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+                    ("GRID", (0, 0), (-1, -1), 1, colors.black),
+                ]
+            )
+        )
+        story.append(priority_table)
+        story.append(Spacer(1, 30))
+
+    # Team Performance
+    story.append(Paragraph("Team Performance", styles["Heading2"]))
+    story.append(Spacer(1, 10))
+    team_table_data = [["Name", "Role", "Tasks", "Completed", "Overdue"]]
+    for member in team_data:
+        team_table_data.append(
+            [
+                member[0],
+                member[1] or "N/A",
+                str(member[2] or 0),
+                str(member[3] or 0),
+                str(member[4] or 0) if len(member) > 4 else "0",
+            ]
+        )
+    team_table = Table(team_table_data)
+    team_table.setStyle(
+        TableStyle(
+            [
+                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#8b5cf6")),
+                ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+                ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+                ("GRID", (0, 0), (-1, -1), 1, colors.black),
+            ]
+        )
+    )
+    story.append(team_table)
+    story.append(Spacer(1, 30))
+
+    # Recent Activities
+    if recent_activities:
+        story.append(Paragraph("Recent Activities", styles["Heading2"]))
+        story.append(Spacer(1, 10))
+        activities_data = [["User", "Activity", "Date"]]
+        for activity in recent_activities:
+            desc = (
+                f"Completed task: {activity[1]}"
+                if activity[0] == "task_completed"
+                else f"Joined as {activity[1]}"
+            )
+            activities_data.append(
+                [
+                    activity[2],
+                    desc,
+                    activity[3].strftime("%b %d, %Y") if activity[3] else "N/A",
+                ]
+            )
+        activities_table = Table(activities_data)
+        activities_table.setStyle(
+            TableStyle(
+                [
+                    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#6b7280")),
+                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+                    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+                    ("GRID", (0, 0), (-1, -1), 1, colors.black),
+                ]
+            )
+        )
+        story.append(activities_table)
+
+    doc.build(story)
+    return buffer.getvalue()
@@ -0,0 +1,25 @@
+import signal
+
+# -----------------------------
+# PDF RENDER WORKER ENTRY POINTS
+# -----------------------------
+# Everything the render pool's worker processes run lives here. Keep
+# this module free of Flask / app / database imports: it is what a
+# worker loads to do its job, and each import is paid once per worker.
+
+
+def init_worker():
+    """Pool initializer, runs once in every new worker process."""
+    # Ctrl-C in a dev server goes to the whole process group; the parent
+    # shuts the pool down, workers shouldn't each print a traceback
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    # load reportlab now so the first export doesn't pay for it
+    import services.pdf_report  # noqa: F401
+
+
+def render_report(*args):
+    """generate_pdf_report(*args) → PDF bytes."""
+    from services.pdf_report import generate_pdf_report
+
+    return generate_pdf_report(*args)
@@ -0,0 +1,129 @@
+import hashlib
+import os
+import tempfile
+import threading
+from datetime import date
+
+# Report cache settings (override through app.config["REPORT_CACHE_*"] in init_app)
+CACHE_SETTINGS = {
+    "dir": os.path.join(tempfile.gettempdir(), "collabhub_report_cache"),
+    "max_bytes": 64 * 1024 * 1024,  # evict least recently used files beyond this
+}
+
+
+def report_key(kind, project_id, data_version, project_name, day=None):
+    """
+    Content address of one report: the same inputs always map to the
+    same key, and anything that changes the PDF changes the key.
+
+    `kind` tells the variants apart ("export" / "email"). The day is
+    part of the key because the report prints its date and counts
+    overdue tasks against it.
+    """
+    day = day or date.today()
+    raw = f"{kind}|{project_id}|{data_version}|{project_name}|{day.isoformat()}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ReportCache:
+    """
+    Rendered PDFs on local disk, one file per key, LRU-bounded by size.
+
+    A hit touches the file's mtime, so mtime order is recency order;
+    when a put() pushes the total over `max_bytes` the oldest files are
+    deleted first. Files are written to a temp name and renamed into
+    place, so several gunicorn workers can share the directory and a
+    reader never sees half a file.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pdf")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)  # mark as recently used
+        except FileNotFoundError:
+            data = None
+
+        with self._lock:
+            self._stats["hits" if data is not None else "misses"] += 1
+        return data
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        with self._lock:
+            self._stats["stores"] += 1
+            self._evict()
+
+    def _evict(self):
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(".pdf"):
+                    continue
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue  # evicted by another worker meanwhile
+                entries.append((st.st_mtime, st.st_size, entry.path))
+                total += st.st_size
+
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                self._stats["evictions"] += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_report_cache():
+    global _cache
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ReportCache(CACHE_SETTINGS["dir"], CACHE_SETTINGS["max_bytes"])
+    return _cache
+
+
+def init_app(app):
+    for key in CACHE_SETTINGS:
+        config_key = "REPORT_CACHE_" + key.upper()
+        if config_key in app.config:
+            CACHE_SETTINGS[key] = app.config[config_key]
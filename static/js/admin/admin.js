@@ -321,16 +321,13 @@ document.addEventListener("DOMContentLoaded", function () {
     // initDeleteButtons();
 
 
-    if (document.getElementById("statusChart")) {
-        loadProjectOverview();
-    }
-
-    if (document.getElementById("riskChart")) {
-        loadRiskPanel();
-    }
-
-    if (document.getElementById("recentProjects")) {
-        loadRecentProjects();
+    // one request for every dashboard panel on the page
+    if (
+        document.getElementById("statusChart") ||
+        document.getElementById("riskChart") ||
+        document.getElementById("recentProjects")
+    ) {
+        loadDashboardPanels();
     }
 
     initProjectDateValidation();
@@ -422,168 +419,195 @@ document.addEventListener("DOMContentLoaded", function () {
 // });
 
 
+// ================= ALL PANELS (single request) =================
+
+function loadDashboardPanels() {
+
+    fetch("/admin/api/dashboard")
+        .then(res => res.json())
+        .then(data => {
+
+            if (document.getElementById("statusChart")) {
+                renderProjectOverview(data);
+            }
+
+            if (document.getElementById("riskChart")) {
+                renderRiskPanel(data.risk);
+            }
+
+            if (document.getElementById("recentProjects")) {
+                renderRecentProjects(data.recent);
+            }
+
+        });
+
+}
+
+
 // ================= PROJECT OVERVIEW =================
 
 function loadProjectOverview() {
 
     fetch("/admin/api/project-status")
         .then(res => res.json())
-        .then(data => {
+        .then(renderProjectOverview);
 
+}
 
-            // ================= GET CANVAS =================
 
-            const statusChart =
-                document.getElementById("statusChart");
+function renderProjectOverview(data) {
 
-            const trendChart =
-                document.getElementById("trendChart");
 
-            const deadlineChart =
-                document.getElementById("deadlineChart");
+    // ================= GET CANVAS =================
 
-            const creationChart =
-                document.getElementById("creationChart");
+    const statusChart =
+        document.getElementById("statusChart");
 
+    const trendChart =
+        document.getElementById("trendChart");
 
-            // ================= STATUS DONUT =================
+    const deadlineChart =
+        document.getElementById("deadlineChart");
 
-            new Chart(statusChart, {
-                type: "doughnut",
-                data: {
-                    labels: data.status.map(s => s.status),
-                    datasets: [{
-                        data: data.status.map(s => s.total)
-                    }]
-                }
-            });
+    const creationChart =
+        document.getElementById("creationChart");
 
 
-            // ================= DEADLINE BAR =================
+    // ================= STATUS DONUT =================
 
-            new Chart(deadlineChart, {
-                type: "bar",
-                data: {
-                    labels: data.deadline.map(d => d.project_name),
-                    datasets: [{
-                        label: "Progress %",
-                        data: data.deadline.map(d => d.progress)
-                    }]
-                }
-            });
+    new Chart(statusChart, {
+        type: "doughnut",
+        data: {
+            labels: data.status.map(s => s.status),
+            datasets: [{
+                data: data.status.map(s => s.total)
+            }]
+        }
+    });
 
 
-            // ================= CREATION LINE =================
+    // ================= DEADLINE BAR =================
 
-            new Chart(creationChart, {
-                type: "line",
-                data: {
-                    labels: data.creation.map(c => c.month.substring(0, 7)),
-                    datasets: [{
-                        label: "Projects Created",
-                        data: data.creation.map(c => c.total)
-                    }]
-                }
-            });
+    new Chart(deadlineChart, {
+        type: "bar",
+        data: {
+            labels: data.deadline.map(d => d.project_name),
+            datasets: [{
+                label: "Progress %",
+                data: data.deadline.map(d => d.progress)
+            }]
+        }
+    });
 
 
+    // ================= CREATION LINE =================
 
-            // ================= TREND (MULTI PROJECT) =================
+    new Chart(creationChart, {
+        type: "line",
+        data: {
+            labels: data.creation.map(c => c.month.substring(0, 7)),
+            datasets: [{
+                label: "Projects Created",
+                data: data.creation.map(c => c.total)
+            }]
+        }
+    });
 
-            const trendData = data.trend;
 
 
-            function randomColor() {
+    // ================= TREND (MULTI PROJECT) =================
 
-                return `hsl(${Math.random() * 360},70%,55%)`;
-            }
+    const trendData = data.trend;
 
 
-            let datasets = [];
+    function randomColor() {
 
+        return `hsl(${Math.random() * 360},70%,55%)`;
+    }
 
-            Object.keys(trendData).forEach(project => {
 
-                const values = trendData[project];
+    let datasets = [];
 
-                // datasets.push({
 
-                //     label: project,
+    Object.keys(trendData).forEach(project => {
 
-                //     data: values.map(v => v.progress),
+        const values = trendData[project];
 
-                //     borderColor: randomColor(),
+        // datasets.push({
 
-                //     tension: 0.3,
+        //     label: project,
 
-                //     fill: false
-                // });
-                datasets.push({
+        //     data: values.map(v => v.progress),
 
-                    label: project,
+        //     borderColor: randomColor(),
 
-                    data: values.map(v => v.progress),
+        //     tension: 0.3,
 
-                    borderColor: randomColor(),
+        //     fill: false
+        // });
+        datasets.push({
 
-                    backgroundColor: "rgba(0,0,0,0.05)",
+            label: project,
 
-                    tension: 0.4,
+            data: values.map(v => v.progress),
 
-                    fill: true,
+            borderColor: randomColor(),
 
-                    pointStyle: "circle"
-                });
+            backgroundColor: "rgba(0,0,0,0.05)",
 
+            tension: 0.4,
 
-            });
+            fill: true,
 
+            pointStyle: "circle"
+        });
 
-            // Safe labels
-            let labels = [];
 
-            if (Object.keys(trendData).length > 0) {
+    });
 
-                labels =
-                    trendData[Object.keys(trendData)[0]]
-                        .map(v => v.month);
-            }
 
+    // Safe labels
+    let labels = [];
 
-            new Chart(trendChart, {
+    if (Object.keys(trendData).length > 0) {
 
-                type: "line",
+        labels =
+            trendData[Object.keys(trendData)[0]]
+                .map(v => v.month);
+    }
 
-                data: {
-                    labels: labels,
-                    datasets: datasets
-                },
 
-                options: {
+    new Chart(trendChart, {
 
-                    responsive: true,
-                    maintainAspectRatio: false,
+        type: "line",
 
-                    plugins: {
-                        legend: {
-                            position: "bottom"
-                        }
-                    },
-
-                    scales: {
-                        y: {
-                            min: 0,
-                            max: 100,
-                            ticks: {
-                                callback: v => v + "%"
-                            }
-                        }
-                    }
-                }
-            });
+        data: {
+            labels: labels,
+            datasets: datasets
+        },
 
+        options: {
 
-        });
+            responsive: true,
+            maintainAspectRatio: false,
+
+            plugins: {
+                legend: {
+                    position: "bottom"
+                }
+            },
+
+            scales: {
+                y: {
+                    min: 0,
+                    max: 100,
+                    ticks: {
+                        callback: v => v + "%"
+                    }
+                }
+            }
+        }
+    });
 
 }
 
@@ -595,29 +619,32 @@ function loadRiskPanel() {
 
     fetch("/admin/api/risk-projects")
         .then(res => res.json())
-        .then(data => {
+        .then(renderRiskPanel);
 
+}
 
-            const riskChart =
-                document.getElementById("riskChart");
 
+function renderRiskPanel(data) {
 
-            new Chart(riskChart, {
 
-                type: "bar",
+    const riskChart =
+        document.getElementById("riskChart");
 
-                data: {
-                    labels: data.map(r => r.project_name),
-                    datasets: [{
-                        label: "Progress %",
-                        data: data.map(r => r.progress),
-                        backgroundColor: "#ef4444"
-                    }]
-                }
 
-            });
+    new Chart(riskChart, {
 
-        });
+        type: "bar",
+
+        data: {
+            labels: data.map(r => r.project_name),
+            datasets: [{
+                label: "Progress %",
+                data: data.map(r => r.progress),
+                backgroundColor: "#ef4444"
+            }]
+        }
+
+    });
 
 }
 
@@ -629,26 +656,29 @@ function loadRecentProjects() {
 
     fetch("/admin/api/recent-projects")
         .then(res => res.json())
-        .then(data => {
+        .then(renderRecentProjects);
 
-            let html = "";
+}
 
-            data.forEach(p => {
 
-                html += `
-                    <tr>
-                        <td>${p.project_name}</td>
-                        <td>${p.status}</td>
-                        <td>${p.progress}%</td>
-                        <td>${p.end_date?.substring(0, 10)}</td>
-                    </tr>
-                `;
+function renderRecentProjects(data) {
 
-            });
+    let html = "";
 
-            document.getElementById("recentProjects").innerHTML = html;
+    data.forEach(p => {
 
-        });
+        html += `
+            <tr>
+                <td>${p.project_name}</td>
+                <td>${p.status}</td>
+                <td>${p.progress}%</td>
+                <td>${p.end_date?.substring(0, 10)}</td>
+            </tr>
+        `;
+
+    });
+
+    document.getElementById("recentProjects").innerHTML = html;
 
 }
 